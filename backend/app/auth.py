@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -7,11 +7,11 @@ from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
 from app.database import db
 from app.config import settings
+from app.core.logging_setup import fingerprint
 from bson import ObjectId
 import logging
+import uuid
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -29,7 +29,7 @@ async def authenticate_user(email: str, password: str) -> Optional[User]:
         # Find user by email
         user_dict = await db.get_db().users.find_one({"email": email})
         if not user_dict:
-            logger.warning(f"Authentication failed: User not found for email: {email}")
+            logger.warning("Authentication failed: user not found", extra={"email_hash": fingerprint(email)})
             return None
             
         # Convert ObjectId to string
@@ -37,10 +37,9 @@ async def authenticate_user(email: str, password: str) -> Optional[User]:
         
         # Verify password
         if not verify_password(password, user_dict["password"]):
-            logger.warning(f"Authentication failed: Invalid password for email: {email}")
+            logger.warning("Authentication failed: invalid password", extra={"user_id": user_dict["_id"]})
             return None
-            
-        logger.info(f"Authentication successful for email: {email}")
+
         return User(**user_dict)
     except Exception as e:
         logger.error(f"Error during authentication: {str(e)}")
@@ -56,6 +55,81 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+async def create_refresh_token(email: str, family: Optional[str] = None) -> str:
+    # Refresh tokens are signed JWTs whose jti is recorded in the revocation store.
+    # Every token issued by rotation shares the family of the original login.
+    jti = uuid.uuid4().hex
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await db.get_db().refresh_tokens.insert_one({
+        "_id": jti,
+        "family": family or jti,
+        "email": email,
+        "revoked": False,
+        "created_at": datetime.utcnow(),
+        "expires_at": expire,
+    })
+    return jwt.encode(
+        {"sub": email, "type": "refresh", "jti": jti, "exp": expire},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") != "refresh" or not payload.get("sub") or not payload.get("jti"):
+        return None
+    return payload
+
+async def rotate_refresh_token(token: str) -> Optional[Tuple[str, str]]:
+    payload = decode_refresh_token(token)
+    if payload is None:
+        return None
+
+    # Consume the token atomically; only the first caller gets the stored record
+    record = await db.get_db().refresh_tokens.find_one_and_update(
+        {"_id": payload["jti"], "revoked": False},
+        {"$set": {"revoked": True, "revoked_at": datetime.utcnow()}},
+    )
+    if record is None:
+        # An already used token is presented again: treat it as stolen and
+        # revoke every token of its family
+        used = await db.get_db().refresh_tokens.find_one({"_id": payload["jti"]}, {"family": 1})
+        if used:
+            await db.get_db().refresh_tokens.update_many(
+                {"family": used["family"], "revoked": False},
+                {"$set": {"revoked": True, "revoked_at": datetime.utcnow()}},
+            )
+            logger.warning("Refresh token reuse detected, token family revoked")
+        return None
+
+    email = record["email"]
+    access_token = create_access_token(
+        data={"sub": email},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    refresh_token = await create_refresh_token(email, family=record["family"])
+    return access_token, refresh_token
+
+async def revoke_refresh_token(token: str) -> bool:
+    payload = decode_refresh_token(token)
+    if payload is None:
+        return False
+    record = await db.get_db().refresh_tokens.find_one_and_update(
+        {"_id": payload["jti"]},
+        {"$set": {"revoked": True, "revoked_at": datetime.utcnow()}},
+    )
+    if record is None:
+        return False
+    # Logging out ends every token rotated from the same login
+    await db.get_db().refresh_tokens.update_many(
+        {"family": record["family"], "revoked": False},
+        {"$set": {"revoked": True, "revoked_at": datetime.utcnow()}},
+    )
+    return True
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,7 +139,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("type") == "refresh":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
@@ -84,7 +158,7 @@ async def get_current_user_optional(token: str = Depends(oauth2_scheme_optional)
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("type") == "refresh":
             return None
     except JWTError:
         return None
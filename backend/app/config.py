@@ -4,11 +4,103 @@ from typing import Optional
 class Settings(BaseSettings):
     MONGODB_URL: str = "mongodb://localhost:27017"
     DB_NAME: str = "quotesAppv101"
+
+    # MongoDB connection pool and wire options
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 10  # Kept open so the pool is warm after startup
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 2000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 30000
+    MONGODB_COMPRESSORS: str = "zstd,snappy,zlib"  # In order of preference; empty disables
+    MONGODB_ZLIB_COMPRESSION_LEVEL: int = 6
+    MONGODB_READ_PREFERENCE: str = "primary"
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
     ENVIRONMENT: str = "development"  # development, testing, production
 
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Slow MongoDB operations are logged with their route and query shape;
+    # for reads the winning plan is captured with explain
+    SLOW_QUERY_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300
+
+    # Opt-in per-request profiler ("X-Profile: 1" header or "?profile=1")
+    PROFILER_ENABLED: bool = False
+    PROFILER_ADMIN_EMAILS: str = ""  # Comma separated; only these users may profile...
+    PROFILER_ENVIRONMENTS: str = ""  # ...unless ENVIRONMENT is listed here, e.g. "development"
+    PROFILER_INTERVAL_MS: float = 1.0
+    PROFILER_OUTPUT_DIR: str = "profiles"
+    PROFILER_MAX_STORED: int = 50  # Oldest stored profiles are deleted beyond this
+
+    # Admission control for /auth/login and /auth/register (token buckets)
+    # The buckets live in each worker process, so under serve.py with N workers a
+    # client can get up to N times these budgets. Divide by the worker count if
+    # the limit must hold across the whole server.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_IP_BURST: int = 20
+    RATE_LIMIT_IP_PER_MINUTE: float = 10
+    RATE_LIMIT_EMAIL_BURST: int = 5
+    RATE_LIMIT_EMAIL_PER_MINUTE: float = 2
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    RATE_LIMIT_SWEEP_SECONDS: int = 60
+
+    # Logging: records go through a queue to a background writer thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json or text
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking
+    LOG_FLUSH_TIMEOUT: float = 5.0  # Longest shutdown waits for queued records to be written
+    # High-volume events (logins, access log): per event and second the first
+    # LOG_SAMPLE_INITIAL are kept, then one in every LOG_SAMPLE_THEREAFTER
+    LOG_SAMPLE_INITIAL: int = 10
+    LOG_SAMPLE_THEREAFTER: int = 100
+
+    # Response compression (brotli when installed, otherwise gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_ENCODINGS: str = "br,gzip"  # Server preference when the client accepts several
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes; smaller complete responses are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher costs far more CPU per request
+
+    # ETag on GET responses and 304 Not Modified for unchanged bodies
+    CONDITIONAL_GET_ENABLED: bool = True
+
+    # Near-duplicate check on quote creation (MinHash LSH over normalized text)
+    DUPLICATE_DETECTION_ENABLED: bool = True
+    DUPLICATE_SIMILARITY_THRESHOLD: float = 0.8  # Jaccard similarity of 4-character shingles
+    DUPLICATE_MAX_CANDIDATES: int = 20  # Bounds the verification work per insert
+
+    # Delta sync (GET /quotes/changes)
+    QUOTE_TOMBSTONE_RETENTION_DAYS: int = 30  # Older sync tokens get 410 and need a full reload
+    SYNC_PAGE_SIZE: int = 500
+    # Changes younger than this are held back to the next sync, so a write still
+    # in flight cannot commit behind a token that was already handed out
+    SYNC_SETTLE_SECONDS: float = 1.0
+
+    # Production launcher (python serve.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # Worker processes; 0 means one per CPU
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 65  # Longer than typical load balancer idle timeouts (60s)
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30  # Time to drain in-flight requests on SIGTERM
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None  # Per worker; excess connections get 503
+    SERVER_MAX_REQUESTS: int = 0  # Recycle a worker after this many requests; 0 disables
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"  # Proxies trusted for X-Forwarded-For
+    # Set by the launcher: workers compete for this lock and only the holder
+    # runs one-time startup work. Empty means every process runs it.
+    STARTUP_LOCK_FILE: str = ""
+    # How long other workers wait for the lock holder's indexes before the
+    # indexes step is reported as failed
+    STARTUP_INDEX_WAIT_SECONDS: float = 600
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,180 @@
+from app.config import settings
+from app.core.metrics import MetricsRegistry, metrics
+import zlib
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Content types worth compressing; images, archives and the like already are
+COMPRESSIBLE_TYPES = (
+    b"application/json", b"application/x-ndjson", b"text/", b"application/javascript", b"image/svg+xml",
+)
+
+
+def parse_accept_encoding(value: str) -> dict:
+    # {"gzip": 1.0, "br": 0.5, ...}; codings with q=0 are refused by the client
+    accepted = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, preferred) -> str:
+    # Highest client quality wins; ties go to the server's preference order
+    accepted = parse_accept_encoding(accept_encoding)
+    best, best_quality = "", 0.0
+    for coding in preferred:
+        if coding == "br" and brotli is None:
+            continue
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class Compressor:
+    # Incremental gzip or brotli stream. compress() returns whatever output is
+    # ready after flushing, so every chunk of a streaming response can be sent
+    # as soon as it is produced.
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31 selects the gzip container
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            output = self._brotli.process(data)
+            return output + (self._brotli.finish() if final else self._brotli.flush())
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    # Compresses responses with brotli or gzip according to Accept-Encoding.
+    # Complete responses smaller than COMPRESSION_MINIMUM_SIZE are sent as is,
+    # because headers and framing would eat most of the saving. Streaming
+    # responses are compressed chunk by chunk without buffering.
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+        self.preferred = [e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",") if e.strip()]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding, self.preferred) if accept_encoding else ""
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(send, encoding, self.registry).send)
+
+
+class _CompressingSender:
+    def __init__(self, send, encoding: str, registry: MetricsRegistry):
+        self._send = send
+        self.encoding = encoding
+        self.registry = registry
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _eligible(self, message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in message.get("headers", ()):
+            name = name.lower()
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.lower()
+        return any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES)
+
+    def _headers(self, content_length: int = None) -> list:
+        headers = []
+        vary = None
+        for name, value in self.start_message.get("headers", ()):
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"vary":
+                vary = value
+                continue
+            if lowered == b"etag" and not value.startswith(b"W/"):
+                # The compressed body is no longer byte-identical to the original
+                value = b"W/" + value
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body chunk shows whether compression pays off
+            self.start_message = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            self.compressor = Compressor(self.encoding)
+            if not more_body:
+                # Whole body in one message: compress once and keep Content-Length
+                compressed = self.compressor.compress(body, final=True)
+                self._record(len(body), len(compressed))
+                await self._send({**self.start_message, "headers": self._headers(len(compressed))})
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send({**self.start_message, "headers": self._headers()})
+
+        compressed = self.compressor.compress(body, final=not more_body)
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        if not more_body:
+            self._record(self.bytes_in, self.bytes_out)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _record(self, bytes_in: int, bytes_out: int):
+        self.registry.compression_input_bytes.inc(self.encoding, amount=bytes_in)
+        self.registry.compression_output_bytes.inc(self.encoding, amount=bytes_out)
@@ -0,0 +1,99 @@
+import hashlib
+
+# Cache-Control for GET responses that do not set their own: clients may keep
+# the response but must revalidate it (If-None-Match) before every reuse
+DEFAULT_CACHE_CONTROL = b"private, no-cache"
+
+
+def entity_tag(body: bytes) -> bytes:
+    # Weak, because it stays valid when CompressionMiddleware re-encodes the body
+    return b'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest().encode("latin-1") + b'"'
+
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): the W/ prefix is ignored on both sides
+    if if_none_match.strip() == b"*":
+        return True
+    opaque = etag[2:] if etag.startswith(b"W/") else etag
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate.startswith(b"W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    # Adds an ETag to complete 200 responses to GET requests and answers
+    # If-None-Match with 304 Not Modified when the body has not changed. The
+    # handler still runs; what is saved is the transfer, compression and the
+    # client's decoding of a body it already has. Streaming responses and
+    # responses marked no-store are passed through untouched.
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        if_none_match = None
+        for name, value in scope.get("headers", ()):
+            if name == b"if-none-match":
+                if_none_match = value
+                break
+        await self.app(scope, receive, _ConditionalSender(send, if_none_match).send)
+
+
+class _ConditionalSender:
+    def __init__(self, send, if_none_match):
+        self._send = send
+        self.if_none_match = if_none_match
+        self.start_message = None
+        self.passthrough = False
+
+    def _eligible(self, message) -> bool:
+        if message["status"] != 200:
+            return False
+        for name, value in message.get("headers", ()):
+            name = name.lower()
+            if name == b"etag":
+                return False
+            if name == b"cache-control" and b"no-store" in value.lower():
+                return False
+        return True
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the body is known
+            self.start_message = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+        if message.get("more_body", False):
+            # Streaming: the ETag would only be known after the last chunk
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        etag = entity_tag(message.get("body", b""))
+        headers = [(name, value) for name, value in self.start_message.get("headers", ())]
+        if not any(name.lower() == b"cache-control" for name, _ in headers):
+            headers.append((b"cache-control", DEFAULT_CACHE_CONTROL))
+        headers.append((b"etag", etag))
+        if self.if_none_match is not None and etag_matches(self.if_none_match, etag):
+            # 304 keeps the validators and caching headers, but no body or content headers
+            kept = [(name, value) for name, value in headers
+                    if name.lower() not in (b"content-length", b"content-type")]
+            await self._send({"type": "http.response.start", "status": 304, "headers": kept})
+            await self._send({"type": "http.response.body", "body": b""})
+            return
+        await self._send({**self.start_message, "headers": headers})
+        await self._send(message)
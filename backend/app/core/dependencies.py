@@ -0,0 +1,40 @@
+from fastapi import HTTPException, Request, status
+from app.core.rate_limit import TokenBucketLimiter
+from app.config import settings
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Login and registration are throttled before any bcrypt work is done
+ip_limiter = TokenBucketLimiter(
+    capacity=settings.RATE_LIMIT_IP_BURST,
+    refill_per_minute=settings.RATE_LIMIT_IP_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    sweep_interval=settings.RATE_LIMIT_SWEEP_SECONDS,
+)
+email_limiter = TokenBucketLimiter(
+    capacity=settings.RATE_LIMIT_EMAIL_BURST,
+    refill_per_minute=settings.RATE_LIMIT_EMAIL_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    sweep_interval=settings.RATE_LIMIT_SWEEP_SECONDS,
+)
+
+def get_client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def enforce_auth_rate_limit(request: Request, email: str):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    retry_after = ip_limiter.hit(get_client_ip(request))
+    if not retry_after:
+        retry_after = email_limiter.hit(str(email).strip().lower())
+
+    if retry_after:
+        logger.warning(f"Rate limit exceeded for {request.url.path} from {get_client_ip(request)}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))},
+        )
@@ -0,0 +1,172 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from app.config import settings
+from app.core.request_context import current_route
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+
+# Attributes every LogRecord has; anything else was passed through extra= and
+# is emitted as a structured field
+RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "color_message"}
+
+# Loggers whose every record is a high-volume event of the given name
+EVENT_LOGGERS = {"uvicorn.access": "http.access"}
+
+_listener = None
+_queue = None
+_lock = threading.Lock()
+
+
+def fingerprint(value: str) -> str:
+    # Stable keyed hash for correlating log lines about the same email or IP
+    # without writing the value itself to the logs
+    digest = hmac.new(settings.SECRET_KEY.encode(), value.strip().lower().encode(), hashlib.sha256)
+    return digest.hexdigest()[:12]
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    # Human-readable variant for local development; structured fields are appended
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {k: v for k, v in vars(record).items() if k not in RESERVED_ATTRS and not k.startswith("_")}
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    # Burst-then-sample for high-volume INFO/DEBUG events (records carrying an
+    # "event" field): per event and second, the first LOG_SAMPLE_INITIAL records
+    # pass, then one in every LOG_SAMPLE_THEREAFTER. The next record that passes
+    # reports how many were dropped. Warnings and errors are never sampled.
+
+    def __init__(self, initial: int, thereafter: int):
+        super().__init__()
+        self.initial = initial
+        self.thereafter = max(thereafter, 1)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        event = getattr(record, "event", None) or EVENT_LOGGERS.get(record.name)
+        if event is None:
+            return True
+        second = int(time.monotonic())
+        with self._lock:
+            window, seen, dropped = self._counts.get(event, (second, 0, 0))
+            if window != second:
+                window, seen = second, 0
+            seen += 1
+            keep = seen <= self.initial or (seen - self.initial) % self.thereafter == 0
+            if keep:
+                self._counts[event] = (window, seen, 0)
+            else:
+                self._counts[event] = (window, seen, dropped + 1)
+        if keep and dropped:
+            record.sampled_out = dropped
+        return keep
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    # Hands records to the listener thread without formatting them; message
+    # formatting, JSON encoding and the stream write all happen off the event
+    # loop. When the queue is full the record is dropped instead of blocking.
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The route is read here because the listener thread has no request context
+        route = current_route()
+        if route is not None:
+            record.route = route
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    # Idempotent. Replaces any handlers on the root logger with the queue
+    # handler; uvicorn's loggers are pointed at the root as well.
+    global _listener, _queue
+    with _lock:
+        if _listener is not None:
+            return
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+        _queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(_queue)
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_INITIAL, settings.LOG_SAMPLE_THEREAFTER))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(settings.LOG_LEVEL.upper())
+
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers = []
+            uvicorn_logger.propagate = True
+
+        _listener = QueueListener(_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+
+def flush_logging(timeout: float = settings.LOG_FLUSH_TIMEOUT) -> bool:
+    # Blocks until the listener has written everything queued so far, but no
+    # longer than the timeout (a stuck stderr must not hang shutdown).
+    # Returns whether the queue drained.
+    if _queue is None or _listener is None:
+        return True
+    deadline = time.monotonic() + timeout
+    with _queue.all_tasks_done:
+        while _queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def stop_logging():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,206 @@
+from bisect import bisect_left
+from pymongo import monitoring
+from typing import Dict, Tuple
+import threading
+import time
+
+# Latency buckets in seconds, shared by HTTP and MongoDB histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bound on label combinations per metric; anything beyond is folded into "other"
+MAX_SERIES = 500
+
+OVERFLOW_LABEL = "other"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, values: Tuple[str, ...]) -> Tuple[str, ...]:
+        # Caps cardinality so a flood of distinct labels cannot grow memory unbounded
+        if values in self._series or len(self._series) < MAX_SERIES:
+            return values
+        return tuple(OVERFLOW_LABEL for _ in values)
+
+    def header(self) -> str:
+        return f"# HELP {self.name} {self.help_text}\n# TYPE {self.name} {self.kind}\n"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *values: str, amount: float = 1.0):
+        with self._lock:
+            key = self._key(values)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            series = list(self._series.items())
+        lines = [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}\n" for key, value in series]
+        return self.header() + "".join(lines)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *values: str, amount: float = 1.0):
+        with self._lock:
+            key = self._key(values)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, *values: str, amount: float = 1.0):
+        self.inc(*values, amount=-amount)
+
+    def render(self) -> str:
+        with self._lock:
+            series = list(self._series.items())
+        lines = [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}\n" for key, value in series]
+        return self.header() + "".join(lines)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *values: str):
+        # Per-bucket counts are stored non-cumulatively so an observation is one bisect and one increment
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(values)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        lines = []
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}\n")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}\n")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}\n")
+        return self.header() + "".join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.http_requests = Counter(
+            "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+        )
+        self.http_latency = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+        )
+        self.http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+        self.mongo_commands = Counter(
+            "mongodb_commands_total", "MongoDB commands by name and outcome", ("command", "outcome")
+        )
+        self.mongo_latency = Histogram(
+            "mongodb_command_duration_seconds", "MongoDB command latency by name", ("command",)
+        )
+        self.compression_input_bytes = Counter(
+            "http_compression_input_bytes_total", "Response bytes before compression by encoding", ("encoding",)
+        )
+        self.compression_output_bytes = Counter(
+            "http_compression_output_bytes_total", "Response bytes after compression by encoding", ("encoding",)
+        )
+        self._metrics = [
+            self.http_requests, self.http_latency, self.http_in_flight,
+            self.mongo_commands, self.mongo_latency,
+            self.compression_input_bytes, self.compression_output_bytes,
+        ]
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: cheaper than BaseHTTPMiddleware because it does
+    # not wrap the request and response bodies in extra tasks and streams.
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry = self.registry
+        registry.http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.http_in_flight.dec()
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            registry.http_latency.observe(elapsed, method, route_label)
+            registry.http_requests.inc(method, route_label, str(status_code))
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.registry.mongo_commands.inc(event.command_name, "succeeded")
+        self.registry.mongo_latency.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        self.registry.mongo_commands.inc(event.command_name, "failed")
+        self.registry.mongo_latency.observe(event.duration_micros / 1e6, event.command_name)
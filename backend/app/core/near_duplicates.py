@@ -0,0 +1,141 @@
+from app.config import settings
+from random import Random
+import hashlib
+import re
+import struct
+import unicodedata
+
+# MinHash signature of character shingles, split into LSH bands. Two quotes
+# share at least one band with probability 1 - (1 - J**ROWS)**BANDS for
+# shingle Jaccard similarity J: about 0.9998 at J=0.8 and 0.64 at J=0.5, while
+# quotes below J=0.3 rarely meet. Each quote stores its band hashes in the
+# multikey-indexed dup_bands field, so looking up candidates is one indexed
+# $in query and the index is maintained by ordinary inserts and updates.
+#
+# The signature uses one-permutation hashing: every shingle is hashed once and
+# lands in one of SIGNATURE_SIZE bins, which keep their minimum. Empty bins
+# (short quotes) borrow from the first non-empty bin along a fixed per-bin
+# probe order ("optimal densification"), which keeps P(bins equal) = J. Cost
+# is linear in the quote length instead of SIGNATURE_SIZE times it.
+BANDS = 16
+ROWS = 4
+SIGNATURE_SIZE = BANDS * ROWS
+SHINGLE_SIZE = 4
+
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+_random = Random(0x5EED)
+# Fixed for the lifetime of stored dup_bands; changing it requires a re-backfill
+_PROBES = []
+for _bin in range(SIGNATURE_SIZE):
+    _order = [b for b in range(SIGNATURE_SIZE) if b != _bin]
+    _random.shuffle(_order)
+    _PROBES.append(_order)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    # Case, accents, punctuation and spacing do not make a quote different
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", stripped.casefold()).strip()
+
+
+def shingles(text: str) -> set:
+    normalized = normalize_text(text)
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def _shingle_hashes(shingle_set: set) -> list:
+    return [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        for shingle in shingle_set
+    ]
+
+
+def signature_bands(text: str) -> list:
+    # One signed 64-bit hash per band (MongoDB stores it as a long); empty for
+    # text without any letters or digits
+    hashes = _shingle_hashes(shingles(text))
+    if not hashes:
+        return []
+    bins = [None] * SIGNATURE_SIZE
+    for value in hashes:
+        index = value & (SIGNATURE_SIZE - 1)
+        value >>= _BIN_BITS
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+    signature = list(bins)
+    for index, value in enumerate(bins):
+        if value is None:
+            for probe in _PROBES[index]:
+                if bins[probe] is not None:
+                    signature[index] = bins[probe]
+                    break
+    bands = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f">B{ROWS}Q", band, *rows), digest_size=8).digest()
+        bands.append(int.from_bytes(digest, "big", signed=True))
+    return bands
+
+
+def text_hash(text: str):
+    # Signed 64-bit hash of the normalized text, so exact re-submissions are
+    # found by equality; None for text without any letters or digits
+    normalized = normalize_text(text)
+    if not normalized:
+        return None
+    return int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def jaccard(left: set, right: set) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+async def find_near_duplicate(database, text: str, bands: list = None, exclude_id=None):
+    # Returns (quote, similarity) for the most similar existing quote at or
+    # above DUPLICATE_SIMILARITY_THRESHOLD, else None. Cost is bounded: one
+    # indexed query for at most DUPLICATE_MAX_CANDIDATES quotes, each checked
+    # by exact shingle Jaccard similarity.
+    #
+    # Popular texts can share a band with thousands of stored variants, so the
+    # candidates are ranked before the cap: an exact normalized-text match
+    # first, then by the number of bands shared (the likeliest near-duplicates).
+    if bands is None:
+        bands = signature_bands(text)
+    if not bands:
+        return None
+    exact = text_hash(text)
+    match = {"$or": [{"dup_text_hash": exact}, {"dup_bands": {"$in": bands}}]}
+    if exclude_id is not None:
+        match["_id"] = {"$ne": exclude_id}
+    candidates = await database.quotes.aggregate([
+        {"$match": match},
+        {"$project": {
+            "quote": 1,
+            "author": 1,
+            "rank": {"$add": [
+                {"$cond": [{"$eq": ["$dup_text_hash", exact]}, BANDS + 1, 0]},
+                {"$size": {"$setIntersection": [{"$ifNull": ["$dup_bands", []]}, bands]}},
+            ]},
+        }},
+        {"$sort": {"rank": -1}},
+        {"$limit": settings.DUPLICATE_MAX_CANDIDATES},
+    ]).to_list(length=settings.DUPLICATE_MAX_CANDIDATES)
+
+    text_shingles = shingles(text)
+    best, best_similarity = None, 0.0
+    for candidate in candidates:
+        similarity = jaccard(text_shingles, shingles(candidate.get("quote", "")))
+        if similarity > best_similarity:
+            best, best_similarity = candidate, similarity
+    if best is None or best_similarity < settings.DUPLICATE_SIMILARITY_THRESHOLD:
+        return None
+    best.pop("rank", None)
+    return best, best_similarity
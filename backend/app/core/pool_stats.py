@@ -0,0 +1,114 @@
+from pymongo import monitoring
+import threading
+import time
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    # Aggregates connection pool events per server address.
+    # pymongo calls these hooks from its own threads, so all updates take a lock.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pools = {}
+
+    @staticmethod
+    def _key(address) -> str:
+        return f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+
+    def _pool(self, address) -> dict:
+        key = self._key(address)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                "open_connections": 0,
+                "checked_out": 0,
+                "waiting": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "wait_time_total_ms": 0.0,
+                "wait_time_max_ms": 0.0,
+                "connections_created": 0,
+                "connections_closed": 0,
+                "pool_clears": 0,
+            }
+        return pool
+
+    def _record_wait(self, pool: dict, event):
+        # pymongo >= 4.7 reports the checkout duration itself
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            wait_ms = duration * 1000
+        else:
+            started = getattr(self._local, "checkout_started", None)
+            wait_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        pool["waiting"] = max(0, pool["waiting"] - 1)
+        pool["wait_time_total_ms"] += wait_ms
+        pool["wait_time_max_ms"] = max(pool["wait_time_max_ms"], wait_ms)
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address)["pool_clears"] += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(self._key(event.address), None)
+
+    def connection_created(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["connections_created"] += 1
+            pool["open_connections"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["connections_closed"] += 1
+            pool["open_connections"] = max(0, pool["open_connections"] - 1)
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+        with self._lock:
+            self._pool(event.address)["waiting"] += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checkout_failures"] += 1
+            self._record_wait(pool, event)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checkouts"] += 1
+            pool["checked_out"] += 1
+            self._record_wait(pool, event)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] = max(0, pool["checked_out"] - 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pools = {}
+            for address, pool in self._pools.items():
+                stats = dict(pool)
+                stats["wait_time_avg_ms"] = (
+                    pool["wait_time_total_ms"] / pool["checkouts"] if pool["checkouts"] else 0.0
+                )
+                pools[address] = stats
+        return pools
+
+
+pool_stats = PoolStatsListener()
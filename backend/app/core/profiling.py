@@ -0,0 +1,224 @@
+from collections import Counter
+from datetime import datetime
+from urllib.parse import parse_qs
+from jose import JWTError, jwt
+from app.config import settings
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+WAITING_FRAME = "[waiting]"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _coroutine_frames(coro) -> list:
+    # Frames of a suspended coroutine chain, outermost first
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+class RequestSampler:
+    # Samples the event loop thread from a helper thread, but only keeps samples
+    # that belong to one asyncio task. While that task runs, its live stack is
+    # recorded. While it is suspended (Mongo waits, other tasks holding the loop),
+    # the awaiting coroutine chain is recorded under a [waiting] leaf, so the
+    # profile covers wall-clock time of this request only.
+
+    def __init__(self, task: asyncio.Task, loop, interval: float):
+        self.task = task
+        self.loop = loop
+        self.interval = interval
+        self.samples = Counter()
+        self._loop_thread_id = threading.get_ident()
+        self._root_code = task.get_coro().cr_code
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _running_stack(self, frame) -> list:
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            if frame.f_code is self._root_code:
+                break
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _sample(self):
+        if asyncio.current_task(self.loop) is self.task:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self.samples[";".join(self._running_stack(frame))] += 1
+            return
+        stack = [_frame_label(frame) for frame in _coroutine_frames(self.task.get_coro())]
+        stack.append(WAITING_FRAME)
+        self.samples[";".join(stack)] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                # The sampled stacks can change under us; skip this tick
+                pass
+
+    def folded(self) -> str:
+        # Collapsed stack format, readable by flamegraph.pl, speedscope and inferno
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _profile_mode(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1").strip().lower()
+    query_string = scope.get("query_string", b"")
+    if b"profile" in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get("profile")
+        if values:
+            return values[0].strip().lower()
+    return ""
+
+
+def _profiling_allowed(scope) -> bool:
+    allowed_environments = [e.strip() for e in settings.PROFILER_ENVIRONMENTS.split(",") if e.strip()]
+    if settings.ENVIRONMENT in allowed_environments:
+        return True
+    admin_emails = {e.strip().lower() for e in settings.PROFILER_ADMIN_EMAILS.split(",") if e.strip()}
+    if not admin_emails:
+        return False
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except JWTError:
+                return False
+            return payload.get("type") != "refresh" and str(payload.get("sub", "")).lower() in admin_emails
+    return False
+
+
+class ProfilerMiddleware:
+    # Opt-in profiling of a single request via "X-Profile: 1" or "?profile=1".
+    # "store" (also 1/true) writes the folded profile to PROFILER_OUTPUT_DIR and
+    # names the file in the X-Profile-File header; "return" replaces the response
+    # body with the profile. Only one request is profiled at a time.
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = _profile_mode(scope)
+        if mode not in ("1", "true", "store", "return"):
+            await self.app(scope, receive, send)
+            return
+        if self._active or not _profiling_allowed(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        try:
+            await self._profile(scope, receive, send, mode)
+        finally:
+            self._active = False
+
+    async def _profile(self, scope, receive, send, mode):
+        sampler = RequestSampler(
+            asyncio.current_task(), asyncio.get_running_loop(), settings.PROFILER_INTERVAL_MS / 1000
+        )
+        response_start = {}
+        filename = None
+
+        if mode == "return":
+            async def send_wrapper(message):
+                # Swallow the real response, the profile is sent instead
+                if message["type"] == "http.response.start":
+                    response_start.update(message)
+        else:
+            filename = self._output_filename(scope)
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-file", filename.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        profile = sampler.folded()
+        logger.info(f"Profiled {scope['method']} {scope['path']}: {elapsed_ms:.1f} ms, {sum(sampler.samples.values())} samples")
+
+        if mode == "return":
+            body = profile.encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"x-profile-status", str(response_start.get("status", 500)).encode("latin-1")),
+                    (b"x-profile-duration-ms", f"{elapsed_ms:.1f}".encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            os.makedirs(settings.PROFILER_OUTPUT_DIR, exist_ok=True)
+            with open(os.path.join(settings.PROFILER_OUTPUT_DIR, filename), "w") as f:
+                f.write(profile)
+            self._prune_stored()
+        except OSError as e:
+            logger.error(f"Failed to store profile {filename}: {str(e)}")
+
+    @staticmethod
+    def _prune_stored():
+        # File names start with a UTC timestamp, so sorting them puts the oldest first
+        stored = sorted(name for name in os.listdir(settings.PROFILER_OUTPUT_DIR) if name.endswith(".folded"))
+        for name in stored[:max(len(stored) - settings.PROFILER_MAX_STORED, 0)]:
+            try:
+                os.remove(os.path.join(settings.PROFILER_OUTPUT_DIR, name))
+            except FileNotFoundError:
+                pass  # Pruned by another worker
+
+    @staticmethod
+    def _output_filename(scope) -> str:
+        route = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        return f"{timestamp}-{scope['method']}-{route}.folded"
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Optional
+import math
+import time
+
+
+class TokenBucketLimiter:
+    # In-process token bucket limiter keyed by an arbitrary string.
+    # Buckets live in an OrderedDict kept in least-recently-used order so that
+    # every hit, eviction and sweep step is O(1) and memory stays bounded by max_keys.
+
+    def __init__(
+        self,
+        capacity: int,
+        refill_per_minute: float,
+        max_keys: int = 10000,
+        sweep_interval: float = 60.0,
+    ):
+        self.capacity = float(capacity)
+        self.refill_rate = refill_per_minute / 60.0  # tokens per second
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        # Take one token for key. Returns 0 when allowed, otherwise the number
+        # of seconds until a token becomes available.
+        if now is None:
+            now = time.monotonic()
+        self._maybe_sweep(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.capacity, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                # Drop the least recently used bucket
+                self._buckets.popitem(last=False)
+        else:
+            tokens, last = bucket
+            bucket[0] = min(self.capacity, tokens + (now - last) * self.refill_rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        if self.refill_rate <= 0:
+            return float("inf")
+        return (1 - bucket[0]) / self.refill_rate
+
+    def _maybe_sweep(self, now: float):
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        # A bucket idle for this long has refilled completely and carries no state
+        idle_after = self.capacity / self.refill_rate if self.refill_rate > 0 else math.inf
+        # Buckets are ordered by last use, so stop at the first one still active
+        while self._buckets:
+            last = next(iter(self._buckets.values()))[1]
+            if now - last < idle_after:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self):
+        self._buckets.clear()
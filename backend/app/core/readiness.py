@@ -0,0 +1,54 @@
+from typing import Awaitable, Callable
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    # Tracks the startup steps that run in the background after the server has
+    # started accepting traffic. The process is ready once every required step
+    # has finished; optional steps (cache warm-up) are reported but never block.
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.steps = {}
+        self.required = set()
+
+    def register(self, name: str, required: bool = True):
+        self.steps[name] = {"status": "pending"}
+        if required:
+            self.required.add(name)
+
+    async def run(self, name: str, step: Callable[[], Awaitable]):
+        self.steps[name] = {"status": "running"}
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            self.steps[name] = {"status": "failed", "error": str(e)}
+            logger.error(f"Startup step {name} failed: {str(e)}")
+            return
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.steps[name] = {"status": "done", "duration_ms": duration_ms}
+        logger.info(f"Startup step {name} finished in {duration_ms} ms")
+
+    def skip(self, name: str):
+        self.steps[name] = {"status": "skipped"}
+
+    @property
+    def ready(self) -> bool:
+        # Nothing registered yet means startup has not begun, not that it finished
+        return bool(self.required) and all(
+            self.steps.get(name, {}).get("status") in ("done", "skipped") for name in self.required
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+            "steps": dict(self.steps),
+        }
+
+
+readiness = Readiness()
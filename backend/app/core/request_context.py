@@ -0,0 +1,31 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# ASGI scope of the request being handled. Motor copies the context into its
+# executor threads, so pymongo listeners can see which request issued a command.
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    # Route template once routing has happened, otherwise the raw path
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
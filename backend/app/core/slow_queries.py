@@ -0,0 +1,182 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pymongo import MongoClient, monitoring
+from app.config import settings
+from app.core.request_context import current_route
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Commands whose plan can be captured with explain
+READ_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+# Where each command keeps the part of the request that decides the plan
+SHAPE_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+    "findAndModify": ("query", "sort"),
+}
+
+# Session and cluster bookkeeping the driver adds; explain rejects or ignores them
+DRIVER_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "signature", "readConcern"}
+
+MAX_RECENT = 100
+
+
+def query_shape(value):
+    # Keeps field names and operators, replaces every literal with "?"
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def summarize_plan(plan: dict) -> str:
+    # "FETCH > IXSCAN(email_1)" style summary of a winning plan
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+        if "inputStage" in plan:
+            plan = plan["inputStage"]
+        elif plan.get("inputStages"):
+            stages.append("[" + ", ".join(summarize_plan(p) for p in plan["inputStages"]) + "]")
+            break
+        else:
+            break
+    return " > ".join(stages)
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._explained = {}
+        self._explain_client = None
+        self._executor = None
+        self.recent = deque(maxlen=MAX_RECENT)
+
+    def started(self, event):
+        if event.command_name not in SHAPE_FIELDS:
+            return
+        fields = SHAPE_FIELDS[event.command_name]
+        command = event.command
+        with self._lock:
+            self._pending[event.request_id] = {
+                "command": event.command_name,
+                "database": event.database_name,
+                "collection": command.get(event.command_name),
+                "shape": {field: query_shape(command[field]) for field in fields if field in command},
+                "route": current_route(),
+                # Reads keep the command so its plan can be explained later
+                "explain": (
+                    {k: v for k, v in command.items() if k not in DRIVER_FIELDS and not k.startswith("$")}
+                    if settings.SLOW_QUERY_EXPLAIN and event.command_name in READ_COMMANDS else None
+                ),
+            }
+
+    def succeeded(self, event):
+        self._finish(event, "succeeded")
+
+    def failed(self, event):
+        self._finish(event, "failed")
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        explain_command = pending.pop("explain")
+        record = {
+            **pending,
+            "duration_ms": round(duration_ms, 2),
+            "outcome": outcome,
+            "at": datetime.utcnow().isoformat(),
+            "plan": None,
+        }
+        with self._lock:
+            self.recent.append(record)
+        logger.warning(
+            f"Slow {record['command']} on {record['collection']} took {duration_ms:.1f} ms "
+            f"(route: {record['route'] or '-'}, shape: {record['shape']})"
+        )
+        if explain_command is not None and settings.SLOW_QUERY_EXPLAIN and self._should_explain(record):
+            self._get_executor().submit(self._explain, record, explain_command)
+
+    def _should_explain(self, record: dict) -> bool:
+        # Each query shape is explained at most once per interval
+        key = f"{record['database']}.{record['collection']}:{record['shape']}"
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained.get(key)
+            if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+                return False
+            if len(self._explained) >= MAX_RECENT * 10:
+                self._explained.clear()
+            self._explained[key] = now
+        return True
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+            return self._executor
+
+    def _explain(self, record: dict, command: dict):
+        # Runs on its own synchronous client without listeners, so explains are
+        # neither recorded as slow queries nor counted in metrics
+        try:
+            if self._explain_client is None:
+                self._explain_client = MongoClient(
+                    settings.MONGODB_URL,
+                    maxPoolSize=1,
+                    serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                )
+            result = self._explain_client[record["database"]].command(
+                {"explain": command, "verbosity": "queryPlanner"}
+            )
+            planner = result.get("queryPlanner")
+            if planner is None and result.get("stages"):
+                # Aggregations report the planner under their first stage
+                planner = result["stages"][0].get("$cursor", {}).get("queryPlanner")
+            winning_plan = (planner or {}).get("winningPlan", {})
+            # Newer servers nest the classic plan under queryPlan
+            winning_plan = winning_plan.get("queryPlan", winning_plan)
+            record["plan"] = summarize_plan(winning_plan)
+            logger.warning(
+                f"Plan for slow {record['command']} on {record['collection']} "
+                f"(route: {record['route'] or '-'}): {record['plan']}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to explain slow {record['command']} on {record['collection']}: {str(e)}")
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return list(self.recent)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._explain_client is not None:
+            self._explain_client.close()
+            self._explain_client = None
+
+
+slow_queries = SlowQueryRecorder()
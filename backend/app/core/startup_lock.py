@@ -0,0 +1,34 @@
+from app.config import settings
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process runs startup work
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Open handle of the held lock; released by the OS when the process exits
+_lock_file = None
+
+
+def claim_startup_work() -> bool:
+    # True when this process should run one-time startup work (index builds,
+    # migrations). Workers started by serve.py share STARTUP_LOCK_FILE and the
+    # first one to lock it keeps it for its lifetime. If that worker dies, its
+    # replacement can claim the lock again; the work itself is idempotent.
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    if not settings.STARTUP_LOCK_FILE or fcntl is None:
+        return True
+    lock_file = open(settings.STARTUP_LOCK_FILE, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    logger.info(f"Worker {os.getpid()} runs startup work")
+    return True
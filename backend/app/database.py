@@ -1,40 +1,73 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import settings
+from app.core.pool_stats import pool_stats
+from app.core.metrics import MongoCommandMetrics
+from app.core.slow_queries import slow_queries
+import asyncio
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS,
+        "readPreference": settings.MONGODB_READ_PREFERENCE,
+    }
+    # pymongo skips (with a warning) any compressor whose module is not installed
+    compressors = [c.strip() for c in settings.MONGODB_COMPRESSORS.split(",") if c.strip()]
+    if compressors:
+        options["compressors"] = compressors
+        if "zlib" in compressors:
+            options["zlibCompressionLevel"] = settings.MONGODB_ZLIB_COMPRESSION_LEVEL
+    return options
+
 class Database:
     client: AsyncIOMotorClient = None
     db = None
 
+    def __init__(self):
+        # pymongo monitoring listeners attached to the client on connect
+        self.event_listeners = [pool_stats]
+        if settings.METRICS_ENABLED:
+            self.event_listeners.append(MongoCommandMetrics())
+        if settings.SLOW_QUERY_ENABLED:
+            self.event_listeners.append(slow_queries)
+
     async def connect_to_database(self):
-        try:
-            logger.info("Attempting to connect to MongoDB...")
-            # Use direct connection to local MongoDB
-            self.client = AsyncIOMotorClient(
-                "mongodb://localhost:27017",
-                serverSelectionTimeoutMS=5000  # 5 second timeout
-            )
-            self.db = self.client[settings.DB_NAME]
-            
-            # Verify connection
-            await self.client.admin.command('ping')
-            logger.info("Successfully connected to MongoDB!")
-            
-            # Create indexes if they don't exist
-            await self.db.users.create_index("email", unique=True)
-            logger.info("Database indexes created/verified")
-            
-        except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {str(e)}")
-            raise Exception(f"Could not connect to MongoDB: {str(e)}")
+        # The client connects lazily, so this returns immediately; wait_until_connected
+        # (run in the background at startup) reports when MongoDB is reachable
+        logger.info("Attempting to connect to MongoDB...")
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            event_listeners=self.event_listeners,
+            **client_options()
+        )
+        self.db = self.client[settings.DB_NAME]
+
+    async def wait_until_connected(self, max_delay: float = 30):
+        delay = 0.5
+        while True:
+            try:
+                await self.client.admin.command('ping')
+                logger.info("Successfully connected to MongoDB!")
+                return
+            except Exception as e:
+                logger.error(f"Failed to connect to MongoDB, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
 
     async def close_database_connection(self):
         if self.client is not None:
             self.client.close()
+            for listener in self.event_listeners:
+                if hasattr(listener, "close"):
+                    listener.close()
             logger.info("MongoDB connection closed")
 
     def get_db(self):
@@ -0,0 +1,254 @@
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from app.config import settings
+from app.core.near_duplicates import signature_bands, text_hash
+from app.models.quote import tag_list
+import argparse
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Declarative index registry: every index the application relies on, per collection.
+# Names are left to pymongo's defaults (e.g. "email_1") so they match indexes
+# created by earlier versions.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Reaction lookups in get_quote_reactions
+        IndexModel([("liked_quotes", ASCENDING)]),
+        IndexModel([("disliked_quotes", ASCENDING)]),
+    ],
+    "quotes": [
+        # Feed order: net score, then total likes; _id makes the order total for keyset paging
+        IndexModel([("score", DESCENDING), ("likes", DESCENDING), ("_id", DESCENDING)]),
+        # Ownership checks and "my quotes", newest first
+        IndexModel([("user_id", ASCENDING), ("_id", DESCENDING)]),
+        # Case-insensitive regex searches scan these keys instead of whole documents
+        IndexModel([("author", ASCENDING)]),
+        IndexModel([("tags", ASCENDING)]),
+        # Near-duplicate candidates: one entry per MinHash LSH band
+        IndexModel([("dup_bands", ASCENDING)]),
+        # Exact re-submissions of the same normalized text
+        IndexModel([("dup_text_hash", ASCENDING)]),
+        # Filtered random picks (GET /quotes/random?author= or ?tag=)
+        IndexModel([("author", ASCENDING), ("random_key", ASCENDING)]),
+        IndexModel([("tag_list", ASCENDING), ("random_key", ASCENDING)]),
+        # Delta sync walks quotes in (updated_at, _id) order
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "quote_tombstones": [
+        # Range scans in delta sync; tombstones past the retention window are removed by the TTL monitor
+        IndexModel(
+            [("deleted_at", ASCENDING)],
+            expireAfterSeconds=settings.QUOTE_TOMBSTONE_RETENTION_DAYS * 86400
+        ),
+    ],
+    "refresh_tokens": [
+        # Expired refresh tokens are removed by MongoDB's TTL monitor
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        IndexModel([("family", ASCENDING)]),
+    ],
+}
+
+# Index options that change behaviour and therefore count as drift
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+async def backfill_quote_score(database):
+    # Quotes stored before the score field existed get likes - dislikes
+    result = await database.quotes.update_many(
+        {"score": {"$exists": False}},
+        [{"$set": {"score": {"$subtract": [
+            {"$ifNull": ["$likes", 0]},
+            {"$ifNull": ["$dislikes", 0]},
+        ]}}}]
+    )
+    logger.info(f"Backfilled score on {result.modified_count} quotes")
+
+
+async def backfill_quote_updated_at(database):
+    # Quotes written before updated_at was maintained get their creation time,
+    # falling back to the time embedded in the ObjectId
+    result = await database.quotes.update_many(
+        {"updated_at": {"$exists": False}},
+        [{"$set": {"updated_at": {"$ifNull": ["$created_at", {"$toDate": "$_id"}]}}}]
+    )
+    logger.info(f"Backfilled updated_at on {result.modified_count} quotes")
+
+
+async def _backfill_in_batches(database, field: str, source: str, compute, batch_size: int = 1000) -> int:
+    # Sets field = compute(source value) on quotes missing it, a batch of
+    # bulk updates at a time. compute runs in a thread so a background
+    # backfill doesn't stall requests.
+    def updates(quotes):
+        return [
+            UpdateOne({"_id": quote["_id"]}, {"$set": {field: compute(quote.get(source))}})
+            for quote in quotes
+        ]
+
+    updated = 0
+    cursor = database.quotes.find({field: {"$exists": False}}, {source: 1}).batch_size(batch_size)
+    while True:
+        quotes = await cursor.to_list(length=batch_size)
+        if not quotes:
+            break
+        await database.quotes.bulk_write(await asyncio.to_thread(updates, quotes), ordered=False)
+        updated += len(quotes)
+    return updated
+
+
+async def backfill_quote_dup_bands(database):
+    # Band hashes for the near-duplicate index on quotes stored before it existed
+    updated = await _backfill_in_batches(database, "dup_bands", "quote", lambda text: signature_bands(text or ""))
+    logger.info(f"Backfilled dup_bands on {updated} quotes")
+
+
+async def backfill_quote_random_key(database):
+    result = await database.quotes.update_many(
+        {"random_key": {"$exists": False}},
+        [{"$set": {"random_key": {"$rand": {}}}}]
+    )
+    logger.info(f"Backfilled random_key on {result.modified_count} quotes")
+
+
+async def backfill_quote_tag_list(database):
+    updated = await _backfill_in_batches(database, "tag_list", "tags", tag_list)
+    logger.info(f"Backfilled tag_list on {updated} quotes")
+
+
+async def drop_quote_user_id_index(database):
+    # Superseded by (user_id, _id), which serves the same lookups through its prefix
+    existing = await database.quotes.index_information()
+    if "user_id_1" in existing:
+        await database.quotes.drop_index("user_id_1")
+        logger.info("Dropped index quotes.user_id_1")
+
+
+async def backfill_quote_dup_text_hash(database):
+    updated = await _backfill_in_batches(database, "dup_text_hash", "quote", lambda text: text_hash(text or ""))
+    logger.info(f"Backfilled dup_text_hash on {updated} quotes")
+
+
+# Data migrations, applied once each in this order and recorded in the migrations collection
+MIGRATIONS = [
+    ("0001_backfill_quote_score", backfill_quote_score),
+    ("0002_backfill_quote_updated_at", backfill_quote_updated_at),
+    ("0003_backfill_quote_dup_bands", backfill_quote_dup_bands),
+    ("0004_backfill_quote_random_key", backfill_quote_random_key),
+    ("0005_backfill_quote_tag_list", backfill_quote_tag_list),
+    ("0006_drop_quote_user_id_index", drop_quote_user_id_index),
+    ("0007_backfill_quote_dup_text_hash", backfill_quote_dup_text_hash),
+]
+
+
+def _declared_spec(model: IndexModel) -> dict:
+    document = model.document
+    spec = {"key": list(document["key"].items())}
+    for option in COMPARED_OPTIONS:
+        if option in document:
+            spec[option] = document[option]
+    return spec
+
+
+def _existing_spec(info: dict) -> dict:
+    spec = {"key": [(field, direction) for field, direction in info["key"]]}
+    for option in COMPARED_OPTIONS:
+        if option in info:
+            spec[option] = info[option]
+    return spec
+
+
+async def ensure_indexes(database, create: bool = True) -> dict:
+    # Creates missing indexes and logs drift between the registry and the server.
+    # Drifted or unknown indexes are only reported, never dropped.
+    report = {"created": [], "missing": [], "drift": [], "unknown": []}
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        missing = []
+        for model in models:
+            name = model.document["name"]
+            declared = _declared_spec(model)
+            if name not in existing:
+                missing.append(model)
+                continue
+            actual = _existing_spec(existing[name])
+            if actual != declared:
+                report["drift"].append(f"{collection_name}.{name}")
+                logger.warning(f"Index drift on {collection_name}.{name}: expected {declared}, found {actual}")
+
+        declared_names = {model.document["name"] for model in models} | {"_id_"}
+        for name in existing:
+            if name not in declared_names:
+                report["unknown"].append(f"{collection_name}.{name}")
+                logger.warning(f"Index drift on {collection_name}: {name} is not in the index registry")
+
+        if not missing:
+            continue
+        names = [f"{collection_name}.{model.document['name']}" for model in missing]
+        if create:
+            await collection.create_indexes(missing)
+            report["created"].extend(names)
+            logger.info(f"Created indexes: {', '.join(names)}")
+        else:
+            report["missing"].extend(names)
+            logger.warning(f"Missing indexes: {', '.join(names)}")
+    return report
+
+
+async def apply_migrations(database, dry_run: bool = False) -> list:
+    applied = {doc["_id"] async for doc in database.migrations.find({}, {"_id": 1})}
+    pending = [(name, migration) for name, migration in MIGRATIONS if name not in applied]
+    for name, migration in pending:
+        if dry_run:
+            logger.info(f"Pending migration: {name}")
+            continue
+        logger.info(f"Applying migration {name}")
+        await migration(database)
+        await database.migrations.insert_one({"_id": name, "applied_at": datetime.utcnow()})
+    return [name for name, _ in pending]
+
+
+async def run_migrations(database, dry_run: bool = False) -> dict:
+    report = await ensure_indexes(database, create=not dry_run)
+    report["migrations"] = await apply_migrations(database, dry_run=dry_run)
+    return report
+
+
+async def missing_indexes(database) -> list:
+    # Declared indexes that do not exist yet, without creating or logging anything
+    missing = []
+    for collection_name, models in INDEXES.items():
+        existing = await database[collection_name].index_information()
+        missing.extend(
+            f"{collection_name}.{model.document['name']}"
+            for model in models if model.document["name"] not in existing
+        )
+    return missing
+
+
+async def _main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongodb_url or settings.MONGODB_URL)
+    try:
+        report = await run_migrations(client[args.db_name or settings.DB_NAME], dry_run=args.check)
+    finally:
+        client.close()
+    for key, items in report.items():
+        print(f"{key}: {', '.join(items) if items else '-'}")
+    # In check mode a non-zero exit signals that the database is not up to date
+    if args.check and (report["missing"] or report["drift"] or report["migrations"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    from app.core.logging_setup import configure_logging
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Build missing indexes and apply data migrations")
+    parser.add_argument("--check", action="store_true", help="only report missing indexes, drift and pending migrations")
+    parser.add_argument("--mongodb-url", default=None)
+    parser.add_argument("--db-name", default=None)
+    raise SystemExit(asyncio.run(_main(parser.parse_args())))
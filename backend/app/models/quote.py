@@ -1,8 +1,10 @@
-from typing import Optional, Any, Annotated
-from pydantic import BaseModel, Field, GetJsonSchemaHandler
+from functools import lru_cache
+from typing import Optional, Any, Annotated, List, Tuple
+from pydantic import BaseModel, ConfigDict, Field, GetJsonSchemaHandler, TypeAdapter, create_model
 from pydantic.json_schema import JsonSchemaValue
 from datetime import datetime
 from bson import ObjectId
+import re
 
 class PyObjectId(ObjectId):
     @classmethod
@@ -19,6 +21,16 @@ class PyObjectId(ObjectId):
     def __get_pydantic_json_schema__(cls, _core_schema: Any, _handler: GetJsonSchemaHandler) -> JsonSchemaValue:
         return {"type": "string"}
 
+_TAG_SEPARATORS = re.compile(r"[,\s]+")
+
+def tag_list(tags: Optional[str]) -> List[str]:
+    # "#Life, #wisdom" -> ["life", "wisdom"]; stored alongside tags so tag
+    # filters can use an index instead of a regex over the tags string
+    if not tags:
+        return []
+    names = (name.lstrip("#").lower() for name in _TAG_SEPARATORS.split(tags))
+    return list(dict.fromkeys(name for name in names if name))
+
 class QuoteBase(BaseModel):
     quote: str
     author: str
@@ -49,3 +61,45 @@ class Quote(QuoteBase):
         json_encoders = {ObjectId: str}
         populate_by_name = True
         arbitrary_types_allowed = True
+
+# Fields a client can select with ?fields=; "_id" is always returned
+SELECTABLE_QUOTE_FIELDS = frozenset(name for name in Quote.model_fields if name != "id")
+
+@lru_cache(maxsize=128)
+def quote_fields_model(fields: Tuple[str, ...]) -> type:
+    # Quote model carrying only the selected fields. Keyed by the sorted field
+    # tuple, so each selection builds its model once.
+    definitions = {"id": (str, Field(alias="_id"))}
+    for name in fields:
+        field = Quote.model_fields[name]
+        default = None if field.is_required() or field.default_factory is not None else field.default
+        definitions[name] = (Optional[field.annotation], default)
+    return create_model(
+        "QuoteFields_" + "_".join(fields),
+        __config__=ConfigDict(populate_by_name=True),
+        **definitions
+    )
+
+@lru_cache(maxsize=256)
+def quote_fields_adapter(fields: Tuple[str, ...], many: bool = True) -> TypeAdapter:
+    model = quote_fields_model(fields)
+    return TypeAdapter(List[model] if many else model)
+
+class QuoteTombstone(BaseModel):
+    id: str = Field(alias="_id")
+    deleted_at: datetime
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class QuotePage(BaseModel):
+    items: List[Quote]
+    total: int
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class QuoteChanges(BaseModel):
+    upserts: List[Quote]
+    deletes: List[QuoteTombstone]
+    # Pass back as ?since= to get the changes after this batch
+    next_token: Optional[str] = None
+    has_more: bool
@@ -34,6 +34,9 @@ class UserUpdate(BaseModel):
     password: Optional[str] = Field(None, min_length=6)
     is_active: Optional[bool] = None
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class User(UserBase):
     id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
     created_at: datetime = Field(default_factory=datetime.utcnow)
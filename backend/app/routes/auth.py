@@ -1,49 +1,42 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta, datetime
-from app.models.user import UserCreate, User
+from app.models.user import UserCreate, User, RefreshTokenRequest
 from app.auth import (
     authenticate_user,
     create_access_token,
+    create_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
     get_password_hash,
     get_current_user
 )
 from app.database import db
 from app.config import settings
+from app.core.dependencies import enforce_auth_rate_limit
+from app.core.logging_setup import fingerprint
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import logging
 import traceback
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=User)
-async def register(user: UserCreate):
+async def register(user: UserCreate, request: Request):
+    # Throttle before the duplicate check and password hashing
+    enforce_auth_rate_limit(request, user.email)
     try:
-        # Log the registration attempt
-        logger.info(f"Registration attempt for email: {user.email}")
-        
-        # Check if user already exists
-        existing_user = await db.get_db().users.find_one({"email": user.email})
-        if existing_user:
-            logger.warning(f"Registration failed: Email {user.email} already registered")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered. Please use a different email or try logging in."
-            )
-
-        # Create new user
+        # Create new user. Duplicate emails are rejected by the unique index
+        # on users.email, so the insert is the only round trip.
         user_dict = user.model_dump()
         user_dict["password"] = get_password_hash(user_dict["password"])
         user_dict["created_at"] = datetime.utcnow()
         user_dict["updated_at"] = datetime.utcnow()
         
-        # Log the user data (excluding password)
-        logger.info(f"Creating user with data: {user_dict.get('name')}, {user_dict.get('email')}")
-        
         try:
             result = await db.get_db().users.insert_one(user_dict)
             if not result.inserted_id:
@@ -52,26 +45,25 @@ async def register(user: UserCreate):
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to create user"
                 )
+        except DuplicateKeyError:
+            logger.warning("Registration failed: email already registered", extra={"email_hash": fingerprint(user.email)})
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered. Please use a different email or try logging in."
+            )
+        except HTTPException:
+            raise
         except Exception as db_error:
             logger.error(f"Database error during user creation: {str(db_error)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Database error while creating user"
             )
-        
-        # Verify user was created
-        created_user = await db.get_db().users.find_one({"_id": result.inserted_id})
-        if not created_user:
-            logger.error(f"User creation verification failed: User not found after creation")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="User created but not found"
-            )
             
-        logger.info(f"Successfully created user with email: {user.email}")
-        # Convert ObjectId to string for Pydantic model
-        created_user["_id"] = str(created_user["_id"])
-        return User(**created_user)
+        logger.info("User registered", extra={"event": "auth.register", "user_id": str(result.inserted_id)})
+        # The inserted payload is the stored document; convert ObjectId to string for Pydantic model
+        user_dict["_id"] = str(result.inserted_id)
+        return User(**user_dict)
         
     except HTTPException as he:
         # Re-raise HTTP exceptions as they are already properly formatted
@@ -86,14 +78,14 @@ async def register(user: UserCreate):
         )
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    # Throttle before the password is verified
+    enforce_auth_rate_limit(request, form_data.username)
     try:
-        logger.info(f"Login attempt for email: {form_data.username}")
-        
         # Authenticate user
         user = await authenticate_user(form_data.username, form_data.password)
         if not user:
-            logger.warning(f"Login failed: Invalid credentials for email: {form_data.username}")
+            logger.warning("Login failed: invalid credentials", extra={"email_hash": fingerprint(form_data.username)})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -105,10 +97,12 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         access_token = create_access_token(
             data={"sub": user.email}, expires_delta=access_token_expires
         )
+        refresh_token = await create_refresh_token(user.email)
         
-        logger.info(f"Successful login for email: {form_data.username}")
+        logger.info("Login succeeded", extra={"event": "auth.login", "user_id": str(user.id)})
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": str(user.id),
@@ -127,6 +121,36 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             detail="An unexpected error occurred during login"
         )
 
+@router.post("/refresh")
+async def refresh_access_token(body: RefreshTokenRequest):
+    # Renews the session without a password check: signature check plus one
+    # indexed update in the revocation store. The presented token is rotated.
+    try:
+        tokens = await rotate_refresh_token(body.refresh_token)
+    except Exception as e:
+        logger.error(f"Unexpected error during token refresh: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred during token refresh"
+        )
+    if tokens is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token, refresh_token = tokens
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post("/logout")
+async def logout(body: RefreshTokenRequest):
+    await revoke_refresh_token(body.refresh_token)
+    return {"message": "Logged out successfully"}
+
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
@@ -159,20 +183,12 @@ async def update_theme_preference(theme: str = Query(...), current_user: User =
                 detail="Theme must be either 'light' or 'dark'"
             )
         
-        # Update the user's theme preference
-        result = await db.get_db().users.update_one(
+        # Update the user's theme preference and get the updated user back in one round trip
+        updated_user = await db.get_db().users.find_one_and_update(
             {"_id": ObjectId(current_user.id)},
-            {"$set": {"theme_preference": theme, "updated_at": datetime.utcnow()}}
+            {"$set": {"theme_preference": theme, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update theme preference"
-            )
-            
-        # Get the updated user
-        updated_user = await db.get_db().users.find_one({"_id": ObjectId(current_user.id)})
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
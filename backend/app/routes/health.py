@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.pool_stats import pool_stats
+from app.core.readiness import readiness
+from app.core.slow_queries import slow_queries
+from app.config import settings
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("/ready")
+async def get_readiness():
+    # 503 until MongoDB is reachable and indexes are verified, so load balancers
+    # only route traffic to workers that finished their background startup
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+@router.get("/pool")
+async def get_pool_stats():
+    # Connection pool usage per MongoDB server, aggregated from pymongo pool events
+    return {
+        "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+        "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "pools": pool_stats.snapshot(),
+    }
+
+@router.get("/slow-queries")
+async def get_slow_queries():
+    # Most recent slow MongoDB operations; literals are stripped from query shapes
+    return {
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "operations": slow_queries.snapshot(),
+    }
@@ -1,57 +1,292 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
-from typing import List, Optional
-from app.models.quote import Quote, QuoteCreate, QuoteUpdate
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.models.quote import (
+    Quote, QuoteChanges, QuoteCreate, QuoteUpdate, QuotePage, SELECTABLE_QUOTE_FIELDS, quote_fields_adapter,
+    tag_list
+)
+from app.config import settings
+from app.core.near_duplicates import find_near_duplicate, signature_bands, text_hash
 from app.database import db
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
 from app.auth import get_current_user, get_current_user_optional
 from app.models.user import User
+import base64
+import binascii
 import logging
+import random
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/quotes", tags=["quotes"])
 
+async def raise_missing_or_forbidden(quote_id: str, action: str):
+    # Only reached when an owner-filtered write matched nothing
+    if await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)}, {"_id": 1}):
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this quote")
+    raise HTTPException(status_code=404, detail="Quote not found")
+
+# Maps a quote counter to the user array that records the reaction
+REACTION_LISTS = {"likes": "liked_quotes", "dislikes": "disliked_quotes"}
+# ...and to the per-user flag on returned quotes (is_liked, is_disliked)
+REACTION_FLAGS = {"likes": "liked", "dislikes": "disliked"}
+
+# How each counter contributes to the stored score (likes - dislikes)
+SCORE_WEIGHTS = {"likes": 1, "dislikes": -1}
+
+FEED_SORT = [("score", -1), ("likes", -1), ("_id", -1)]
+
+FIELDS_DESCRIPTION = "Comma-separated quote fields to return, e.g. quote,author. _id is always included."
+
+# Stored fields a selected response field is built from; fields not listed
+# here are read as is, and is_liked/is_disliked only need the quote's _id
+FIELD_SOURCES = {"user_name": ("user_id", "user_name"), "is_liked": (), "is_disliked": ()}
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    # None means the full document
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()} - {"_id", "id"}
+    unknown = requested - SELECTABLE_QUOTE_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(SELECTABLE_QUOTE_FIELDS))}"
+        )
+    return tuple(sorted(requested))
+
+# Internal fields never returned to clients
+FULL_PROJECTION = {"dup_bands": 0, "dup_text_hash": 0, "random_key": 0, "tag_list": 0}
+
+def fields_projection(fields: Optional[Tuple[str, ...]]) -> dict:
+    if fields is None:
+        return dict(FULL_PROJECTION)
+    projection = {"_id": 1}
+    for name in fields:
+        for source in FIELD_SOURCES.get(name, (name,)):
+            projection[source] = 1
+    return projection
+
+def wants(fields: Optional[Tuple[str, ...]], *names: str) -> bool:
+    return fields is None or any(name in fields for name in names)
+
+def sparse_response(data, fields: Tuple[str, ...]) -> Response:
+    # Serialized with a model holding only the selected fields, bypassing the
+    # full response model (which would fill every missing field with its default)
+    many = isinstance(data, list)
+    for quote in data if many else [data]:
+        quote["_id"] = str(quote["_id"])
+    adapter = quote_fields_adapter(fields, many)
+    return Response(adapter.dump_json(adapter.validate_python(data), by_alias=True), media_type="application/json")
+
+def with_score(counter_update: dict) -> dict:
+    # Adds the matching score change to a $inc on likes/dislikes
+    counter_update["score"] = sum(SCORE_WEIGHTS[field] * delta for field, delta in counter_update.items())
+    return counter_update
+
+def now() -> datetime:
+    # MongoDB stores milliseconds; truncating here keeps sync tokens exact
+    moment = datetime.utcnow()
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000)
+
+def counter_write(counter_update: dict) -> dict:
+    # Every write to a quote moves updated_at so delta sync picks it up
+    return {"$inc": with_score(counter_update), "$set": {"updated_at": now()}}
+
+EPOCH = datetime(1970, 1, 1)
+
+# Sorts after every real _id, so a position (until, LAST_OBJECT_ID) is past everything before until
+LAST_OBJECT_ID = ObjectId("f" * 24)
+
+def to_millis(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(milliseconds=1)
+
+def encode_sync_token(moment: datetime, object_id: ObjectId, issued_at: datetime) -> str:
+    # Opaque to clients: the (timestamp, _id) position reached, and when the
+    # token was handed out. Expiry goes by the latter: a client is only at
+    # risk of missing a tombstone once it has not synced for the retention period.
+    raw = f"{to_millis(moment)}:{object_id}:{to_millis(issued_at)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_sync_token(token: str) -> Tuple[Tuple[datetime, ObjectId], datetime]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        parts = raw.split(":")
+        if len(parts) == 2:
+            parts.append(parts[0])  # Tokens from before issued_at was recorded
+        millis, object_id, issued_millis = parts
+        position = (EPOCH + timedelta(milliseconds=int(millis)), ObjectId(object_id))
+        return position, EPOCH + timedelta(milliseconds=int(issued_millis))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+def after_position(field: str, position: Optional[Tuple[datetime, ObjectId]], until: datetime) -> dict:
+    # Documents strictly after position in (field, _id) order, up to until
+    bound = {"$lt": until}
+    if position is None:
+        return {field: bound}
+    moment, object_id = position
+    return {"$and": [
+        {field: bound},
+        {"$or": [{field: {"$gt": moment}}, {field: moment, "_id": {"$gt": object_id}}]},
+    ]}
+
+def encode_feed_cursor(quote: dict) -> str:
+    # Opaque to clients: the (score, likes, _id) position of the last quote returned
+    raw = f"{quote.get('score', 0)}:{quote.get('likes', 0)}:{quote['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_feed_cursor(cursor: str) -> dict:
+    # Quotes strictly after the cursor in FEED_SORT order (all keys descending)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, likes, object_id = raw.split(":")
+        score, likes, object_id = int(score), int(likes), ObjectId(object_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"score": {"$lt": score}},
+        {"score": score, "likes": {"$lt": likes}},
+        {"score": score, "likes": likes, "_id": {"$lt": object_id}},
+    ]}
+
+def mark_reactions(quotes: list, liked, disliked):
+    for quote in quotes:
+        quote["is_liked"] = str(quote["_id"]) in liked
+        quote["is_disliked"] = str(quote["_id"]) in disliked
+
+async def toggle_reaction(quote_id: str, current_user: User, counter: str, opposite: str) -> dict:
+    # Toggles the user's reaction and returns the quote's counters and the
+    # user's reaction state afterwards, so clients can reconcile without a
+    # refetch. Three round trips: read the reaction state, bump the counters
+    # (which doubles as the existence check) and update the user's lists.
+    reaction_list = REACTION_LISTS[counter]
+    opposite_list = REACTION_LISTS[opposite]
+
+    # Only fetch whether this quote is in the user's lists, not the whole arrays
+    user = await db.get_db().users.find_one(
+        {"_id": ObjectId(current_user.id)},
+        {
+            reaction_list: {"$elemMatch": {"$eq": quote_id}},
+            opposite_list: {"$elemMatch": {"$eq": quote_id}},
+        }
+    ) or {}
+    already_reacted = quote_id in user.get(reaction_list, [])
+
+    if already_reacted:
+        # User has already reacted, remove the reaction
+        counter_update = {counter: -1}
+        user_update = {"$pull": {reaction_list: quote_id}}
+    else:
+        counter_update = {counter: 1}
+        user_update = {"$addToSet": {reaction_list: quote_id}}
+        # Adding a reaction replaces the opposite one
+        if quote_id in user.get(opposite_list, []):
+            counter_update[opposite] = -1
+            user_update["$pull"] = {opposite_list: quote_id}
+
+    counters = await db.get_db().quotes.find_one_and_update(
+        {"_id": ObjectId(quote_id)},
+        counter_write(counter_update),
+        projection={"_id": 0, "likes": 1, "dislikes": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if counters is None:
+        raise HTTPException(status_code=404, detail="Quote not found")
+
+    await db.get_db().users.update_one({"_id": ObjectId(current_user.id)}, user_update)
+    added = not already_reacted
+    return {
+        "added": added,
+        "likes": counters.get("likes", 0),
+        "dislikes": counters.get("dislikes", 0),
+        f"is_{REACTION_FLAGS[counter]}": added,
+        f"is_{REACTION_FLAGS[opposite]}": False if added else quote_id in user.get(opposite_list, []),
+    }
+
 @router.get("/", response_model=List[Quote])
-async def get_quotes(current_user: Optional[User] = Depends(get_current_user_optional)):
-    # Get all quotes and calculate their score (likes - dislikes)
-    quotes = await db.get_db().quotes.find().to_list(length=100)
-    
-    # Sort quotes by score (likes - dislikes) in descending order
-    # First sort by the difference between likes and dislikes
-    # For quotes with the same difference, sort by total likes
-    quotes.sort(key=lambda x: (
-        x.get("likes", 0) - x.get("dislikes", 0),  # Primary sort by net score
-        x.get("likes", 0)  # Secondary sort by total likes
-    ), reverse=True)
+async def get_quotes(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    selected = parse_fields(fields)
+    # Sort quotes by score (likes - dislikes) in descending order, then by total likes.
+    # The stored score field lets MongoDB serve this from the feed index.
+    quotes = await db.get_db().quotes.find({}, fields_projection(selected)).sort(FEED_SORT).to_list(length=100)
     
     # Get user's liked and disliked quotes if user is authenticated
     user_liked_quotes = []
     user_disliked_quotes = []
-    if current_user:
-        user = await db.get_db().users.find_one({"_id": ObjectId(current_user.id)})
+    with_reactions = wants(selected, "is_liked", "is_disliked")
+    if current_user and with_reactions:
+        user = await db.get_db().users.find_one(
+            {"_id": ObjectId(current_user.id)}, {"liked_quotes": 1, "disliked_quotes": 1}
+        )
         user_liked_quotes = user.get("liked_quotes", [])
         user_disliked_quotes = user.get("disliked_quotes", [])
     
     # Populate user information and liked/disliked status for each quote
+    with_user_name = wants(selected, "user_name")
     for quote in quotes:
-        if quote.get("user_id"):
-            user = await db.get_db().users.find_one({"_id": ObjectId(quote["user_id"])})
+        if with_user_name and quote.get("user_id"):
+            user = await db.get_db().users.find_one({"_id": ObjectId(quote["user_id"])}, {"name": 1})
             if user:
                 quote["user_name"] = user.get("name", "Unknown User")
-        # Add is_liked and is_disliked fields (only if user is authenticated)
-        quote["is_liked"] = str(quote["_id"]) in user_liked_quotes if current_user else False
-        quote["is_disliked"] = str(quote["_id"]) in user_disliked_quotes if current_user else False
+        if with_reactions:
+            # Add is_liked and is_disliked fields (only if user is authenticated)
+            quote["is_liked"] = str(quote["_id"]) in user_liked_quotes if current_user else False
+            quote["is_disliked"] = str(quote["_id"]) in user_disliked_quotes if current_user else False
     
+    if selected is not None:
+        return sparse_response(quotes, selected)
     return quotes
 
-@router.get("/search")
+@router.get("/feed", response_model=QuotePage)
+async def get_quote_feed(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    # The feed of GET / a page at a time, keyset-paginated over the feed index,
+    # so deep pages cost the same as the first one
+    query = decode_feed_cursor(cursor) if cursor else {}
+    quotes = await db.get_db().quotes.find(
+        query, fields_projection(None)
+    ).sort(FEED_SORT).to_list(length=limit + 1)
+    total = await db.get_db().quotes.estimated_document_count()
+
+    has_more = len(quotes) > limit
+    quotes = quotes[:limit]
+    next_cursor = encode_feed_cursor(quotes[-1]) if has_more else None
+
+    user_ids = {ObjectId(quote["user_id"]) for quote in quotes if ObjectId.is_valid(quote.get("user_id", ""))}
+    if user_ids:
+        names = {
+            str(user["_id"]): user.get("name", "Unknown User")
+            async for user in db.get_db().users.find({"_id": {"$in": list(user_ids)}}, {"name": 1})
+        }
+        for quote in quotes:
+            if quote.get("user_id") in names:
+                quote["user_name"] = names[quote["user_id"]]
+    liked = disliked = ()
+    if current_user:
+        user = await db.get_db().users.find_one(
+            {"_id": ObjectId(current_user.id)}, {"liked_quotes": 1, "disliked_quotes": 1}
+        ) or {}
+        liked, disliked = set(user.get("liked_quotes", [])), set(user.get("disliked_quotes", []))
+    mark_reactions(quotes, liked, disliked)
+    return {"items": quotes, "total": total, "next_cursor": next_cursor}
+
+@router.get("/search", response_model=List[Quote])
 async def search_quotes(
     author: Optional[str] = None,
     quote: Optional[str] = None,
-    tags: Optional[str] = None
+    tags: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
+    selected = parse_fields(fields)
     query = {}
     if author:
         query["author"] = {"$regex": author, "$options": "i"}
@@ -60,38 +295,283 @@ async def search_quotes(
     if tags:
         query["tags"] = {"$regex": tags, "$options": "i"}
 
-    quotes = await db.get_db().quotes.find(query).to_list(length=None)
+    quotes = await db.get_db().quotes.find(query, fields_projection(selected)).to_list(length=None)
     
     # Populate user information for each quote
-    for quote in quotes:
-        if quote.get("user_id"):
-            user = await db.get_db().users.find_one({"_id": ObjectId(quote["user_id"])})
-            if user:
-                quote["user_name"] = user.get("name", "Unknown User")
+    if wants(selected, "user_name"):
+        for quote in quotes:
+            if quote.get("user_id"):
+                user = await db.get_db().users.find_one({"_id": ObjectId(quote["user_id"])}, {"name": 1})
+                if user:
+                    quote["user_name"] = user.get("name", "Unknown User")
     
+    if selected is not None:
+        return sparse_response(quotes, selected)
     return quotes
 
+@router.get("/changes", response_model=QuoteChanges)
+async def get_quote_changes(
+    since: Optional[str] = Query(None, description="next_token from the previous sync; omit for a full initial sync"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=5000),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    # Quotes created or changed and quotes deleted since the token, oldest
+    # first. Both collections are read in (timestamp, _id) order and merged,
+    # so a page costs O(limit) index reads however large the collection is.
+    position, issued_at = decode_sync_token(since) if since else (None, None)
+    if issued_at is not None and issued_at < datetime.utcnow() - timedelta(days=settings.QUOTE_TOMBSTONE_RETENTION_DAYS):
+        # Deletes since the client last synced may have had their tombstones removed
+        raise HTTPException(status_code=410, detail="Sync token expired, reload all quotes")
+
+    until = now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    quotes = await db.get_db().quotes.find(
+        after_position("updated_at", position, until), fields_projection(None)
+    ).sort([("updated_at", 1), ("_id", 1)]).to_list(length=limit + 1)
+    # A client without a token holds no quotes, so there is nothing to delete
+    tombstones = []
+    if position is not None:
+        tombstones = await db.get_db().quote_tombstones.find(
+            after_position("deleted_at", position, until)
+        ).sort([("deleted_at", 1), ("_id", 1)]).to_list(length=limit + 1)
+
+    changes = sorted(
+        [(quote["updated_at"], quote["_id"], quote) for quote in quotes]
+        + [(tombstone["deleted_at"], tombstone["_id"], None) for tombstone in tombstones],
+        key=lambda change: change[:2]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    upserts = [quote for _, _, quote in changes if quote is not None]
+    deletes = [{"_id": str(object_id), "deleted_at": moment} for moment, object_id, quote in changes if quote is None]
+    if current_user and upserts:
+        user = await db.get_db().users.find_one(
+            {"_id": ObjectId(current_user.id)}, {"liked_quotes": 1, "disliked_quotes": 1}
+        ) or {}
+        mark_reactions(upserts, set(user.get("liked_quotes", [])), set(user.get("disliked_quotes", [])))
+
+    if has_more:
+        next_token = encode_sync_token(changes[-1][0], changes[-1][1], now())
+    else:
+        # Caught up: everything before until has been returned, so the next sync
+        # starts there, and the token is fresh even when nothing changed
+        next_token = encode_sync_token(until, LAST_OBJECT_ID, now())
+    return {"upserts": upserts, "deletes": deletes, "next_token": next_token, "has_more": has_more}
+
+@router.get("/mine", response_model=QuotePage)
+async def get_my_quotes(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    # Newest first, keyset-paginated on _id over the (user_id, _id) index
+    query = {"user_id": str(current_user.id)}
+    page_query = dict(query)
+    if cursor:
+        if not ObjectId.is_valid(cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page_query["_id"] = {"$lt": ObjectId(cursor)}
+    quotes = await db.get_db().quotes.find(
+        page_query, fields_projection(None)
+    ).sort("_id", -1).to_list(length=limit + 1)
+    total = await db.get_db().quotes.count_documents(query)
+
+    has_more = len(quotes) > limit
+    quotes = quotes[:limit]
+    if quotes:
+        user = await db.get_db().users.find_one(
+            {"_id": ObjectId(current_user.id)}, {"liked_quotes": 1, "disliked_quotes": 1}
+        ) or {}
+        mark_reactions(quotes, set(user.get("liked_quotes", [])), set(user.get("disliked_quotes", [])))
+    return {"items": quotes, "total": total, "next_cursor": str(quotes[-1]["_id"]) if has_more else None}
+
+def encode_reaction_cursor(position: int, quote_id: str) -> str:
+    # Opaque to clients: the last quote returned and where it sat in the reaction list
+    raw = f"{position}:{quote_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_reaction_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position, quote_id = raw.split(":")
+        position = int(position)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if position < 0 or not ObjectId.is_valid(quote_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position, quote_id
+
+async def reacted_quotes_page(current_user: User, counter: str, cursor: Optional[str], limit: int) -> dict:
+    # Most recent reaction first. The user's list records reactions in the
+    # order they were made, so a page is a slice of it read on the server
+    # (the whole list never leaves MongoDB), then one _id lookup for the quotes.
+    # The cursor seeks to the last quote returned, wherever reactions made or
+    # undone since have moved it. Only if that quote itself was unreacted is
+    # its remembered position used, which may skip or repeat a few entries.
+    position, last_id = decode_reaction_cursor(cursor) if cursor else (None, None)
+    reaction_list = REACTION_LISTS[counter]
+    users = db.get_db().users
+    user_filter = {"_id": ObjectId(current_user.id)}
+    entries = {"$ifNull": [f"${reaction_list}", []]}
+    fields = {"total": {"$size": entries}}
+    if last_id:
+        fields["found"] = {"$indexOfArray": [entries, last_id]}
+    sizes = await users.aggregate([{"$match": user_filter}, {"$project": fields}]).to_list(length=1)
+    if not sizes:
+        raise HTTPException(status_code=404, detail="User not found")
+    total = sizes[0]["total"]
+
+    # The page is the `limit` entries before `end`, newest first
+    if last_id is None:
+        end = total
+    elif sizes[0].get("found", -1) >= 0:
+        end = sizes[0]["found"]
+    else:
+        end = min(position, total)
+    start = max(end - limit, 0)
+    ids = []
+    if end > start:
+        user = await users.find_one(user_filter, {"_id": 0, reaction_list: {"$slice": [start, end - start]}})
+        ids = (user or {}).get(reaction_list, [])[::-1]
+
+    quotes = []
+    if ids:
+        found = await db.get_db().quotes.find(
+            {"_id": {"$in": [ObjectId(quote_id) for quote_id in ids if ObjectId.is_valid(quote_id)]}},
+            fields_projection(None)
+        ).to_list(length=len(ids))
+        by_id = {str(quote["_id"]): quote for quote in found}
+        quotes = [by_id[quote_id] for quote_id in ids if quote_id in by_id]
+        mark_reactions(quotes, ids if counter == "likes" else (), ids if counter == "dislikes" else ())
+        # Ids of deleted quotes are left in the list by delete_quote; drop the ones
+        # this page ran into so the total stops counting them. Entries before
+        # `start` keep their positions, so the cursor below stays valid.
+        dangling = [quote_id for quote_id in ids if quote_id not in by_id]
+        if dangling:
+            await users.update_one(user_filter, {"$pull": {reaction_list: {"$in": dangling}}})
+            total -= len(dangling)
+
+    next_cursor = encode_reaction_cursor(start, ids[-1]) if ids and start > 0 else None
+    return {"items": quotes, "total": total, "next_cursor": next_cursor}
+
+@router.get("/liked", response_model=QuotePage)
+async def get_liked_quotes(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    return await reacted_quotes_page(current_user, "likes", cursor, limit)
+
+@router.get("/disliked", response_model=QuotePage)
+async def get_disliked_quotes(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    return await reacted_quotes_page(current_user, "dislikes", cursor, limit)
+
+async def pick_by_random_key(query: dict, projection: dict):
+    # The first quote at or after a random point in random_key order, wrapping
+    # around to the lowest key. One index seek on (author|tag_list, random_key).
+    pivot = random.random()
+    quotes = db.get_db().quotes
+    quote = await quotes.find_one({**query, "random_key": {"$gte": pivot}}, projection, sort=[("random_key", 1)])
+    if quote is None:
+        quote = await quotes.find_one({**query, "random_key": {"$lt": pivot}}, projection, sort=[("random_key", 1)])
+    return quote
+
+@router.get("/random", response_model=Quote)
+async def get_random_quote(
+    response: Response,
+    tag: Optional[str] = Query(None, description="Only quotes with this tag, with or without the leading #"),
+    author: Optional[str] = Query(None, description="Only quotes by this author (exact name)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    selected = parse_fields(fields)
+    projection = fields_projection(selected)
+    query = {}
+    if author:
+        query["author"] = author
+    if tag:
+        tags = tag_list(tag)
+        if len(tags) != 1:
+            raise HTTPException(status_code=400, detail="Give a single tag")
+        query["tag_list"] = tags[0]
+
+    if query:
+        quote = await pick_by_random_key(query, projection)
+    else:
+        # As the first stage, $sample reads one document through a random
+        # cursor: uniform and without scanning the collection
+        sampled = await db.get_db().quotes.aggregate(
+            [{"$sample": {"size": 1}}, {"$project": projection}]
+        ).to_list(length=1)
+        quote = sampled[0] if sampled else None
+
+    if not quote:
+        raise HTTPException(status_code=404, detail="No matching quote found")
+    # A new pick on every request; caches must not reuse it
+    response.headers["Cache-Control"] = "no-store"
+    if selected is not None:
+        sparse = sparse_response(quote, selected)
+        sparse.headers["Cache-Control"] = "no-store"
+        return sparse
+    return quote
+
 @router.get("/{quote_id}", response_model=Quote)
-async def get_quote(quote_id: str, current_user: User = Depends(get_current_user)):
+async def get_quote(
+    quote_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_user)
+):
     if not ObjectId.is_valid(quote_id):
         raise HTTPException(status_code=400, detail="Invalid quote ID")
+    selected = parse_fields(fields)
     
-    quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)})
+    quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)}, fields_projection(selected))
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
+    if selected is not None:
+        return sparse_response(quote, selected)
     return quote
 
 @router.post("/", response_model=Quote)
-async def create_quote(quote: QuoteCreate, current_user: User = Depends(get_current_user)):
+async def create_quote(
+    quote: QuoteCreate,
+    allow_duplicate: bool = Query(False, description="Create the quote even if a near-duplicate exists"),
+    current_user: User = Depends(get_current_user)
+):
+    bands = signature_bands(quote.quote)
+    if settings.DUPLICATE_DETECTION_ENABLED and not allow_duplicate:
+        match = await find_near_duplicate(db.get_db(), quote.quote, bands)
+        if match:
+            duplicate, similarity = match
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "Possible duplicate of an existing quote",
+                    "duplicate_of": str(duplicate["_id"]),
+                    "quote": duplicate.get("quote"),
+                    "author": duplicate.get("author"),
+                    "similarity": round(similarity, 3),
+                }
+            )
     try:
         quote_dict = quote.model_dump()
+        quote_dict["dup_bands"] = bands
+        quote_dict["dup_text_hash"] = text_hash(quote.quote)
+        quote_dict["random_key"] = random.random()
+        quote_dict["tag_list"] = tag_list(quote_dict.get("tags"))
         quote_dict["user_id"] = str(current_user.id)
         quote_dict["user_name"] = current_user.name
+        quote_dict["score"] = quote_dict["likes"] - quote_dict["dislikes"]
+        quote_dict["created_at"] = quote_dict["updated_at"] = now()
         result = await db.get_db().quotes.insert_one(quote_dict)
-        created_quote = await db.get_db().quotes.find_one({"_id": result.inserted_id})
-        if not created_quote:
-            raise HTTPException(status_code=500, detail="Failed to create quote")
-        return created_quote
+        # The inserted payload is the stored document, no need to read it back
+        quote_dict["_id"] = result.inserted_id
+        for internal in FULL_PROJECTION:
+            del quote_dict[internal]
+        return quote_dict
     except Exception as e:
         logger.error(f"Error creating quote: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create quote")
@@ -105,20 +585,27 @@ async def update_quote(
     if not ObjectId.is_valid(quote_id):
         raise HTTPException(status_code=400, detail="Invalid quote ID")
     
-    existing_quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)})
-    if not existing_quote:
-        raise HTTPException(status_code=404, detail="Quote not found")
-    
-    if str(existing_quote["user_id"]) != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Not authorized to update this quote")
-    
+    # Ownership is part of the filter so the update and the read-back are one round trip
+    owned_filter = {"_id": ObjectId(quote_id), "user_id": str(current_user.id)}
     update_data = quote.model_dump(exclude_unset=True)
-    await db.get_db().quotes.update_one(
-        {"_id": ObjectId(quote_id)},
-        {"$set": update_data}
-    )
+    if "quote" in update_data:
+        # Keeps the near-duplicate index in step with the text
+        update_data["dup_bands"] = signature_bands(update_data["quote"] or "")
+        update_data["dup_text_hash"] = text_hash(update_data["quote"] or "")
+    if "tags" in update_data:
+        update_data["tag_list"] = tag_list(update_data["tags"])
+    if update_data:
+        updated_quote = await db.get_db().quotes.find_one_and_update(
+            owned_filter,
+            {"$set": {**update_data, "updated_at": now()}},
+            projection=fields_projection(None),
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated_quote = await db.get_db().quotes.find_one(owned_filter, fields_projection(None))
     
-    updated_quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)})
+    if not updated_quote:
+        await raise_missing_or_forbidden(quote_id, "update")
     return updated_quote
 
 @router.delete("/{quote_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -126,14 +613,15 @@ async def delete_quote(quote_id: str, current_user: User = Depends(get_current_u
     if not ObjectId.is_valid(quote_id):
         raise HTTPException(status_code=400, detail="Invalid quote ID")
     
-    existing_quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)})
-    if not existing_quote:
-        raise HTTPException(status_code=404, detail="Quote not found")
-    
-    if str(existing_quote["user_id"]) != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Not authorized to delete this quote")
-    
-    await db.get_db().quotes.delete_one({"_id": ObjectId(quote_id)})
+    result = await db.get_db().quotes.delete_one(
+        {"_id": ObjectId(quote_id), "user_id": str(current_user.id)}
+    )
+    if result.deleted_count == 0:
+        await raise_missing_or_forbidden(quote_id, "delete")
+    # Left behind so clients holding the quote learn about the delete on their next sync
+    await db.get_db().quote_tombstones.insert_one({"_id": ObjectId(quote_id), "deleted_at": now()})
+    # Users' liked/disliked lists keep the id: reads skip ids without a quote,
+    # and reacted_quotes_page prunes them from the one user it is reading
     return None
 
 @router.post("/{quote_id}/likes/up")
@@ -141,52 +629,9 @@ async def like_quote(quote_id: str, current_user: User = Depends(get_current_use
     if not ObjectId.is_valid(quote_id):
         raise HTTPException(status_code=400, detail="Invalid quote ID")
 
-    # Check if user has already liked this quote
-    quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)})
-    if not quote:
-        raise HTTPException(status_code=404, detail="Quote not found")
-
-    # Get user's liked quotes
-    user = await db.get_db().users.find_one({"_id": ObjectId(current_user.id)})
-    liked_quotes = user.get("liked_quotes", [])
-    disliked_quotes = user.get("disliked_quotes", [])
-
-    if str(quote_id) in liked_quotes:
-        # User has already liked this quote, remove the like
-        await db.get_db().quotes.update_one(
-            {"_id": ObjectId(quote_id)},
-            {"$inc": {"likes": -1}}
-        )
-        # Remove quote from user's liked quotes
-        await db.get_db().users.update_one(
-            {"_id": ObjectId(current_user.id)},
-            {"$pull": {"liked_quotes": str(quote_id)}}
-        )
-        return {"message": "Like removed successfully"}
-    else:
-        # User hasn't liked this quote, add the like
-        await db.get_db().quotes.update_one(
-            {"_id": ObjectId(quote_id)},
-            {"$inc": {"likes": 1}}
-        )
-        # Add quote to user's liked quotes
-        await db.get_db().users.update_one(
-            {"_id": ObjectId(current_user.id)},
-            {"$addToSet": {"liked_quotes": str(quote_id)}}
-        )
-
-        # If user had disliked this quote, remove the dislike
-        if str(quote_id) in disliked_quotes:
-            await db.get_db().quotes.update_one(
-                {"_id": ObjectId(quote_id)},
-                {"$inc": {"dislikes": -1}}
-            )
-            await db.get_db().users.update_one(
-                {"_id": ObjectId(current_user.id)},
-                {"$pull": {"disliked_quotes": str(quote_id)}}
-            )
-
-        return {"message": "Like added successfully"}
+    reaction = await toggle_reaction(quote_id, current_user, "likes", "dislikes")
+    message = "Like added successfully" if reaction.pop("added") else "Like removed successfully"
+    return {"message": message, **reaction}
 
 @router.post("/{quote_id}/likes/down")
 async def unlike_quote(quote_id: str, current_user: User = Depends(get_current_user)):
@@ -195,7 +640,7 @@ async def unlike_quote(quote_id: str, current_user: User = Depends(get_current_u
 
     result = await db.get_db().quotes.update_one(
         {"_id": ObjectId(quote_id)},
-        {"$inc": {"likes": -1}}
+        counter_write({"likes": -1})
     )
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Quote not found")
@@ -207,52 +652,9 @@ async def dislike_quote(quote_id: str, current_user: User = Depends(get_current_
     if not ObjectId.is_valid(quote_id):
         raise HTTPException(status_code=400, detail="Invalid quote ID")
 
-    # Check if user has already disliked this quote
-    quote = await db.get_db().quotes.find_one({"_id": ObjectId(quote_id)})
-    if not quote:
-        raise HTTPException(status_code=404, detail="Quote not found")
-
-    # Get user's disliked quotes
-    user = await db.get_db().users.find_one({"_id": ObjectId(current_user.id)})
-    disliked_quotes = user.get("disliked_quotes", [])
-    liked_quotes = user.get("liked_quotes", [])
-
-    if str(quote_id) in disliked_quotes:
-        # User has already disliked this quote, remove the dislike
-        await db.get_db().quotes.update_one(
-            {"_id": ObjectId(quote_id)},
-            {"$inc": {"dislikes": -1}}
-        )
-        # Remove quote from user's disliked quotes
-        await db.get_db().users.update_one(
-            {"_id": ObjectId(current_user.id)},
-            {"$pull": {"disliked_quotes": str(quote_id)}}
-        )
-        return {"message": "Dislike removed successfully"}
-    else:
-        # User hasn't disliked this quote, add the dislike
-        await db.get_db().quotes.update_one(
-            {"_id": ObjectId(quote_id)},
-            {"$inc": {"dislikes": 1}}
-        )
-        # Add quote to user's disliked quotes
-        await db.get_db().users.update_one(
-            {"_id": ObjectId(current_user.id)},
-            {"$addToSet": {"disliked_quotes": str(quote_id)}}
-        )
-
-        # If user had liked this quote, remove the like
-        if str(quote_id) in liked_quotes:
-            await db.get_db().quotes.update_one(
-                {"_id": ObjectId(quote_id)},
-                {"$inc": {"likes": -1}}
-            )
-            await db.get_db().users.update_one(
-                {"_id": ObjectId(current_user.id)},
-                {"$pull": {"liked_quotes": str(quote_id)}}
-            )
-
-        return {"message": "Dislike added successfully"}
+    reaction = await toggle_reaction(quote_id, current_user, "dislikes", "likes")
+    message = "Dislike added successfully" if reaction.pop("added") else "Dislike removed successfully"
+    return {"message": message, **reaction}
 
 @router.post("/{quote_id}/dislike/down")
 async def remove_dislike(quote_id: str):
@@ -261,7 +663,7 @@ async def remove_dislike(quote_id: str):
 
     result = await db.get_db().quotes.update_one(
         {"_id": ObjectId(quote_id)},
-        {"$inc": {"dislikes": -1}}
+        counter_write({"dislikes": -1})
     )
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Quote not found")
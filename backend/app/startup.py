@@ -0,0 +1,63 @@
+from app.core.readiness import readiness
+from app.config import settings
+from app.core.startup_lock import claim_startup_work
+from app.database import db
+from app.migrations import missing_indexes, run_migrations
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_POLL_SECONDS = 2
+
+
+async def verify_indexes():
+    database = db.get_db()
+    if claim_startup_work():
+        # Index builds run server-side; the application keeps serving meanwhile
+        await run_migrations(database)
+        logger.info("Database indexes and migrations verified")
+        return
+    # Another worker builds them; wait until they exist
+    deadline = asyncio.get_running_loop().time() + settings.STARTUP_INDEX_WAIT_SECONDS
+    while True:
+        missing = await missing_indexes(database)
+        if not missing:
+            return
+        if claim_startup_work():
+            # The holder exited (its lock was released): take the work over
+            await run_migrations(database)
+            logger.info("Database indexes and migrations verified")
+            return
+        if asyncio.get_running_loop().time() >= deadline:
+            # The holder is alive but its migrations failed or hang
+            raise TimeoutError(f"Indexes still missing after {settings.STARTUP_INDEX_WAIT_SECONDS}s: {', '.join(missing)}")
+        await asyncio.sleep(INDEX_POLL_SECONDS)
+
+
+async def warm_up(app):
+    # Pays first-request costs before traffic arrives: pulls the feed index and
+    # hottest quotes into MongoDB's cache (and opens pooled connections) and
+    # builds the OpenAPI schema that /docs would otherwise build on first use
+    from app.routes.quotes import FEED_SORT
+
+    await db.get_db().quotes.find().sort(FEED_SORT).to_list(length=100)
+    await asyncio.to_thread(app.openapi)
+
+
+async def run_startup_work(app):
+    await readiness.run("database", db.wait_until_connected)
+    await asyncio.gather(
+        readiness.run("indexes", verify_indexes),
+        readiness.run("warmup", lambda: warm_up(app)),
+    )
+    if readiness.ready:
+        logger.info(f"Ready after {readiness.snapshot()['uptime_seconds']}s")
+
+
+def start_startup_work(app) -> asyncio.Task:
+    # Registered before the task starts, so /health/ready never sees an empty set of steps
+    readiness.register("database")
+    readiness.register("indexes")
+    readiness.register("warmup", required=False)
+    return asyncio.create_task(run_startup_work(app))
@@ -0,0 +1,148 @@
+"""
+CPU cost of response compression against bytes saved.
+
+Run from the backend directory:
+
+    python -m benchmarks.compression [--bandwidth-mbit 10]
+
+Payloads are JSON shaped like real API responses (a single quote, search
+results of several sizes and the 100-quote feed), built with the synthetic
+dataset generator. For each gzip level and brotli quality the table shows the
+compressed size, the compression time per response and how long the saved
+bytes would take to transfer at --bandwidth-mbit. Compression pays off where
+the transfer time saved is well above the CPU time spent.
+
+The overhead of CompressionMiddleware on responses below the size threshold,
+which pass through uncompressed, is measured as well.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.core.compression import CompressionMiddleware, brotli  # noqa: E402
+from app.core.metrics import MetricsRegistry  # noqa: E402
+from benchmarks.generate_data import DatasetGenerator  # noqa: E402
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def api_quotes(count: int) -> list:
+    # Quotes as the API returns them: string ids, ISO timestamps, reaction flags
+    generator = DatasetGenerator(users=200, quotes=max(count, 1000), reactions=5000, seed=1)
+    quotes = generator.quote_batch(0, 1000)[:count]
+    for quote in quotes:
+        quote["_id"] = str(quote["_id"])
+        for internal in ("dup_bands", "dup_text_hash", "random_key", "tag_list"):
+            del quote[internal]
+        quote["created_at"] = quote["created_at"].isoformat()
+        quote["updated_at"] = quote["updated_at"].isoformat()
+        quote["is_liked"] = False
+        quote["is_disliked"] = False
+    return quotes
+
+
+def payloads() -> dict:
+    quotes = api_quotes(1000)
+    return {
+        "single quote": json.dumps(quotes[0]).encode(),
+        "search (10)": json.dumps(quotes[:10]).encode(),
+        "feed (100)": json.dumps(quotes[:100]).encode(),
+        "search (1000)": json.dumps(quotes).encode(),
+    }
+
+
+def gzip_compress(level: int):
+    def compress(data: bytes) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    return compress
+
+
+def brotli_compress(quality: int):
+    def compress(data: bytes) -> bytes:
+        return brotli.compress(data, quality=quality)
+    return compress
+
+
+def time_per_call(func, data: bytes, min_seconds: float = 0.2) -> float:
+    func(data)
+    calls, start = 0, time.perf_counter()
+    while True:
+        func(data)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+async def passthrough_overhead(requests: int) -> float:
+    body = b'{"message":"Welcome to the Quotes API"}'
+
+    async def small_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/",
+             "headers": [(b"accept-encoding", b"gzip, deflate, br")]}
+    wrapped = CompressionMiddleware(small_app, registry=MetricsRegistry())
+
+    async def drive(app):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(scope, receive, send)
+        return time.perf_counter() - start
+
+    await drive(small_app)
+    await drive(wrapped)
+    bare = min([await drive(small_app) for _ in range(3)])
+    measured = min([await drive(wrapped) for _ in range(3)])
+    return (measured - bare) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bandwidth-mbit", type=float, default=10.0, help="link speed used to value saved bytes")
+    parser.add_argument("--requests", type=int, default=20000, help="requests for the passthrough overhead run")
+    args = parser.parse_args()
+    bytes_per_second = args.bandwidth_mbit * 1e6 / 8
+
+    codecs = [(f"gzip-{level}", gzip_compress(level)) for level in GZIP_LEVELS]
+    if brotli is not None:
+        codecs += [(f"br-{quality}", brotli_compress(quality)) for quality in BROTLI_QUALITIES]
+    else:
+        print("brotli is not installed; only gzip is measured")
+
+    header = f"{'payload':<14} {'codec':<8} {'bytes':>9} {'compressed':>11} {'ratio':>7} {'cpu us':>9} {'saved ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, data in payloads().items():
+        for codec, compress in codecs:
+            compressed = compress(data)
+            cpu = time_per_call(compress, data)
+            saved_ms = (len(data) - len(compressed)) / bytes_per_second * 1000
+            print(f"{name:<14} {codec:<8} {len(data):>9} {len(compressed):>11} "
+                  f"{len(data) / len(compressed):>6.1f}x {cpu * 1e6:>9.0f} {saved_ms:>9.2f}")
+        print()
+
+    overhead = asyncio.run(passthrough_overhead(args.requests))
+    print(f"saved ms: transfer time saved at {args.bandwidth_mbit} Mbit/s")
+    print(f"middleware overhead below the {settings.COMPRESSION_MINIMUM_SIZE}-byte threshold: {overhead:.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
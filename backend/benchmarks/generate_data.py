@@ -0,0 +1,359 @@
+"""
+Generates a synthetic dataset for scale testing.
+
+Users, quotes and reactions follow the application schema (UserBase with
+liked_quotes/disliked_quotes, QuoteBase with likes, dislikes and the stored
+score). Reactions are power-law distributed: a few users react a lot and a few
+quotes collect most of the likes. Quote authorship is skewed the same way.
+
+Run from the backend directory:
+
+    python -m benchmarks.generate_data --users 100000 --quotes 1000000 --reactions 5000000 --drop
+
+Output is deterministic for a given --seed and set of sizes: ids, names,
+texts, timestamps and reactions are identical across runs, regardless of
+--workers or --batch-size. Only the bcrypt password hash differs, since bcrypt
+salts every hash. All users share the password given with --password.
+
+Indexes and migrations run after the bulk load, which is much faster than
+maintaining indexes during it.
+"""
+import argparse
+import asyncio
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from random import Random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.core.near_duplicates import signature_bands, text_hash  # noqa: E402
+from app.models.quote import tag_list  # noqa: E402
+
+USER_KIND = 1
+QUOTE_KIND = 2
+
+# Random state is seeded per block of this many documents; batches are whole blocks
+RNG_BLOCK = 1000
+
+# Reaction ids are stored in the user document. Each costs about 37 bytes of
+# BSON (element header, array index key, 24-character id), so this keeps the
+# busiest users near 11 MB, under MongoDB's 16 MB document limit. Reactions
+# above the cap are dropped, so heavily skewed datasets end up with fewer
+# reactions than requested.
+MAX_REACTIONS_PER_USER = 300_000
+
+FIRST_NAMES = [
+    "Ada", "Alan", "Amara", "Ben", "Chen", "Dara", "Elena", "Farid", "Grace", "Hugo",
+    "Ines", "Jonas", "Kai", "Lena", "Mateo", "Nia", "Omar", "Priya", "Quinn", "Rosa",
+    "Sami", "Tara", "Uma", "Viktor", "Wen", "Yara", "Zoe",
+]
+LAST_NAMES = [
+    "Abbott", "Baker", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Haddad", "Ito",
+    "Jensen", "Kowalski", "Larsen", "Moreau", "Nakamura", "Okafor", "Petrov", "Quispe",
+    "Rossi", "Silva", "Tanaka", "Umarov", "Varga", "Weber", "Xu", "Yilmaz", "Zhang",
+]
+AUTHORS = [
+    "Marcus Aurelius", "Maya Angelou", "Albert Einstein", "Confucius", "Seneca", "Ada Lovelace",
+    "Oscar Wilde", "Lao Tzu", "Mark Twain", "Marie Curie", "Rumi", "Epictetus", "Aristotle",
+    "Virginia Woolf", "Nelson Mandela", "Eleanor Roosevelt", "Friedrich Nietzsche", "Plato",
+    "Toni Morrison", "Leonardo da Vinci", "Buddha", "Socrates", "Jane Austen", "Carl Sagan",
+    "Richard Feynman", "Frida Kahlo", "Mahatma Gandhi", "Benjamin Franklin", "Helen Keller",
+    "Anonymous",
+]
+WORDS = (
+    "life time people way world day work love mind truth courage change wisdom nothing "
+    "everything simple happiness future knowledge patience kindness fear freedom success "
+    "failure habit silence journey light reason virtue art heart dream hope strength peace "
+    "soul nature beauty friend memory moment purpose action question answer river mountain "
+    "ocean road door window star fire water earth sky always never only every great small"
+).split()
+TAGS = [
+    "#life", "#wisdom", "#love", "#work", "#courage", "#science", "#art", "#humor",
+    "#philosophy", "#friendship", "#success", "#nature", "#learning", "#happiness",
+]
+
+
+def object_id(kind: int, seed: int, index: int, created_at: datetime) -> ObjectId:
+    # Deterministic ObjectId whose embedded timestamp matches created_at
+    timestamp = int(created_at.replace(tzinfo=timezone.utc).timestamp())
+    return ObjectId(struct.pack(">IHHI", timestamp, kind, seed & 0xFFFF, index))
+
+
+def user_email(index: int) -> str:
+    return f"user{index}@scale.example.com"
+
+
+def user_name(index: int) -> str:
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return f"{first} {last}"
+
+
+class PowerLaw:
+    # Zipf-like distribution over n ranks, sampled through the inverse CDF of
+    # its continuous approximation. Ranks are spread over item indexes by an
+    # affine permutation, so popular items are not simply the first ones.
+
+    def __init__(self, n: int, exponent: float, rng: Random):
+        self.n = n
+        self.exponent = exponent
+        self._span = math.log(n + 1) if exponent == 1 else (n + 1) ** (1 - exponent) - 1
+        self._step = rng.randrange(1, n + 1) if n > 1 else 1
+        while math.gcd(self._step, n) != 1:
+            self._step += 1
+        self._offset = rng.randrange(n) if n > 1 else 0
+
+    def _cdf(self, x: float) -> float:
+        if self.exponent == 1:
+            return math.log(x) / self._span
+        return (x ** (1 - self.exponent) - 1) / self._span
+
+    def share(self, rank: int) -> float:
+        # Fraction of all draws that land on this rank
+        return self._cdf(rank + 2) - self._cdf(rank + 1)
+
+    def rank(self, u: float) -> int:
+        if self.exponent == 1:
+            x = math.exp(u * self._span)
+        else:
+            x = (1 + u * self._span) ** (1 / (1 - self.exponent))
+        return min(int(x) - 1, self.n - 1)
+
+    def index(self, rank: int) -> int:
+        return (self._step * rank + self._offset) % self.n
+
+    def rank_of(self, index: int) -> int:
+        return ((index - self._offset) * pow(self._step, -1, self.n)) % self.n
+
+    def sample(self, rng: Random) -> int:
+        return self.index(self.rank(rng.random()))
+
+
+class DatasetGenerator:
+    def __init__(self, users: int, quotes: int, reactions: int, seed: int = 42,
+                 skew: float = 1.1, dislike_ratio: float = 0.2, start: datetime = datetime(2024, 1, 1)):
+        self.users = users
+        self.quotes = quotes
+        self.reactions = reactions
+        self.seed = seed
+        self.dislike_ratio = dislike_ratio
+        self.start = start
+        rng = Random(f"{seed}:distributions")
+        self.quote_popularity = PowerLaw(quotes, skew, rng)
+        self.user_activity = PowerLaw(users, skew, rng)
+        self.authorship = PowerLaw(users, skew, rng)
+        self.likes = array("I", bytes(4 * quotes))
+        self.dislikes = array("I", bytes(4 * quotes))
+
+    def _blocks(self, kind: str, batch: int, batch_size: int, total: int):
+        # Yields (index, rng) with fresh random state at every block boundary,
+        # so output does not depend on the batch size or insert scheduling
+        if batch_size % RNG_BLOCK:
+            raise ValueError(f"batch_size must be a multiple of {RNG_BLOCK}")
+        rng = None
+        for index in range(batch * batch_size, min((batch + 1) * batch_size, total)):
+            if index % RNG_BLOCK == 0:
+                rng = Random(f"{self.seed}:{kind}:{index // RNG_BLOCK}")
+            yield index, rng
+
+    def user_created_at(self, index: int) -> datetime:
+        return self.start + timedelta(seconds=index * 60)
+
+    def quote_created_at(self, index: int) -> datetime:
+        return self.start + timedelta(seconds=index * 30)
+
+    def user_id(self, index: int) -> ObjectId:
+        return object_id(USER_KIND, self.seed, index, self.user_created_at(index))
+
+    def quote_id(self, index: int) -> ObjectId:
+        return object_id(QUOTE_KIND, self.seed, index, self.quote_created_at(index))
+
+    def hot_quote_ids(self, count: int) -> list:
+        return [str(self.quote_id(self.quote_popularity.index(rank))) for rank in range(min(count, self.quotes))]
+
+    def user_batch(self, batch: int, batch_size: int, password_hash: str) -> list:
+        # Must run for every batch, in order, before quote_batch: it tallies the
+        # likes and dislikes each quote receives
+        limit = min(self.quotes // 2, MAX_REACTIONS_PER_USER)
+        documents = []
+        for index, rng in self._blocks("users", batch, batch_size, self.users):
+            expected = self.reactions * self.user_activity.share(self.user_activity.rank_of(index))
+            wanted = min(int(expected + rng.random()), limit)
+            liked, disliked, seen = [], [], set()
+            attempts = 0
+            while len(seen) < wanted and attempts < wanted * 4:
+                attempts += 1
+                quote_index = self.quote_popularity.sample(rng)
+                if quote_index in seen:
+                    continue
+                seen.add(quote_index)
+                if rng.random() < self.dislike_ratio:
+                    disliked.append(str(self.quote_id(quote_index)))
+                    self.dislikes[quote_index] += 1
+                else:
+                    liked.append(str(self.quote_id(quote_index)))
+                    self.likes[quote_index] += 1
+            created_at = self.user_created_at(index)
+            documents.append({
+                "_id": self.user_id(index),
+                "name": user_name(index),
+                "email": user_email(index),
+                "password": password_hash,
+                "is_active": True,
+                "theme_preference": "dark" if rng.random() < 0.3 else "light",
+                "liked_quotes": liked,
+                "disliked_quotes": disliked,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        return documents
+
+    def quote_batch(self, batch: int, batch_size: int) -> list:
+        documents = []
+        for index, rng in self._blocks("quotes", batch, batch_size, self.quotes):
+            owner = self.authorship.sample(rng)
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + "."
+            likes, dislikes = self.likes[index], self.dislikes[index]
+            author = AUTHORS[min(int(rng.paretovariate(1.0)) - 1, len(AUTHORS) - 1)]
+            tags = ", ".join(rng.sample(TAGS, rng.randint(0, 3))) or None
+            created_at = self.quote_created_at(index)
+            documents.append({
+                "_id": self.quote_id(index),
+                "quote": text,
+                "dup_bands": signature_bands(text),
+                "dup_text_hash": text_hash(text),
+                "author": author,
+                "tags": tags,
+                "tag_list": tag_list(tags),
+                "likes": likes,
+                "dislikes": dislikes,
+                "score": likes - dislikes,
+                "is_active": rng.random() > 0.01,
+                "random_key": rng.random(),
+                "user_id": str(self.user_id(owner)),
+                "user_name": user_name(owner),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        return documents
+
+
+async def insert_batches(collection, batches, workers: int, label: str) -> int:
+    # Keeps up to `workers` insert_many calls in flight while the next batch is generated
+    semaphore = asyncio.Semaphore(workers)
+    pending = set()
+    inserted = 0
+    started = time.perf_counter()
+
+    async def insert(documents):
+        try:
+            await collection.insert_many(documents, ordered=False)
+        finally:
+            semaphore.release()
+
+    for documents in batches:
+        if not documents:
+            continue
+        await semaphore.acquire()
+        task = asyncio.ensure_future(insert(documents))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        inserted += len(documents)
+        print(f"\r{label}: {inserted} ({inserted / (time.perf_counter() - started):.0f}/s)", end="", flush=True)
+        # Let finished inserts surface their errors
+        for task in [t for t in pending if t.done()]:
+            task.result()
+    if pending:
+        await asyncio.gather(*pending)
+    print()
+    return inserted
+
+
+async def generate(database, generator: DatasetGenerator, password_hash: str,
+                   batch_size: int = 5000, workers: int = 4) -> dict:
+    batch_size = max(RNG_BLOCK, round(batch_size / RNG_BLOCK) * RNG_BLOCK)
+    # Users first: generating them tallies the reaction counters the quotes need
+    user_batches = (
+        generator.user_batch(batch, batch_size, password_hash)
+        for batch in range(math.ceil(generator.users / batch_size))
+    )
+    users = await insert_batches(database.users, user_batches, workers, "users")
+
+    quote_batches = (
+        generator.quote_batch(batch, batch_size)
+        for batch in range(math.ceil(generator.quotes / batch_size))
+    )
+    quotes = await insert_batches(database.quotes, quote_batches, workers, "quotes")
+
+    return {
+        "users": users,
+        "quotes": quotes,
+        "likes": sum(generator.likes),
+        "dislikes": sum(generator.dislikes),
+    }
+
+
+async def run(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.auth import get_password_hash
+    from app.database import client_options
+    from app.migrations import run_migrations
+
+    client = AsyncIOMotorClient(args.mongodb_url, **client_options())
+    database = client[args.db_name]
+    try:
+        if args.drop:
+            await database.users.drop()
+            await database.quotes.drop()
+        elif await database.users.estimated_document_count() or await database.quotes.estimated_document_count():
+            sys.exit(f"{args.db_name} already has users or quotes; pass --drop to replace them")
+
+        generator = DatasetGenerator(
+            args.users, args.quotes, args.reactions, seed=args.seed,
+            skew=args.skew, dislike_ratio=args.dislike_ratio,
+        )
+        started = time.perf_counter()
+        summary = await generate(
+            database, generator, get_password_hash(args.password),
+            batch_size=args.batch_size, workers=args.workers,
+        )
+        print(f"Inserted {summary['users']} users and {summary['quotes']} quotes with "
+              f"{summary['likes']} likes and {summary['dislikes']} dislikes "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        await run_migrations(database)
+        print(f"Indexes and migrations applied in {time.perf_counter() - started:.1f}s")
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db-name", default=f"{settings.DB_NAME}_scale")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--quotes", type=int, default=100000)
+    parser.add_argument("--reactions", type=int, default=500000, help="approximate total likes and dislikes")
+    parser.add_argument("--skew", type=float, default=1.1, help="power-law exponent for popularity and activity")
+    parser.add_argument("--dislike-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password123", help="shared password of every generated user")
+    parser.add_argument("--batch-size", type=int, default=5000, help=f"rounded to a multiple of {RNG_BLOCK}")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent insert_many calls")
+    parser.add_argument("--drop", action="store_true", help="drop existing users and quotes first")
+    args = parser.parse_args()
+    if args.users < 1 or args.quotes < 1:
+        parser.error("--users and --quotes must be at least 1")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Reproducible load test for the Quotes API.
+
+Seeds a throwaway database with users, quotes and reactions, then drives the
+FastAPI app in-process through realistic request mixes and reports p50/p95/p99
+latency and throughput per endpoint. Results are written as JSON so runs can be
+compared across commits.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test                         # local mongod
+    python -m benchmarks.load_test --backend memory        # in-process stand-in
+    python -m benchmarks.load_test --compare benchmarks/results/<previous>.json
+
+The memory backend needs mongomock-motor (see benchmarks/requirements.txt).
+It measures application overhead only and cannot run every scenario.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.auth import create_access_token, get_password_hash  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import db, client_options  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from benchmarks.generate_data import WORDS, DatasetGenerator, generate, user_email  # noqa: E402
+from main import app  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+BENCH_PASSWORD = "benchmark-password"
+
+# Users that get an access token; authenticated scenarios cycle through them
+MAX_TOKEN_USERS = 1000
+
+# Scenarios that rely on query features the in-process stand-in lacks
+MEMORY_UNSUPPORTED = {"like_storm": "toggle_reaction projects with $elemMatch/$eq"}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    # Rounded first so float noise (0.07 * 100 == 7.000000000000001) cannot push it up a rank
+    rank = max(1, math.ceil(round(fraction * len(sorted_values), 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def connect(args):
+    if args.backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("The memory backend needs mongomock-motor: pip install -r benchmarks/requirements.txt")
+        db.client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db.client = AsyncIOMotorClient(
+            args.mongodb_url, event_listeners=db.event_listeners, **client_options()
+        )
+    db.db = db.client[args.db_name]
+    await db.client.drop_database(args.db_name)
+    await run_migrations(db.db)
+
+
+async def seed(args) -> dict:
+    # Same generator as benchmarks.generate_data, so a given seed and size
+    # always produce the same dataset. One bcrypt hash is shared by every user.
+    generator = DatasetGenerator(args.users, args.quotes, args.reactions, seed=args.seed)
+    await generate(db.db, generator, get_password_hash(BENCH_PASSWORD))
+    emails = [user_email(index) for index in range(min(args.users, MAX_TOKEN_USERS))]
+    tokens = [
+        create_access_token({"sub": email}, expires_delta=timedelta(hours=1))
+        for email in emails
+    ]
+    return {"emails": emails, "tokens": tokens, "hot_quotes": generator.hot_quote_ids(10)}
+
+
+def build_scenarios(data: dict, rng: random.Random, skip: set) -> dict:
+    emails, tokens = data["emails"], data["tokens"]
+
+    def auth(index: int) -> dict:
+        return {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+
+    def anonymous_feed(i):
+        return "GET /quotes/", "GET", "/quotes/", {}
+
+    def authenticated_feed(i):
+        return "GET /quotes/ (auth)", "GET", "/quotes/", {"headers": auth(i)}
+
+    def search_as_you_type(i):
+        # Each simulated user types a word one letter at a time
+        word = rng.choice(WORDS)
+        prefix = word[:1 + i % len(word)]
+        field = rng.choice(["quote", "author", "tags"])
+        return "GET /quotes/search", "GET", "/quotes/search", {"params": {field: prefix}}
+
+    # Most likes land on the most popular quotes
+    hot_quotes = data["hot_quotes"]
+
+    def like_storm(i):
+        quote_id = rng.choice(hot_quotes)
+        return "POST /quotes/{id}/likes/up", "POST", f"/quotes/{quote_id}/likes/up", {"headers": auth(i)}
+
+    def login_burst(i):
+        return "POST /auth/login", "POST", "/auth/login", {
+            "data": {"username": emails[i % len(emails)], "password": BENCH_PASSWORD}
+        }
+
+    def mixed(i):
+        roll = rng.random()
+        if roll < 0.35:
+            return anonymous_feed(i)
+        if roll < 0.65:
+            return authenticated_feed(i)
+        if roll < 0.9:
+            return search_as_you_type(i)
+        if roll < 0.98:
+            return anonymous_feed(i) if "like_storm" in skip else like_storm(i)
+        return login_burst(i)
+
+    return {
+        "anonymous_feed": anonymous_feed,
+        "authenticated_feed": authenticated_feed,
+        "search_as_you_type": search_as_you_type,
+        "like_storm": like_storm,
+        "login_burst": login_burst,
+        "mixed": mixed,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    latencies = {}
+    errors = {}
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            label, method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.setdefault(label, []).append(time.perf_counter() - start)
+            if failed:
+                errors[label] = errors.get(label, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    report = {}
+    for label, values in latencies.items():
+        values.sort()
+        report[label] = {
+            "count": len(values),
+            "errors": errors.get(label, 0),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+            "throughput_rps": round(len(values) / wall, 1),
+        }
+    return report
+
+
+async def run_full_sync(client: httpx.AsyncClient, page_size: int, expected: int) -> dict:
+    # A client's initial delta sync, page by page, then one idle re-sync. The
+    # seeded quotes are older than the tombstone retention, so this also checks
+    # that neither kind of token is refused as expired (410).
+    latencies, errors = [], 0
+    seen = set()
+    token = None
+    start = time.perf_counter()
+    for _ in range(2):
+        while True:
+            params = {"limit": page_size, **({"since": token} if token else {})}
+            request_start = time.perf_counter()
+            response = await client.get("/quotes/changes", params=params)
+            latencies.append(time.perf_counter() - request_start)
+            if response.status_code != 200:
+                errors += 1
+                break
+            body = response.json()
+            seen.update(quote["_id"] for quote in body["upserts"])
+            token = body["next_token"]
+            if not body["has_more"]:
+                break
+    wall = time.perf_counter() - start
+    if len(seen) != expected:
+        print(f"full_sync: received {len(seen)} of {expected} quotes")
+        errors += 1
+
+    latencies.sort()
+    return {"GET /quotes/changes": {
+        "count": len(latencies),
+        "errors": errors,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+    }}
+
+
+def print_report(results: dict, previous: dict = None):
+    header = f"{'scenario':<20} {'endpoint':<28} {'count':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for scenario, endpoints in results.items():
+        for label, stats in endpoints.items():
+            line = (
+                f"{scenario:<20} {label:<28} {stats['count']:>6} {stats['errors']:>5} "
+                f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['throughput_rps']:>9.1f}"
+            )
+            old = (previous or {}).get(scenario, {}).get(label)
+            if old and old["p95_ms"]:
+                change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+                line += f"   p95 {change:+.1f}% vs previous"
+            print(line)
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    settings.RATE_LIMIT_ENABLED = args.rate_limit
+    await connect(args)
+    try:
+        print(f"Seeding {args.users} users, {args.quotes} quotes, {args.reactions} reactions ({args.backend})...")
+        data = await seed(args)
+        skip = set(MEMORY_UNSUPPORTED) if args.backend == "memory" else set()
+        scenarios = build_scenarios(data, rng, skip)
+
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                if name in skip:
+                    print(f"Skipping {name} on the memory backend: {MEMORY_UNSUPPORTED[name]}")
+                    continue
+                if name == "full_sync":
+                    results[name] = await run_full_sync(client, args.sync_page_size, args.quotes)
+                    continue
+                # Warm-up requests are not recorded
+                await run_scenario(client, scenarios[name], min(args.warmup, args.requests), args.concurrency)
+                requests = args.login_requests if name == "login_burst" else args.requests
+                results[name] = await run_scenario(client, scenarios[name], requests, args.concurrency)
+    finally:
+        await db.client.drop_database(args.db_name)
+        db.client.close()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "seed": args.seed,
+            "users": args.users,
+            "quotes": args.quotes,
+            "reactions": args.reactions,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+SCENARIOS = ["anonymous_feed", "authenticated_feed", "search_as_you_type", "like_storm", "login_burst", "mixed", "full_sync"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo")
+    parser.add_argument("--mongodb-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db-name", default=f"{settings.DB_NAME}_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--quotes", type=int, default=2000)
+    parser.add_argument("--reactions", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=100, help="requests for login_burst (bcrypt bound)")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sync-page-size", type=int, default=100, help="page size of the full_sync walk")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--rate-limit", action="store_true", help="keep login/register rate limiting enabled")
+    parser.add_argument("--output", default=None, help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="previous results file to compare p95 against")
+    args = parser.parse_args()
+
+    # Per-request client and auth logs would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    report = asyncio.run(run(args))
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f).get("results")
+    print_report(report["results"], previous)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit']}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
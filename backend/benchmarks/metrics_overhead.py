@@ -0,0 +1,87 @@
+"""
+Measures the per-request overhead of MetricsMiddleware.
+
+Run from the backend directory:
+
+    python -m benchmarks.metrics_overhead [--requests 50000] [--budget-us 25]
+
+The middleware is timed around a no-op ASGI app, so the difference to the
+bare app is the cost of recording latency, status and in-flight metrics.
+Rendering /metrics is timed as well. Exits non-zero when the per-request
+overhead exceeds the budget.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry  # noqa: E402
+
+
+class FakeRoute:
+    def __init__(self, path):
+        self.path = path
+
+
+ROUTES = [FakeRoute(path) for path in ("/quotes/", "/quotes/{quote_id}", "/auth/login", "/quotes/search")]
+
+
+async def noop_app(scope, receive, send):
+    # Stands in for the router: sets the matched route and sends an empty response
+    scope["route"] = ROUTES[scope["index"] % len(ROUTES)]
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def drive(app, requests: int) -> float:
+    start = time.perf_counter()
+    for index in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/", "index": index}, receive, send)
+    return time.perf_counter() - start
+
+
+async def run(requests: int, budget_us: float) -> int:
+    registry = MetricsRegistry()
+    instrumented = MetricsMiddleware(noop_app, registry=registry)
+
+    # Warm up both paths before timing
+    await drive(noop_app, 1000)
+    await drive(instrumented, 1000)
+
+    bare = min([await drive(noop_app, requests) for _ in range(3)])
+    measured = min([await drive(instrumented, requests) for _ in range(3)])
+    overhead_us = (measured - bare) / requests * 1e6
+
+    start = time.perf_counter()
+    body = registry.render()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    print(f"requests per run:     {requests}")
+    print(f"bare app:             {bare / requests * 1e6:.2f} us/request")
+    print(f"with metrics:         {measured / requests * 1e6:.2f} us/request")
+    print(f"middleware overhead:  {overhead_us:.2f} us/request (budget {budget_us} us)")
+    print(f"render /metrics:      {render_ms:.2f} ms for {len(body)} bytes")
+    return 0 if overhead_us <= budget_us else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--budget-us", type=float, default=25.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.requests, args.budget_us)))
+
+
+if __name__ == "__main__":
+    main()
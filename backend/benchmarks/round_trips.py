@@ -0,0 +1,134 @@
+"""
+Counts the MongoDB commands issued by each write endpoint.
+
+Run from the backend directory against a local mongod:
+
+    python -m benchmarks.round_trips [--mongodb-url mongodb://localhost:27017]
+
+A throwaway database is created and dropped afterwards. The script exits
+with a non-zero status when an endpoint issues more commands than its budget.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.database import db  # noqa: E402
+from main import app  # noqa: E402
+
+# Connection handshakes and session bookkeeping are not round trips made by a route
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = []
+
+    def reset(self):
+        with self._lock:
+            self.commands = []
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.commands)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self.commands.append(f"{event.command_name}:{event.command.get(event.command_name)}")
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def run(mongodb_url: str) -> int:
+    counter = CommandCounter()
+    db_name = f"{settings.DB_NAME}_round_trips_{os.getpid()}"
+    db.client = AsyncIOMotorClient(mongodb_url, event_listeners=[counter])
+    db.db = db.client[db_name]
+    await db.db.users.create_index("email", unique=True)
+    settings.RATE_LIMIT_ENABLED = False
+
+    results = []
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def measure(label, budget, method, url, **kwargs):
+                nonlocal failures
+                counter.reset()
+                response = await client.request(method, url, **kwargs)
+                commands = counter.snapshot()
+                ok = len(commands) <= budget
+                failures += 0 if ok else 1
+                results.append((label, response.status_code, len(commands), budget, ok, commands))
+                return response
+
+            # Budgets include the user lookup done by the auth dependency
+            await measure("POST /auth/register", 1, "POST", "/auth/register",
+                          json={"name": "Bench", "email": "bench@example.com", "password": "secret1"})
+            await measure("POST /auth/register (duplicate)", 1, "POST", "/auth/register",
+                          json={"name": "Bench", "email": "bench@example.com", "password": "secret1"})
+            login = await measure("POST /auth/login", 2, "POST", "/auth/login",
+                                  data={"username": "bench@example.com", "password": "secret1"})
+            tokens = login.json()
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+            await measure("POST /auth/refresh", 2, "POST", "/auth/refresh",
+                          json={"refresh_token": tokens["refresh_token"]})
+            await measure("POST /auth/update-theme", 2, "POST", "/auth/update-theme",
+                          params={"theme": "dark"}, headers=headers)
+            # The near-duplicate check has to read the candidates before deciding on 409 or insert
+            created = await measure("POST /quotes/", 3, "POST", "/quotes/",
+                                    json={"quote": "Measure twice.", "author": "Bench"}, headers=headers)
+            await measure("POST /quotes/?allow_duplicate=true", 2, "POST", "/quotes/",
+                          params={"allow_duplicate": "true"},
+                          json={"quote": "Cut once.", "author": "Bench"}, headers=headers)
+            quote_id = created.json()["_id"]
+            await measure("PATCH /quotes/{id}", 2, "PATCH", f"/quotes/{quote_id}",
+                          json={"tags": "#bench"}, headers=headers)
+
+            # A second user reacts to the quote
+            await client.post("/auth/register",
+                              json={"name": "Fan", "email": "fan@example.com", "password": "secret1"})
+            fan_login = await client.post("/auth/login",
+                                          data={"username": "fan@example.com", "password": "secret1"})
+            fan_headers = {"Authorization": f"Bearer {fan_login.json()['access_token']}"}
+            await measure("POST /quotes/{id}/likes/up", 4, "POST", f"/quotes/{quote_id}/likes/up",
+                          headers=fan_headers)
+            await measure("POST /quotes/{id}/dislike/up", 4, "POST", f"/quotes/{quote_id}/dislike/up",
+                          headers=fan_headers)
+            # The delete plus the tombstone that /quotes/changes reports it from
+            await measure("DELETE /quotes/{id}", 3, "DELETE", f"/quotes/{quote_id}", headers=headers)
+    finally:
+        await db.client.drop_database(db_name)
+        db.client.close()
+
+    width = max(len(r[0]) for r in results)
+    for label, status_code, count, budget, ok, commands in results:
+        flag = "ok  " if ok else "OVER"
+        print(f"{flag} {label:<{width}}  status={status_code}  commands={count}/{budget}  {', '.join(commands)}")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", default=settings.MONGODB_URL)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.mongodb_url)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Measures how quickly a fresh API process starts serving.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup_time [--runs 5] [--budget-ms 3000]
+
+Each run starts `uvicorn main:app` in a new process and polls it, reporting:
+
+- import: time to import main (the application and all routers)
+- first response: process start until GET / answers
+- ready: process start until GET /health/ready returns 200, which needs a
+  reachable MongoDB (MONGODB_URL); reported as "-" when it is not reached
+  within --ready-timeout
+
+Medians over all runs are printed. Exits non-zero when the median time to
+first response exceeds --budget-ms.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def status_of(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return 0
+
+
+def measure_import() -> float:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_server(ready_timeout: float) -> tuple:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = ready = None
+    try:
+        while time.perf_counter() - start < 60:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            if status_of(f"{base}/") == 200:
+                first_response = time.perf_counter() - start
+                break
+            time.sleep(0.005)
+        while first_response is not None and time.perf_counter() - start < first_response + ready_timeout:
+            if status_of(f"{base}/health/ready") == 200:
+                ready = time.perf_counter() - start
+                break
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return first_response, ready
+
+
+def median_ms(values) -> str:
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values) * 1000:.0f} ms" if values else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ready-timeout", type=float, default=15.0, help="seconds to wait for readiness per run")
+    parser.add_argument("--budget-ms", type=float, default=3000.0, help="budget for the median time to first response")
+    args = parser.parse_args()
+
+    imports, first_responses, readies = [], [], []
+    for run in range(args.runs):
+        imports.append(measure_import())
+        first_response, ready = measure_server(args.ready_timeout)
+        first_responses.append(first_response)
+        readies.append(ready)
+        print(f"run {run + 1}: import {imports[-1] * 1000:.0f} ms, first response "
+              f"{median_ms([first_response])}, ready {median_ms([ready])}")
+
+    print(f"median import:          {median_ms(imports)}")
+    print(f"median first response:  {median_ms(first_responses)} (budget {args.budget_ms:.0f} ms)")
+    print(f"median ready:           {median_ms(readies)}")
+    if None in first_responses:
+        sys.exit(1)
+    sys.exit(0 if statistics.median(first_responses) * 1000 <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,36 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
+from app.core.logging_setup import configure_logging, flush_logging
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import quotes, auth
+from app.routes import quotes, auth, health, metrics
+from app.core.compression import CompressionMiddleware
+from app.core.conditional import ConditionalGetMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilerMiddleware
+from app.core.request_context import RequestContextMiddleware
 from app.database import db
+from app.config import settings
+from app.startup import start_startup_work
 
-app = FastAPI(title="Quotes API")
+# Before anything logs: JSON records written by a background thread
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Traffic is accepted as soon as the client object exists. Connecting,
+    # index verification and warm-up run in the background; readiness is
+    # reported at /health/ready.
+    await db.connect_to_database()
+    startup = start_startup_work(app)
+    yield
+    startup.cancel()
+    await db.close_database_connection()
+    # Nothing queued should be lost when the worker exits. The wait is
+    # bounded and runs off the event loop.
+    await asyncio.to_thread(flush_logging)
+
+app = FastAPI(title="Quotes API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -14,17 +41,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Makes the current request visible to MongoDB listeners (slow-query log)
+app.add_middleware(RequestContextMiddleware)
+
+# Single-request profiling on demand
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# ETag and 304 for unchanged GET bodies; inside compression, so nothing is
+# compressed just to be discarded
+if settings.CONDITIONAL_GET_ENABLED:
+    app.add_middleware(ConditionalGetMiddleware)
+
+# gzip/brotli for responses above the size threshold, streaming included
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Per-route latency, status codes and in-flight requests
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(quotes.router)
-
-@app.on_event("startup")
-async def startup_db_client():
-    await db.connect_to_database()
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await db.close_database_connection()
+app.include_router(health.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
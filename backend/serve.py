@@ -0,0 +1,81 @@
+"""
+Production entry point for the Quotes API.
+
+    python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000]
+
+Runs uvicorn with several worker processes (WEB_CONCURRENCY, one per CPU by
+default), uvloop and httptools when installed, and the keep-alive, backlog and
+shutdown settings from app/config.py. Only one worker runs one-time startup
+work such as index builds. On SIGTERM or SIGINT each worker stops accepting
+connections, drains in-flight requests for up to
+SERVER_GRACEFUL_SHUTDOWN_SECONDS, then closes its MongoDB client and flushes
+its logs.
+
+For development keep using `uvicorn main:app --reload`.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import tempfile
+
+import uvicorn
+
+from app.config import settings
+from app.core.logging_setup import configure_logging
+
+logger = logging.getLogger("serve")
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY or os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", action="store_true", help="skip per-request access logging")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    # Workers are spawned with this environment and compete for the lock
+    lock_file = os.path.join(tempfile.gettempdir(), f"quotes-api-{args.port}-{os.getpid()}.lock")
+    os.environ["STARTUP_LOCK_FILE"] = lock_file
+
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+    logger.info(f"Starting {args.workers} workers on {args.host}:{args.port} (loop: {loop}, http: {http})")
+
+    try:
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            loop=loop,
+            http=http,
+            lifespan="on",
+            backlog=settings.SERVER_BACKLOG,
+            timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+            timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+            limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+            limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+            server_header=False,
+            access_log=not args.no_access_log,
+            # Workers log through the application's queue handler (see main.py)
+            log_config=None,
+            log_level=args.log_level,
+        )
+    finally:
+        if os.path.exists(lock_file):
+            os.remove(lock_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import { useEffect, useState } from 'react'
 import { useRouter } from 'next/navigation'
 import { useQuotesStore } from '@/lib/store/quotes'
 import { useAuthStore } from '@/lib/store/auth'
-import { quotesAPI } from '@/lib/api'
+import { quotesAPI, getDuplicateQuote } from '@/lib/api'
 import { toast } from 'sonner'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
@@ -299,6 +299,11 @@ export default function HomePage() {
       return
     }
 
+    await createQuote()
+  }
+
+  const createQuote = async (allowDuplicate = false) => {
+    if (!user) return
     try {
       await quotesAPI.createQuote({
         quote: newQuote.quote,
@@ -309,11 +314,19 @@ export default function HomePage() {
         likes: 0,
         dislikes: 0,
         is_active: true
-      })
+      }, allowDuplicate)
       toast.success('Quote created successfully!')
       setNewQuote({ quote: '', author: '', tags: '' })
       fetchQuotes()
     } catch (err) {
+      const duplicate = getDuplicateQuote(err)
+      if (duplicate) {
+        toast.warning('This quote may already exist', {
+          description: `"${duplicate.quote}" — ${duplicate.author || 'Unknown'} (${Math.round(duplicate.similarity * 100)}% similar)`,
+          action: { label: 'Add anyway', onClick: () => createQuote(true) },
+        })
+        return
+      }
       console.error('Create quote error:', err)
       toast.error('Failed to create quote')
     }
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from 'react'
 import { useQuotesStore } from '@/lib/store/quotes'
-import { quotesAPI } from '@/lib/api'
+import { quotesAPI, getDuplicateQuote } from '@/lib/api'
 import { useAuthStore } from '@/lib/store/auth'
 import { toast } from 'sonner'
 import { Button } from '@/components/ui/button'
@@ -32,24 +32,35 @@ export default function QuotesPage() {
     }
   }
 
-  const handleCreateQuote = async (e: React.FormEvent<HTMLFormElement>) => {
-    e.preventDefault()
-    if (!isAuthenticated) return
-
+  const createQuote = async (allowDuplicate = false) => {
     try {
       await quotesAPI.createQuote({
         ...newQuote,
         likes: 0,
         dislikes: 0
-      })
+      }, allowDuplicate)
       setNewQuote({ text: '', author: '' })
       toast.success('Quote created successfully!')
       fetchQuotes()
     } catch (err) {
+      const duplicate = getDuplicateQuote(err)
+      if (duplicate) {
+        toast.warning('This quote may already exist', {
+          description: `"${duplicate.quote}" — ${duplicate.author || 'Unknown'} (${Math.round(duplicate.similarity * 100)}% similar)`,
+          action: { label: 'Add anyway', onClick: () => createQuote(true) },
+        })
+        return
+      }
       toast.error('Failed to create quote')
     }
   }
 
+  const handleCreateQuote = async (e: React.FormEvent<HTMLFormElement>) => {
+    e.preventDefault()
+    if (!isAuthenticated) return
+    await createQuote()
+  }
+
   const handleDeleteQuote = async (id: string) => {
     if (!isAuthenticated) return
 
@@ -83,6 +83,21 @@ export const authAPI = {
   },
 }
 
+export interface DuplicateQuote {
+  message: string
+  duplicate_of: string
+  quote: string
+  author?: string
+  similarity: number
+}
+
+// The near-duplicate match a 409 from createQuote carries, or null for any other error
+export const getDuplicateQuote = (error: unknown): DuplicateQuote | null => {
+  if (!axios.isAxiosError(error) || error.response?.status !== 409) return null
+  const detail = error.response.data?.detail
+  return detail && typeof detail === 'object' && detail.duplicate_of ? detail : null
+}
+
 export const quotesAPI = {
   getQuotes: async () => {
     const response = await api.get('/quotes')
@@ -92,8 +107,10 @@ export const quotesAPI = {
     const response = await api.get(`/quotes/${id}`)
     return response.data
   },
-  createQuote: async (quote: Omit<Quote, '_id'>) => {
-    const response = await api.post('/quotes', quote)
+  createQuote: async (quote: Omit<Quote, '_id'>, allowDuplicate = false) => {
+    const response = await api.post('/quotes', quote, {
+      params: allowDuplicate ? { allow_duplicate: true } : undefined,
+    })
     return response.data
   },
   updateQuote: async (id: string, quote: Partial<Quote>) => {
@@ -1,104 +1,305 @@
-import requests
+import asyncio
+import httpx
 import json
 from typing import Dict, List, Optional, Any
-from config import API_BASE_URL
+from config import (
+    API_BASE_URL, API_TIMEOUT, API_CONNECT_TIMEOUT, API_MAX_CONNECTIONS,
+    API_MAX_KEEPALIVE_CONNECTIONS, API_KEEPALIVE_EXPIRY, API_HTTP2,
+    API_CACHE_ENABLED, API_CACHE_MAX_ENTRIES, API_CACHE_MAX_BYTES
+)
+from response_cache import ResponseCache, auth_identity
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 class APIClient:
     def __init__(self):
         self.base_url = API_BASE_URL
-        self.session = requests.Session()
         self.token = None
+        self.refresh_token = None
+        self.on_token_refresh = None  # Called with (token, refresh_token) after a refresh
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        # GET responses by method, URL, params and user; None when disabled
+        self.cache = ResponseCache(API_CACHE_MAX_ENTRIES, API_CACHE_MAX_BYTES) if API_CACHE_ENABLED else None
+        # Identical concurrent GETs (same key as the cache) share one request
+        self._in_flight: Dict[tuple, '_Flight'] = {}
+        # gets: GET calls, coalesced: of those, served by a request already in flight, sent: network requests
+        self.stats = {'gets': 0, 'coalesced': 0, 'sent': 0}
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared connection pool, created on first use inside the event loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(API_TIMEOUT, connect=API_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=API_MAX_CONNECTIONS,
+                    max_keepalive_connections=API_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=API_KEEPALIVE_EXPIRY,
+                ),
+                http2=API_HTTP2 and _http2_available(),
+                follow_redirects=True,
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close pooled connections (call on shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
         
-    def set_token(self, token: str):
+    def set_token(self, token: str, refresh_token: Optional[str] = None):
         """Set the authentication token"""
         self.token = token
-        self.session.headers.update({'Authorization': f'Bearer {token}'})
+        if refresh_token is not None:
+            self.refresh_token = refresh_token
         
     def clear_token(self):
         """Clear the authentication token"""
         self.token = None
-        if 'Authorization' in self.session.headers:
-            del self.session.headers['Authorization']
+        self.refresh_token = None
+
+    def _headers(self) -> Dict[str, str]:
+        """Per-request headers; the token is never stored on the shared client"""
+        return {'Authorization': f'Bearer {self.token}'} if self.token else {}
+
+    async def refresh_access_token(self, stale_token: Optional[str] = None) -> bool:
+        """Exchange the refresh token for a new token pair"""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        # Refresh tokens are single use, so concurrent 401s must share one refresh
+        async with self._refresh_lock:
+            if stale_token is not None and self.token and self.token != stale_token:
+                return True  # Another request refreshed while this one waited
+            if not self.refresh_token:
+                return False
+            try:
+                response = await self.client.post('/auth/refresh', json={'refresh_token': self.refresh_token})
+            except httpx.HTTPError:
+                return False
+            if response.status_code != 200:
+                return False
+            tokens = response.json()
+            self.set_token(tokens['access_token'], tokens['refresh_token'])
+            if self.on_token_refresh:
+                self.on_token_refresh(tokens['access_token'], tokens['refresh_token'])
+            return True
+    
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None,
+                            timeout: Optional[float] = None) -> Any:
+        """Make a request to the API; timeout (seconds) overrides the default for this call"""
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PATCH', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        if method == 'GET':
+            body = await self._get(endpoint, params, timeout)
+        else:
+            body = await self._send(method, endpoint, data, params, timeout)
+        # Decoded per caller, so shared and cached bodies never share objects
+        return json.loads(body) if body else {}
+
+    async def _get(self, endpoint: str, params: Optional[Dict], timeout: Optional[float]) -> bytes:
+        """Fresh cache entry, else join the identical GET already in flight, else start one"""
+        self.stats['gets'] += 1
+        key = ResponseCache.key('GET', endpoint, params, auth_identity(self.token))
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None and cached.is_fresh():
+                self.cache.stats['hits'] += 1
+                return cached.body
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._send('GET', endpoint, None, params, timeout, cache_key=key)))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._in_flight.pop(key, None) if self._in_flight.get(key) is flight else None)
+        else:
+            self.stats['coalesced'] += 1
+        flight.waiters += 1
+        try:
+            # Shielded: one caller giving up must not cancel the others' request
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller was cancelled. Unlisted now, not when the cancellation
+                # lands, so a caller arriving meanwhile starts a new request
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+                flight.task.cancel()
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict:
-        """Make a request to the API"""
-        url = f"{self.base_url}{endpoint}"
-        print(f'[DEBUG] Request headers: {self.session.headers}')
+    async def _send(self, method: str, endpoint: str, data: Optional[Dict], params: Optional[Dict],
+                    timeout: Optional[float], cache_key: Optional[tuple] = None, _retry: bool = True) -> bytes:
+        """Send one request (revalidating a cached GET) and return the response body"""
+        token = self.token
+        request = {'params': params, 'headers': self._headers()}
+        if timeout is not None:
+            request['timeout'] = timeout
+        if data is not None and method in ('POST', 'PATCH'):
+            # OAuth2 login expects a form body, every other endpoint takes JSON
+            request['data' if endpoint == '/auth/login' else 'json'] = data
         
+        cached = None
+        if self.cache is not None and cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                request['headers'].update(cached.validators())
+            generation = self.cache.generation
+        
+        self.stats['sent'] += 1
         try:
-            if method.upper() == 'GET':
-                response = self.session.get(url, params=params)
-            elif method.upper() == 'POST':
-                response = self.session.post(url, json=data, data=data)
-            elif method.upper() == 'PATCH':
-                response = self.session.patch(url, json=data)
-            elif method.upper() == 'DELETE':
-                response = self.session.delete(url)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-                
-            response.raise_for_status()
-            return response.json() if response.content else {}
-            
-        except requests.exceptions.RequestException as e:
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 401:
-                    self.clear_token()
-                raise Exception(f"API Error: {e.response.status_code} - {e.response.text}")
+            response = await self.client.request(method, endpoint, **request)
+        except httpx.TimeoutException:
+            raise Exception(f"Network Error: request to {endpoint} timed out")
+        except httpx.HTTPError as e:
+            raise Exception(f"Network Error: {str(e)}")
+        finally:
+            if method != 'GET':
+                # Whatever this changed on the server, cached reads of the same
+                # resource family (/quotes/..., /auth/...) may now be stale, and so
+                # may GETs already in flight: later callers must not join those
+                family = '/' + endpoint.lstrip('/').split('/', 1)[0]
+                if self.cache is not None:
+                    self.cache.invalidate(family)
+                for key in [key for key in self._in_flight if key[1].startswith(family)]:
+                    del self._in_flight[key]
+        
+        if response.status_code == 401:
+            # Expired access token: renew it once instead of forcing a new login
+            if _retry and not endpoint.startswith('/auth/') and await self.refresh_access_token(token):
+                return await self._send(method, endpoint, data, params, timeout, cache_key, _retry=False)
+            self.clear_token()
+        if self.cache is not None and cache_key is not None:
+            if response.status_code == 304 and cached is not None:
+                self.cache.stats['revalidated'] += 1
+                self.cache.refresh(cache_key, cached, response)
+                return cached.body
+            self.cache.stats['misses'] += 1
+            if response.status_code == 200:
+                self.cache.store(cache_key, response, generation)
             else:
-                raise Exception(f"Network Error: {str(e)}")
+                self.cache.discard(cache_key)
+        if response.is_error:
+            raise APIError(response.status_code, response.text)
+        return response.content
+
+class APIError(Exception):
+    """Error response from the API; detail is its decoded "detail" field, when there is one"""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"API Error: {status_code} - {text}")
+        self.status_code = status_code
+        try:
+            self.detail = json.loads(text).get('detail')
+        except (ValueError, AttributeError):
+            self.detail = None
+
+class _Flight:
+    """A GET in flight and the number of callers waiting for it"""
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
 
 class AuthAPI:
     def __init__(self, client: APIClient):
         self.client = client
     
-    def login(self, email: str, password: str) -> Dict:
+    async def login(self, email: str, password: str) -> Dict:
         """Login user"""
         data = {
             'username': email,  # OAuth2 expects 'username' field
             'password': password
         }
-        return self.client._make_request('POST', '/auth/login', data=data)
+        return await self.client._make_request('POST', '/auth/login', data=data)
     
-    def register(self, name: str, email: str, password: str) -> Dict:
+    async def register(self, name: str, email: str, password: str) -> Dict:
         """Register new user"""
         data = {
             'name': name,
             'email': email,
             'password': password
         }
-        return self.client._make_request('POST', '/auth/register', data=data)
+        return await self.client._make_request('POST', '/auth/register', data=data)
     
-    def update_theme(self, theme: str) -> Dict:
+    async def update_theme(self, theme: str) -> Dict:
         """Update user theme preference"""
-        return self.client._make_request('POST', f'/auth/update-theme?theme={theme}')
+        return await self.client._make_request('POST', '/auth/update-theme', params={'theme': theme})
+    
+    async def logout(self, refresh_token: str) -> Dict:
+        """Revoke the refresh token on the server"""
+        return await self.client._make_request('POST', '/auth/logout', data={'refresh_token': refresh_token})
     
-    def get_me(self) -> Dict:
+    async def get_me(self) -> Dict:
         """Get current user info"""
-        return self.client._make_request('GET', '/auth/me')
+        return await self.client._make_request('GET', '/auth/me')
 
 class QuotesAPI:
     def __init__(self, client: APIClient):
         self.client = client
     
-    def get_quotes(self) -> List[Dict]:
-        """Get all quotes"""
-        return self.client._make_request('GET', '/quotes/')
+    async def get_quotes(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Get all quotes, optionally only the given fields"""
+        params = {'fields': ','.join(fields)} if fields else None
+        return await self.client._make_request('GET', '/quotes/', params=params)
+    
+    async def get_quote(self, quote_id: str, fields: Optional[List[str]] = None) -> Dict:
+        """Get a specific quote, optionally only the given fields"""
+        params = {'fields': ','.join(fields)} if fields else None
+        return await self.client._make_request('GET', f'/quotes/{quote_id}', params=params)
+    
+    async def get_quote_feed(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Get a page of all quotes in feed order (items, total, next_cursor)"""
+        return await self._get_page('/quotes/feed', cursor, limit)
+    
+    async def get_my_quotes(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Get a page of the current user's quotes, newest first (items, total, next_cursor)"""
+        return await self._get_page('/quotes/mine', cursor, limit)
+    
+    async def get_liked_quotes(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Get a page of the quotes the current user liked, most recent first"""
+        return await self._get_page('/quotes/liked', cursor, limit)
+    
+    async def get_disliked_quotes(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Get a page of the quotes the current user disliked, most recent first"""
+        return await self._get_page('/quotes/disliked', cursor, limit)
     
-    def get_quote(self, quote_id: str) -> Dict:
-        """Get a specific quote"""
-        return self.client._make_request('GET', f'/quotes/{quote_id}/')
+    async def _get_page(self, endpoint: str, cursor: Optional[str], limit: Optional[int]) -> Dict:
+        """Fetch one page of a paginated quote list"""
+        params = {}
+        if cursor:
+            params['cursor'] = cursor
+        if limit:
+            params['limit'] = limit
+        return await self.client._make_request('GET', endpoint, params=params)
     
-    def create_quote(self, quote: str, author: str, tags: str = '') -> Dict:
-        """Create a new quote"""
+    async def get_random_quote(self, tag: Optional[str] = None, author: Optional[str] = None) -> Dict:
+        """Get a random quote, optionally with the given tag or by the given author"""
+        params = {}
+        if tag:
+            params['tag'] = tag
+        if author:
+            params['author'] = author
+        return await self.client._make_request('GET', '/quotes/random', params=params)
+    
+    async def create_quote(self, quote: str, author: str, tags: str = '', allow_duplicate: bool = False) -> Dict:
+        """Create a new quote; the API answers 409 for a near-duplicate unless allow_duplicate is set"""
         data = {
             'quote': quote,
             'author': author,
             'tags': tags
         }
-        return self.client._make_request('POST', '/quotes/', data=data)
+        params = {'allow_duplicate': 'true'} if allow_duplicate else None
+        return await self.client._make_request('POST', '/quotes/', data=data, params=params)
     
-    def update_quote(self, quote_id: str, quote: str = None, author: str = None, tags: str = None) -> Dict:
+    async def update_quote(self, quote_id: str, quote: str = None, author: str = None, tags: str = None) -> Dict:
         """Update a quote"""
         data = {}
         if quote is not None:
@@ -107,35 +308,42 @@ class QuotesAPI:
             data['author'] = author
         if tags is not None:
             data['tags'] = tags
-        return self.client._make_request('PATCH', f'/quotes/{quote_id}/', data=data)
+        return await self.client._make_request('PATCH', f'/quotes/{quote_id}', data=data)
     
-    def delete_quote(self, quote_id: str) -> None:
+    async def delete_quote(self, quote_id: str) -> None:
         """Delete a quote"""
-        return self.client._make_request('DELETE', f'/quotes/{quote_id}/')
+        return await self.client._make_request('DELETE', f'/quotes/{quote_id}')
     
-    def like_quote(self, quote_id: str) -> Dict:
+    async def like_quote(self, quote_id: str) -> Dict:
         """Like a quote"""
-        endpoint = f'/quotes/{quote_id}/likes/up'
-        print(f'[DEBUG] Like endpoint: {self.client.base_url}{endpoint}')
-        return self.client._make_request('POST', endpoint)
+        return await self.client._make_request('POST', f'/quotes/{quote_id}/likes/up')
     
-    def dislike_quote(self, quote_id: str) -> Dict:
+    async def dislike_quote(self, quote_id: str) -> Dict:
         """Dislike a quote"""
-        endpoint = f'/quotes/{quote_id}/dislike/up'
-        print(f'[DEBUG] Dislike endpoint: {self.client.base_url}{endpoint}')
-        return self.client._make_request('POST', endpoint)
+        return await self.client._make_request('POST', f'/quotes/{quote_id}/dislike/up')
     
-    def get_quote_reactions(self, quote_id: str) -> Dict:
+    async def get_quote_reactions(self, quote_id: str) -> Dict:
         """Get quote reactions"""
-        return self.client._make_request('GET', f'/quotes/{quote_id}/reactions/')
+        return await self.client._make_request('GET', f'/quotes/{quote_id}/reactions')
     
-    def search_quotes(self, author: str = None, quote: str = None, tags: str = None) -> List[Dict]:
-        """Search quotes"""
+    async def search_quotes(self, author: str = None, quote: str = None, tags: str = None, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Search quotes, optionally only the given fields"""
         params = {}
+        if fields:
+            params['fields'] = ','.join(fields)
         if author:
             params['author'] = author
         if quote:
             params['quote'] = quote
         if tags:
             params['tags'] = tags
-        return self.client._make_request('GET', '/quotes/search/', params=params) 
\ No newline at end of file
+        return await self.client._make_request('GET', '/quotes/search', params=params)
+    
+    async def get_quote_changes(self, since: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Get quotes changed and deleted since a sync token (upserts, deletes, next_token, has_more)"""
+        params = {}
+        if since:
+            params['since'] = since
+        if limit:
+            params['limit'] = limit
+        return await self.client._make_request('GET', '/quotes/changes', params=params) 
\ No newline at end of file
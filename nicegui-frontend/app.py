@@ -1,15 +1,19 @@
-from nicegui import ui
-from api_client import APIClient, AuthAPI, QuotesAPI
+from nicegui import app, ui
+from api_client import APIClient, APIError, AuthAPI, QuotesAPI
 from auth_store import auth_store
-from quotes_store import quotes_store
+from quotes_store import USER_VIEWS, quotes_store
+from keyed_list import KeyedList
+from virtual_list import VirtualList
+from config import QUOTE_LIST_WINDOWED, QUOTE_PAGE_SIZE, QUOTE_LIST_WINDOW, QUOTE_CARD_HEIGHT, QUOTE_CARD_LINES
 import asyncio
-import random
 import os
 
 # Initialize API client
 api_client = APIClient()
 auth_api = AuthAPI(api_client)
 quotes_api = QuotesAPI(api_client)
+api_client.on_token_refresh = auth_store.update_tokens
+app.on_shutdown(api_client.aclose)
 
 # State
 current_tab = 'home'
@@ -21,12 +25,25 @@ register_dialog = None
 new_quote_dialog = None
 edit_quote_dialog = None
 delete_quote_dialog = None
+duplicate_quote_dialog = None
+duplicate_match_container = None
+pending_new_quote = None  # (quote, author, tags) waiting for "Add Anyway"
 editing_quote = None
 delete_quote_id = None
 search_query = ""
 search_by = "all"
 quote_list_container = None
+quote_list = None  # KeyedList (VirtualList in windowed mode) on the quotes tab, kept across updates
+quote_list_filter = None  # (author, query, search_by) the list was last shown with
+quote_filter_row = None
+quote_list_empty = None
+quote_list_footer = None
+user_view_lists = {}  # View -> KeyedList of its loaded pages
+user_view_footers = {}
+loading_more_quotes = False
 myquotes_subtab = 'my'
+loading_user_views = set()
+pending_reactions = set()  # Quote ids with a like/dislike request in flight
 current_theme = 'light'
 
 # Dialog references
@@ -48,10 +65,10 @@ async def validate_stored_token():
     """Validate the stored token and clear authentication if invalid"""
     if auth_store.is_authenticated and auth_store.token:
         try:
-            # Try to get current user info to validate token
-            await asyncio.to_thread(auth_api.get_me)
-            # If successful, set the token in API client
-            api_client.set_token(auth_store.token)
+            # Set the stored tokens and validate them; an expired access
+            # token is renewed with the refresh token by the client
+            api_client.set_token(auth_store.token, auth_store.refresh_token)
+            await auth_api.get_me()
         except Exception as e:
             print(f"Token validation failed: {e}")
             # Clear invalid authentication state
@@ -71,10 +88,16 @@ def show_quotes_by_author(author_name: str):
 async def load_quotes():
     try:
         quotes_store.set_loading(True)
-        quotes = await asyncio.to_thread(quotes_api.get_quotes)
-        quotes_store.set_quotes(quotes)
+        if QUOTE_LIST_WINDOWED:
+            # First page only; the rest is fetched as the list is scrolled
+            page = await quotes_api.get_quote_feed(limit=QUOTE_PAGE_SIZE)
+            quotes_store.set_feed_page(page)
+            quotes = page.get('items', [])
+        else:
+            quotes = await quotes_api.get_quotes()
+            quotes_store.set_quotes(quotes)
         if not quotes_store.quote_of_the_day and quotes:
-            quotes_store.set_quote_of_the_day(random.choice(quotes))
+            quotes_store.set_quote_of_the_day(await quotes_api.get_random_quote())
     except Exception as e:
         # Show notification in UI context
         if content_container:
@@ -85,6 +108,102 @@ async def load_quotes():
         # Use the new refresh function to avoid focus stealing
         refresh_ui()
 
+async def load_more_quotes():
+    """Fetch the next feed page and extend the quote list without rebuilding it."""
+    global loading_more_quotes
+    if loading_more_quotes or not quotes_store.feed_cursor:
+        return
+    loading_more_quotes = True
+    try:
+        page = await quotes_api.get_quote_feed(quotes_store.feed_cursor, QUOTE_PAGE_SIZE)
+        quotes_store.set_feed_page(page, append=True)
+    except Exception as e:
+        if content_container:
+            with content_container:
+                ui.notify(f'Error loading quotes: {str(e)}', type='error')
+    finally:
+        loading_more_quotes = False
+    if current_tab == 'quotes':
+        update_quote_list()
+
+def request_more_quotes():
+    """Start loading the next feed page unless one is loading or all are loaded."""
+    if not loading_more_quotes and quotes_store.feed_cursor:
+        asyncio.create_task(load_more_quotes())
+
+async def load_user_views(views, more: bool = False):
+    """Fetch the first page of each view, or the next page of one view when more is set."""
+    fetchers = {
+        'my': quotes_api.get_my_quotes,
+        'liked': quotes_api.get_liked_quotes,
+        'disliked': quotes_api.get_disliked_quotes,
+    }
+
+    async def load(view):
+        if view in loading_user_views:
+            return
+        loading_user_views.add(view)
+        current = quotes_store.get_user_view(view)
+        cursor = current.get('next_cursor') if more and current else None
+        try:
+            page = await fetchers[view](cursor)
+            quotes_store.set_user_view_page(view, page, append=more)
+        except Exception as e:
+            if not more:
+                # Stored empty so the tab doesn't retry on every render
+                quotes_store.set_user_view_page(view, {'items': [], 'total': 0, 'next_cursor': None})
+            if content_container:
+                with content_container:
+                    ui.notify(f'Error loading quotes: {str(e)}', type='error')
+        finally:
+            loading_user_views.discard(view)
+
+    await asyncio.gather(*(load(view) for view in views))
+    if current_tab not in ('manage', 'myquotes'):
+        return
+    if more and all(view in user_view_lists and not user_view_lists[view].is_deleted for view in views):
+        # Another page of a view on screen: append its cards in place
+        for view in views:
+            user_view_lists[view].update(quotes_store.get_user_view(view).get('items', []))
+            render_user_view_footer(view)
+    else:
+        render_content()
+
+def render_user_view(view: str, empty_message: str):
+    """Render a loaded user view with a button for the next page."""
+    page = quotes_store.get_user_view(view) or {}
+    items = page.get('items', [])
+    if not items:
+        ui.label(empty_message).classes('text-gray-500')
+        return
+    user_view_lists[view] = KeyedList(render_quote_card, revision=card_revision)
+    user_view_lists[view].update(items)
+    user_view_footers[view] = ui.column().classes('w-full items-center')
+    render_user_view_footer(view)
+
+def render_user_view_footer(view: str):
+    """The button for the next page of a user view, while there is one."""
+    page = quotes_store.get_user_view(view) or {}
+    items = page.get('items', [])
+    footer = user_view_footers[view]
+    footer.clear()
+    if page.get('next_cursor'):
+        with footer:
+            ui.button(
+                f'Load more ({len(items)} of {page.get("total", len(items))})',
+                on_click=lambda: load_user_views([view], more=True)
+            ).classes('self-center bg-gray-200 hover:bg-gray-300 text-gray-800 dark:bg-gray-700 dark:text-white')
+
+def ensure_user_views(views) -> bool:
+    """Start loading views that are not loaded yet; True when all are available."""
+    missing = [view for view in views if quotes_store.get_user_view(view) is None]
+    if missing:
+        ui.spinner('dots').classes('text-2xl')
+        pending = [view for view in missing if view not in loading_user_views]
+        if pending:
+            asyncio.create_task(load_user_views(pending))
+    return not missing
+
 # --- UI Functions ---
 def refresh_ui():
     """Intelligently refresh the UI to avoid focus-stealing bugs."""
@@ -136,7 +255,7 @@ def render_header():
                 theme_btn.text = '☀️' if new_theme == 'light' else '🌙'
                 if auth_store.is_authenticated:
                     try:
-                        await asyncio.to_thread(auth_api.update_theme, new_theme)
+                        await auth_api.update_theme(new_theme)
                         auth_store.update_theme(new_theme)
                         ui.notify('Theme preference saved', type='positive')
                     except Exception as e:
@@ -199,42 +318,83 @@ def render_content():
         render_myquotes()
 
 
+def filtered_quotes():
+    """The loaded quotes after the author filter and the search query."""
+    display_quotes = quotes_store.quotes
+    if quotes_store.author_filter:
+        display_quotes = quotes_store.get_quotes_by_author(quotes_store.author_filter)
+
+    # Apply search query on top of the (potentially filtered) list
+    if search_query:
+        query_lower = search_query.lower()
+        if search_by == 'all':
+            display_quotes = [q for q in display_quotes if query_lower in q.get('quote', '').lower() or query_lower in q.get('author', '').lower() or any(query_lower in t.lower() for t in (q.get('tags') or []))]
+        elif search_by == 'quote':
+            display_quotes = [q for q in display_quotes if query_lower in q.get('quote', '').lower()]
+        elif search_by == 'author':
+            display_quotes = [q for q in display_quotes if query_lower in q.get('author', '').lower()]
+        elif search_by == 'tags':
+            display_quotes = [q for q in display_quotes if any(query_lower in t.lower() for t in (q.get('tags') or []))]
+    return display_quotes
+
+
 def update_quote_list():
-    """Clear and re-populate the quote list container based on current filters."""
+    """Bring the quote list in line with the store and the current filters, re-rendering only changed cards."""
+    global quote_list, quote_list_filter, quote_filter_row, quote_list_empty, quote_list_footer
     if quote_list_container is None:
         return
 
-    quote_list_container.clear()
-    with quote_list_container:
-        if quotes_store.loading:
+    if quotes_store.loading and not quotes_store.quotes:
+        quote_list_container.clear()
+        quote_list = None
+        with quote_list_container:
             ui.spinner('dots').classes('text-2xl')
-            return
+        return
+
+    if quote_list is None or quote_list.is_deleted:
+        # First render on this tab; later updates reuse these elements
+        quote_list_container.clear()
+        with quote_list_container:
+            quote_filter_row = ui.row().classes('w-full mb-2 gap-2 items-center')
+            if QUOTE_LIST_WINDOWED:
+                # Only the cards around the viewport exist; scrolling near the end fetches the next page
+                quote_list = VirtualList(render_fixed_height_quote_card, QUOTE_CARD_HEIGHT, QUOTE_LIST_WINDOW,
+                                         on_near_end=request_more_quotes, revision=card_revision)
+            else:
+                quote_list = KeyedList(render_quote_card, revision=card_revision)
+            quote_list_empty = ui.label('No quotes found').classes('text-gray-500')
+            quote_list_footer = ui.column().classes('w-full items-center')
+        quote_list_filter = None
 
-        # Apply author filter first
-        display_quotes = quotes_store.quotes
+    current_filter = (quotes_store.author_filter, search_query, search_by)
+    if current_filter != quote_list_filter:
+        quote_filter_row.clear()
         if quotes_store.author_filter:
-            with ui.row().classes('w-full mb-2 gap-2 items-center'):
+            with quote_filter_row:
                 ui.label(f"Filtered by author: {quotes_store.author_filter}").classes('text-sm font-semibold')
                 ui.button('Clear', on_click=clear_author_filter, icon='close').classes('text-xs')
-            display_quotes = quotes_store.get_quotes_by_author(quotes_store.author_filter)
-
-        # Apply search query on top of the (potentially filtered) list
-        if search_query:
-            query_lower = search_query.lower()
-            if search_by == 'all':
-                display_quotes = [q for q in display_quotes if query_lower in q.get('quote', '').lower() or query_lower in q.get('author', '').lower() or any(query_lower in t.lower() for t in (q.get('tags') or []))]
-            elif search_by == 'quote':
-                display_quotes = [q for q in display_quotes if query_lower in q.get('quote', '').lower()]
-            elif search_by == 'author':
-                display_quotes = [q for q in display_quotes if query_lower in q.get('author', '').lower()]
-            elif search_by == 'tags':
-                display_quotes = [q for q in display_quotes if any(query_lower in t.lower() for t in (q.get('tags') or []))]
-
-        if display_quotes:
-            for quote in display_quotes:
-                render_quote_card(quote)
-        else:
-            ui.label('No quotes found').classes('text-gray-500')
+        quote_filter_row.set_visibility(bool(quotes_store.author_filter))
+
+    display_quotes = filtered_quotes()
+    if QUOTE_LIST_WINDOWED:
+        # A new filter starts at the top; new pages and refreshes keep the position
+        quote_list.set_items(display_quotes, reset=quote_list_filter is not None and current_filter != quote_list_filter)
+        quote_list.scroll_area.set_visibility(bool(display_quotes))
+    else:
+        quote_list.update(display_quotes)
+    quote_list_empty.set_visibility(not display_quotes)
+    quote_list_filter = current_filter
+    render_feed_footer()
+
+
+def render_feed_footer():
+    """Show how much of the feed is loaded, with a button for the next page."""
+    quote_list_footer.clear()
+    if not quotes_store.feed_cursor:
+        return
+    with quote_list_footer:
+        ui.label(f'{len(quotes_store.quotes)} of {quotes_store.feed_total} quotes loaded').classes('text-xs text-gray-500 mt-2')
+        ui.button('Load more', on_click=load_more_quotes).classes('mb-2 bg-gray-200 hover:bg-gray-300 text-gray-800 dark:bg-gray-700 dark:text-white')
 
 
 def render_home():
@@ -320,51 +480,85 @@ def render_manage():
         # Add "Add New Quote" button here
         ui.button('Add New Quote', icon='add', on_click=lambda: new_quote_dialog.open()).classes('mb-4 bg-blue-600 hover:bg-blue-700 text-white font-semibold px-4 py-2 rounded self-start')
 
-        my_quotes = quotes_store.get_my_quotes(auth_store.get_user_id())
         ui.label('My Quotes').classes('text-xl font-bold mb-4')
-        if my_quotes:
-            for quote in my_quotes:
-                render_quote_card(quote)
-        else:
-            ui.label('You haven\'t added any quotes yet').classes('text-gray-500')
+        if ensure_user_views(['my']):
+            render_user_view('my', 'You haven\'t added any quotes yet')
+
+
+# Quote fields a card displays; a card is re-rendered only when one of them changes
+CARD_FIELDS = ('quote', 'author', 'tags', 'user_name', 'user_id', 'likes', 'dislikes')
 
+def card_revision(quote):
+    """What a rendered card depends on: its fields, the tab and who is signed in."""
+    viewer = auth_store.get_user_id() if auth_store.is_authenticated else None
+    return (current_tab, viewer) + tuple(quote.get(field) for field in CARD_FIELDS)
 
 def render_quote_card(quote):
     with ui.card().classes('w-full max-w-2xl mx-auto mb-4 bg-white shadow border border-gray-200 dark:!bg-gray-900 dark:!border-gray-800 dark:!text-white'):
-        with ui.column().classes('w-full text-center items-center'):
-            ui.label(f'"{quote.get("quote", "")}"').classes('text-lg font-medium mb-2 text-gray-900 dark:text-white')
-            ui.label(f'— {quote.get("author", "Unknown")}').classes('text-sm text-gray-600 mb-2 dark:text-gray-300')
-            if quote.get('tags'):
-                tags = quote['tags'].split(',')
-                with ui.row().classes('flex-wrap gap-1 mb-2 justify-center'):
-                    for tag in tags:
-                        if tag.strip():
-                            ui.label(tag.strip()).classes('inline-block px-2 py-0.5 rounded-full bg-blue-100 text-blue-800 text-xs font-semibold mr-1 dark:bg-gray-700 dark:text-yellow-200')
-            if quote.get('user_name'):
-                ui.label(f'Added by {quote["user_name"]}').classes('text-xs text-gray-500 mb-2 dark:text-gray-400')
-            with ui.row().classes('w-full justify-center items-center gap-4'):
-                with ui.row().classes('gap-2'):
-                    is_own_quote = auth_store.is_authenticated and quote.get('user_id') == auth_store.get_user_id()
-                    if current_tab == 'manage':
+        render_quote_card_body(quote)
+
+def render_fixed_height_quote_card(quote):
+    """Card for a fixed-height row of the windowed list: long text is clamped instead of overflowing."""
+    with ui.card().classes('w-full max-w-2xl mx-auto mb-4 overflow-hidden bg-white shadow border border-gray-200 dark:!bg-gray-900 dark:!border-gray-800 dark:!text-white') \
+            .style(f'max-height: {QUOTE_CARD_HEIGHT - 16}px'):
+        render_quote_card_body(quote, clamp_lines=QUOTE_CARD_LINES)
+
+def render_quote_card_body(quote, clamp_lines=None):
+    # clamp_lines bounds the card's height: the quote gets that many lines, everything else one
+    single_line = ' w-full truncate' if clamp_lines else ''
+    with ui.column().classes('w-full text-center items-center'):
+        text = f'"{quote.get("quote", "")}"'
+        quote_label = ui.label(text).classes('text-lg font-medium mb-2 text-gray-900 dark:text-white')
+        if clamp_lines:
+            quote_label.classes(f'w-full line-clamp-{clamp_lines}')
+            if len(text) > 60 * clamp_lines:  # About 60 characters per line on a full-width card
+                quote_label.tooltip(text)
+        ui.label(f'— {quote.get("author", "Unknown")}').classes('text-sm text-gray-600 mb-2 dark:text-gray-300' + single_line)
+        if quote.get('tags'):
+            tags = quote['tags'].split(',')
+            wrap = 'flex-nowrap overflow-hidden w-full' if clamp_lines else 'flex-wrap'
+            with ui.row().classes(f'{wrap} gap-1 mb-2 justify-center'):
+                for tag in tags:
+                    if tag.strip():
+                        ui.label(tag.strip()).classes('inline-block px-2 py-0.5 rounded-full bg-blue-100 text-blue-800 text-xs font-semibold mr-1 whitespace-nowrap dark:bg-gray-700 dark:text-yellow-200')
+        if quote.get('user_name'):
+            ui.label(f'Added by {quote["user_name"]}').classes('text-xs text-gray-500 mb-2 dark:text-gray-400' + single_line)
+        with ui.row().classes('w-full justify-center items-center gap-4'):
+            with ui.row().classes('gap-2'):
+                is_own_quote = auth_store.is_authenticated and quote.get('user_id') == auth_store.get_user_id()
+                if current_tab == 'manage':
+                    ui.icon('thumb_up').classes('text-green-800')
+                    ui.label(str(quote.get('likes', 0))).classes('text-sm')
+                    ui.icon('thumb_down').classes('text-red-800')
+                    ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
+                else:
+                    if is_own_quote:
                         ui.icon('thumb_up').classes('text-green-800')
                         ui.label(str(quote.get('likes', 0))).classes('text-sm')
                         ui.icon('thumb_down').classes('text-red-800')
                         ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
                     else:
-                        if is_own_quote:
-                            ui.icon('thumb_up').classes('text-green-800')
-                            ui.label(str(quote.get('likes', 0))).classes('text-sm')
-                            ui.icon('thumb_down').classes('text-red-800')
-                            ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
-                        else:
-                            ui.button(icon='thumb_up', on_click=lambda qid=quote['_id']: handle_like_quote(qid)).classes('bg-green-100 hover:bg-green-200 text-green-800 rounded dark:bg-green-900 dark:text-green-200')
-                            ui.label(str(quote.get('likes', 0))).classes('text-sm')
-                            ui.button(icon='thumb_down', on_click=lambda qid=quote['_id']: handle_dislike_quote(qid)).classes('bg-red-100 hover:bg-red-200 text-red-800 rounded dark:bg-red-900 dark:text-red-200')
-                            ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
-                if current_tab == 'manage' and auth_store.is_authenticated and quote.get('user_id') == auth_store.get_user_id():
-                    with ui.row().classes('gap-2'):
-                        ui.button(icon='edit', on_click=lambda q=quote: open_edit_dialog(q)).classes('bg-blue-100 hover:bg-blue-200 text-blue-800 rounded dark:bg-blue-900 dark:text-blue-200')
-                        ui.button(icon='delete', on_click=lambda qid=quote['_id']: open_delete_dialog(qid)).classes('bg-red-100 hover:bg-red-200 text-red-800 rounded dark:bg-red-900 dark:text-red-200')
+                        ui.button(icon='thumb_up', on_click=lambda qid=quote['_id']: handle_like_quote(qid)).classes('bg-green-100 hover:bg-green-200 text-green-800 rounded dark:bg-green-900 dark:text-green-200')
+                        ui.label(str(quote.get('likes', 0))).classes('text-sm')
+                        ui.button(icon='thumb_down', on_click=lambda qid=quote['_id']: handle_dislike_quote(qid)).classes('bg-red-100 hover:bg-red-200 text-red-800 rounded dark:bg-red-900 dark:text-red-200')
+                        ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
+            if current_tab == 'manage' and auth_store.is_authenticated and quote.get('user_id') == auth_store.get_user_id():
+                with ui.row().classes('gap-2'):
+                    ui.button(icon='edit', on_click=lambda q=quote: open_edit_dialog(q)).classes('bg-blue-100 hover:bg-blue-200 text-blue-800 rounded dark:bg-blue-900 dark:text-blue-200')
+                    ui.button(icon='delete', on_click=lambda qid=quote['_id']: open_delete_dialog(qid)).classes('bg-red-100 hover:bg-red-200 text-red-800 rounded dark:bg-red-900 dark:text-red-200')
+
+def live_card_lists():
+    """Keyed card lists currently on the page."""
+    lists = [quote_list] + list(user_view_lists.values())
+    return [card_list for card_list in lists if card_list is not None and not card_list.is_deleted]
+
+def refresh_quote_cards(quote_id):
+    """Re-render only the cards showing one quote, where it changed."""
+    quote = quotes_store.find_quote(quote_id)
+    if quote is None:
+        return
+    for card_list in live_card_lists():
+        card_list.refresh(quote)
 
 def render_myquotes():
     global myquotes_subtab
@@ -372,39 +566,26 @@ def render_myquotes():
         if not auth_store.is_authenticated:
             ui.label('Please login to view your quotes').classes('text-gray-500')
             return
-        user_id = auth_store.get_user_id()
-        my_quotes = quotes_store.get_my_quotes(user_id)
-        liked_quotes = quotes_store.get_liked_quotes()
-        disliked_quotes = [q for q in quotes_store.quotes if q.get('is_disliked', False)]
+        if not ensure_user_views(USER_VIEWS):
+            return
+        totals = {view: quotes_store.get_user_view(view).get('total', 0) for view in USER_VIEWS}
         def on_subtab_change(e):
             global myquotes_subtab
             myquotes_subtab = e.value
             render_content()  # re-render to update content
         with ui.tabs(value=myquotes_subtab, on_change=on_subtab_change).classes('mb-4'):
-            ui.tab('my', label=f'My Quotes ({len(my_quotes)})', icon='person')
-            ui.tab('liked', label=f'Liked Quotes ({len(liked_quotes)})', icon='thumb_up')
-            ui.tab('disliked', label=f'Disliked Quotes ({len(disliked_quotes)})', icon='thumb_down')
+            ui.tab('my', label=f'My Quotes ({totals["my"]})', icon='person')
+            ui.tab('liked', label=f'Liked Quotes ({totals["liked"]})', icon='thumb_up')
+            ui.tab('disliked', label=f'Disliked Quotes ({totals["disliked"]})', icon='thumb_down')
         if myquotes_subtab == 'my':
             ui.label('My Quotes').classes('text-xl font-bold mb-4')
-            if my_quotes:
-                for quote in my_quotes:
-                    render_quote_card(quote)
-            else:
-                ui.label("You haven't created any quotes yet").classes('text-gray-500')
+            render_user_view('my', "You haven't created any quotes yet")
         elif myquotes_subtab == 'liked':
             ui.label('Liked Quotes').classes('text-xl font-bold mb-4')
-            if liked_quotes:
-                for quote in liked_quotes:
-                    render_quote_card(quote)
-            else:
-                ui.label("You haven't liked any quotes yet").classes('text-gray-500')
+            render_user_view('liked', "You haven't liked any quotes yet")
         elif myquotes_subtab == 'disliked':
             ui.label('Disliked Quotes').classes('text-xl font-bold mb-4')
-            if disliked_quotes:
-                for quote in disliked_quotes:
-                    render_quote_card(quote)
-            else:
-                ui.label("You haven't disliked any quotes yet").classes('text-gray-500')
+            render_user_view('disliked', "You haven't disliked any quotes yet")
 
 # --- Character Counter Functions ---
 def update_nq_char_count():
@@ -438,6 +619,7 @@ def update_eq_char_count():
 # --- Dialogs ---
 def setup_dialogs():
     global login_dialog, register_dialog, new_quote_dialog, edit_quote_dialog, delete_quote_dialog
+    global duplicate_quote_dialog, duplicate_match_container
     global login_email, login_password, remember_checkbox, reg_name, reg_email, reg_password
     global nq_quote, nq_author, nq_tags, eq_quote, eq_author, eq_tags
     global nq_char_count, eq_char_count
@@ -509,6 +691,15 @@ def setup_dialogs():
             with ui.row().classes('w-full justify-between'):
                 ui.button('Cancel', on_click=delete_quote_dialog.close).classes('bg-gray-500 hover:bg-gray-600')
                 ui.button('Delete', on_click=lambda: handle_delete_quote(delete_quote_dialog)).classes('bg-red-600 hover:bg-red-700')
+    # Possible Duplicate Dialog
+    duplicate_quote_dialog = ui.dialog()
+    with duplicate_quote_dialog:
+        with ui.card().classes('w-96 dark:bg-gray-800 dark:text-white'):
+            ui.label('Possible Duplicate').classes('text-2xl font-bold mb-4')
+            duplicate_match_container = ui.column().classes('w-full mb-4')
+            with ui.row().classes('w-full justify-between'):
+                ui.button('Cancel', on_click=duplicate_quote_dialog.close).classes('bg-gray-500 hover:bg-gray-600')
+                ui.button('Add Anyway', on_click=lambda: handle_create_quote(*pending_new_quote, new_quote_dialog, allow_duplicate=True)).classes('bg-blue-600 hover:bg-blue-700')
 
 # --- Dialog Openers ---
 def open_edit_dialog(quote):
@@ -547,13 +738,26 @@ def open_delete_dialog(quote_id):
     delete_quote_id = quote_id
     delete_quote_dialog.open()
 
+def open_duplicate_dialog(quote_text, author, tags, duplicate):
+    """Show the existing quote the API matched and let the user add theirs anyway."""
+    global pending_new_quote
+    pending_new_quote = (quote_text, author, tags)
+    duplicate_match_container.clear()
+    with duplicate_match_container:
+        similarity = round(duplicate.get('similarity', 1) * 100)
+        ui.label(f'This quote looks like one that already exists ({similarity}% similar):').classes('text-sm')
+        ui.label(f'"{duplicate.get("quote", "")}"').classes('font-medium')
+        ui.label(f'— {duplicate.get("author") or "Unknown"}').classes('text-sm text-gray-600 dark:text-gray-300')
+    duplicate_quote_dialog.open()
+
 # --- API Handlers ---
 async def handle_login(email, password, remember_me, dialog):
     try:
-        response = await asyncio.to_thread(auth_api.login, email, password)
+        response = await auth_api.login(email, password)
         if response.get('access_token') and response.get('user'):
-            auth_store.login(response['user'], response['access_token'], remember_me)
-            api_client.set_token(response['access_token'])
+            auth_store.login(response['user'], response['access_token'], remember_me, response.get('refresh_token'))
+            api_client.set_token(response['access_token'], response.get('refresh_token'))
+            quotes_store.clear_user_views()
             dialog.close()
             ui.notify('Successfully logged in!', type='positive')
             header_container.clear(); 
@@ -568,17 +772,26 @@ async def handle_login(email, password, remember_me, dialog):
 
 async def handle_register(name, email, password, dialog):
     try:
-        await asyncio.to_thread(auth_api.register, name, email, password)
+        await auth_api.register(name, email, password)
         dialog.close()
         ui.notify('Account created successfully! Please login.', type='positive')
         login_dialog.open()
     except Exception as e:
         ui.notify(f'Registration failed: {str(e)}', type='error')
 
+async def revoke_session(refresh_token):
+    try:
+        await auth_api.logout(refresh_token)
+    except Exception as e:
+        print(f"Failed to revoke session: {e}")
+
 def logout():
     global current_tab
+    if auth_store.refresh_token:
+        asyncio.create_task(revoke_session(auth_store.refresh_token))
     auth_store.logout()
     api_client.clear_token()
+    quotes_store.clear_user_views()
     ui.notify('Logged out successfully', type='positive')
     
     # Update header and tabs
@@ -593,21 +806,26 @@ def logout():
     render_content()
     initialize_theme()  # Set theme for guest
 
-async def handle_create_quote(quote_text, author, tags, dialog):
+async def handle_create_quote(quote_text, author, tags, dialog, allow_duplicate=False):
     try:
-        new_quote = await asyncio.to_thread(quotes_api.create_quote, quote_text, author, tags)
+        new_quote = await quotes_api.create_quote(quote_text, author, tags, allow_duplicate=allow_duplicate)
         quotes_store.add_quote(new_quote)
         dialog.close()
+        duplicate_quote_dialog.close()
         ui.notify('Quote created successfully!', type='positive')
         render_content()
+    except APIError as e:
+        if e.status_code == 409 and isinstance(e.detail, dict):
+            open_duplicate_dialog(quote_text, author, tags, e.detail)
+        else:
+            ui.notify(f'Failed to create quote: {str(e)}', type='error')
     except Exception as e:
         ui.notify(f'Failed to create quote: {str(e)}', type='error')
 
 async def handle_update_quote(quote_text, author, tags, dialog):
     try:
         if editing_quote:
-            updated_quote = await asyncio.to_thread(
-                quotes_api.update_quote,
+            updated_quote = await quotes_api.update_quote(
                 editing_quote['_id'],
                 quote_text,
                 author,
@@ -623,7 +841,7 @@ async def handle_update_quote(quote_text, author, tags, dialog):
 async def handle_delete_quote(dialog):
     try:
         if delete_quote_id:
-            await asyncio.to_thread(quotes_api.delete_quote, delete_quote_id)
+            await quotes_api.delete_quote(delete_quote_id)
             quotes_store.remove_quote(delete_quote_id)
             dialog.close()
             ui.notify('Quote deleted successfully!', type='positive')
@@ -631,39 +849,43 @@ async def handle_delete_quote(dialog):
     except Exception as e:
         ui.notify(f'Failed to delete quote: {str(e)}', type='error')
 
-async def handle_like_quote(quote_id):
+async def react_to_quote(quote_id, reaction):
+    """Toggle a like/dislike on one card right away, then reconcile with the server or roll back."""
+    verb = 'like' if reaction == 'likes' else 'dislike'
+    if not auth_store.is_authenticated:
+        ui.notify(f'Please login to {verb} quotes', type='warning')
+        return
+    quote = quotes_store.find_quote(quote_id)
+    if quote and quote.get('user_id') == auth_store.get_user_id():
+        ui.notify(f'You cannot {verb} your own quote.', type='warning')
+        return
+    if quote_id in pending_reactions:
+        return  # One toggle at a time per quote keeps rollback and reconciliation in order
+    pending_reactions.add(quote_id)
+    previous = quotes_store.apply_reaction(quote_id, reaction)
+    refresh_quote_cards(quote_id)
+    changed = False
     try:
-        if not auth_store.is_authenticated:
-            ui.notify('Please login to like quotes', type='warning')
-            return
-        quote = quotes_store.get_quote_by_id(quote_id)
-        user_id = auth_store.get_user_id()
-        if quote and quote.get('user_id') == user_id:
-            ui.notify('You cannot like your own quote.', type='warning')
-            return
-        await asyncio.to_thread(quotes_api.like_quote, quote_id)
-        await load_quotes()  # Refetch all quotes
-        ui.notify('Quote liked!', type='positive')
-        refresh_ui()
+        send = quotes_api.like_quote if reaction == 'likes' else quotes_api.dislike_quote
+        result = await send(quote_id)
+        # The server's counts include other users' reactions since the list was loaded
+        changed = quotes_store.set_reaction_state(quote_id, result)
+        quotes_store.forget_reaction_views()
+        ui.notify(result.get('message') or f'Quote {verb}d!', type='positive')
     except Exception as e:
-        ui.notify(f'Failed to like quote: {str(e)}', type='error')
+        if previous is not None:
+            changed = quotes_store.set_reaction_state(quote_id, previous)
+        ui.notify(f'Failed to {verb} quote: {str(e)}', type='error')
+    finally:
+        pending_reactions.discard(quote_id)
+        if changed:
+            refresh_quote_cards(quote_id)
+
+async def handle_like_quote(quote_id):
+    await react_to_quote(quote_id, 'likes')
 
 async def handle_dislike_quote(quote_id):
-    try:
-        if not auth_store.is_authenticated:
-            ui.notify('Please login to dislike quotes', type='warning')
-            return
-        quote = quotes_store.get_quote_by_id(quote_id)
-        user_id = auth_store.get_user_id()
-        if quote and quote.get('user_id') == user_id:
-            ui.notify('You cannot dislike your own quote.', type='warning')
-            return
-        await asyncio.to_thread(quotes_api.dislike_quote, quote_id)
-        await load_quotes()  # Refetch all quotes
-        ui.notify('Quote disliked!', type='positive')
-        refresh_ui()
-    except Exception as e:
-        ui.notify(f'Failed to dislike quote: {str(e)}', type='error')
+    await react_to_quote(quote_id, 'dislikes')
 
 def handle_search(query: str, search_by_filter: str):
     global search_query, search_by
@@ -5,6 +5,7 @@ import os
 class AuthStore:
     def __init__(self):
         self.token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
         self.user: Optional[Dict[str, Any]] = None
         self.is_authenticated: bool = False
         self.remember_me: bool = False
@@ -18,6 +19,7 @@ class AuthStore:
         """Save authentication state to file"""
         storage_data = {
             'token': self.token,
+            'refresh_token': self.refresh_token,
             'user': self.user,
             'is_authenticated': self.is_authenticated,
             'remember_me': self.remember_me
@@ -37,24 +39,33 @@ class AuthStore:
                     data = json.load(f)
                     if data.get('remember_me') and data.get('is_authenticated'):
                         self.token = data.get('token')
+                        self.refresh_token = data.get('refresh_token')
                         self.user = data.get('user')
                         self.is_authenticated = data.get('is_authenticated', False)
                         self.remember_me = data.get('remember_me', False)
         except Exception as e:
             print(f"Error loading auth state: {e}")
     
-    def login(self, user: Dict[str, Any], token: str, remember_me: bool = False):
+    def login(self, user: Dict[str, Any], token: str, remember_me: bool = False, refresh_token: Optional[str] = None):
         """Login user"""
         self.user = user
         self.token = token
+        self.refresh_token = refresh_token
         self.is_authenticated = True
         self.remember_me = remember_me
         self._save_to_storage()
     
+    def update_tokens(self, token: str, refresh_token: str):
+        """Store a rotated token pair"""
+        self.token = token
+        self.refresh_token = refresh_token
+        self._save_to_storage()
+    
     def logout(self):
         """Logout user"""
         self.user = None
         self.token = None
+        self.refresh_token = None
         self.is_authenticated = False
         self.remember_me = False
         self._save_to_storage()
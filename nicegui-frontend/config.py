@@ -3,4 +3,27 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000') 
\ No newline at end of file
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000')
+
+# HTTP client: one pooled keep-alive connection set shared by all sessions
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', '10'))  # Seconds per read/write/pool wait
+API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '3'))
+API_MAX_CONNECTIONS = int(os.getenv('API_MAX_CONNECTIONS', '20'))
+API_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('API_MAX_KEEPALIVE_CONNECTIONS', '10'))
+API_KEEPALIVE_EXPIRY = float(os.getenv('API_KEEPALIVE_EXPIRY', '30'))  # Below the backend's keep-alive timeout
+API_HTTP2 = os.getenv('API_HTTP2', 'false').lower() in ('1', 'true', 'yes')  # Needs the h2 package and an HTTP/2 endpoint
+
+# Client-side cache of GET responses, revalidated with ETag / Cache-Control
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+API_CACHE_MAX_ENTRIES = int(os.getenv('API_CACHE_MAX_ENTRIES', '256'))
+API_CACHE_MAX_BYTES = int(os.getenv('API_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+
+# Quotes tab: windowed list fed a page at a time from GET /quotes/feed
+QUOTE_LIST_WINDOWED = os.getenv('QUOTE_LIST_WINDOWED', 'true').lower() in ('1', 'true', 'yes')
+QUOTE_PAGE_SIZE = int(os.getenv('QUOTE_PAGE_SIZE', '50'))  # At most 100
+QUOTE_LIST_WINDOW = int(os.getenv('QUOTE_LIST_WINDOW', '24'))  # Cards materialized at a time
+# Windowed cards have a fixed height: the quote is clamped to QUOTE_CARD_LINES lines
+# (1-6, full text on hover) and tags, author and "Added by" to one line each
+QUOTE_CARD_LINES = min(max(int(os.getenv('QUOTE_CARD_LINES', '3')), 1), 6)
+# Pixels per card row; the default is the card chrome (about 236 px, plus slack) and 28 px per quote line
+QUOTE_CARD_HEIGHT = int(os.getenv('QUOTE_CARD_HEIGHT', str(250 + 28 * QUOTE_CARD_LINES)))
@@ -0,0 +1,67 @@
+from nicegui import ui
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+class KeyedList:
+    """Column of rows keyed by id that is updated by diffing instead of rebuilt.
+
+    Each row remembers the revision it was rendered from. update() creates rows
+    for new keys, re-renders rows whose revision changed, removes rows whose
+    key is gone and fixes the order, so server work and websocket traffic grow
+    with the number of changed rows rather than the length of the list.
+    """
+
+    def __init__(self, render_item: Callable[[Any], None],
+                 key: Callable[[Any], Hashable] = lambda item: item['_id'],
+                 revision: Callable[[Any], Hashable] = lambda item: repr(item),
+                 row_classes: str = 'w-full', row_style: str = ''):
+        self.render_item = render_item
+        self.key = key
+        self.revision = revision
+        self.row_classes = row_classes
+        self.row_style = row_style
+        self.container = ui.column().classes('w-full gap-0')
+        self.rows: Dict[Hashable, Tuple[Hashable, ui.element]] = {}
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.container.is_deleted
+
+    def update(self, items: List[Any]):
+        """Make the rows match items, touching only what changed"""
+        ordered, seen = [], set()
+        for item in items:
+            key = self.key(item)
+            if key in seen:
+                continue  # Duplicate key; the first occurrence wins
+            seen.add(key)
+            ordered.append(self._render_row(key, item))
+        for key in [key for key in self.rows if key not in seen]:
+            self.container.remove(self.rows.pop(key)[1])
+        children = self.container.default_slot.children
+        if children != ordered:
+            children[:] = ordered
+            self.container.update()
+
+    def refresh(self, item: Any) -> bool:
+        """Re-render one row if it is shown and its revision changed; True if it was re-rendered"""
+        key = self.key(item)
+        if key not in self.rows or self.rows[key][0] == self.revision(item):
+            return False
+        self._render_row(key, item)
+        return True
+
+    def _render_row(self, key: Hashable, item: Any) -> ui.element:
+        revision = self.revision(item)
+        current = self.rows.get(key)
+        if current is not None and current[0] == revision:
+            return current[1]
+        if current is None:
+            with self.container:
+                row = ui.element('div').classes(self.row_classes).style(self.row_style)
+        else:
+            row = current[1]
+            row.clear()
+        with row:
+            self.render_item(item)
+        self.rows[key] = (revision, row)
+        return row
@@ -1,15 +1,16 @@
 from nicegui import ui, app
-from api_client import APIClient, AuthAPI, QuotesAPI
+from api_client import APIClient, APIError, AuthAPI, QuotesAPI
 from auth_store import auth_store
 from quotes_store import quotes_store
 import asyncio
 from typing import List, Dict, Any, Optional
-import random
 
 # Initialize API client
 api_client = APIClient()
 auth_api = AuthAPI(api_client)
 quotes_api = QuotesAPI(api_client)
+api_client.on_token_refresh = auth_store.update_tokens
+app.on_shutdown(api_client.aclose)
 
 # Global variables
 current_tab = 'home'
@@ -19,6 +20,8 @@ search_query = ''
 selected_author = ''
 editing_quote = None
 delete_quote_id = None
+quote_cards = {}  # Quote id -> cards showing it, so one card can be re-rendered alone
+pending_reactions = set()  # Quote ids with a like/dislike request in flight
 
 # UI Components
 header = None
@@ -28,6 +31,9 @@ register_dialog = None
 new_quote_dialog = None
 edit_quote_dialog = None
 delete_quote_dialog = None
+duplicate_quote_dialog = None
+duplicate_match_container = None
+pending_new_quote = None  # (quote, author, tags) waiting for "Add Anyway"
 
 def setup_theme():
     """Setup theme based on user preference"""
@@ -96,6 +102,7 @@ def create_dialogs():
     create_new_quote_dialog()
     create_edit_quote_dialog()
     create_delete_quote_dialog()
+    create_duplicate_quote_dialog()
 
 def create_login_dialog():
     """Create login dialog"""
@@ -184,16 +191,31 @@ def create_delete_quote_dialog():
     
     delete_quote_dialog = dialog
 
+def create_duplicate_quote_dialog():
+    """Create the dialog shown when the API reports a possible duplicate"""
+    global duplicate_quote_dialog, duplicate_match_container
+    
+    with ui.dialog() as dialog:
+        with ui.card().classes('w-96'):
+            ui.label('Possible Duplicate').classes('text-2xl font-bold mb-4')
+            duplicate_match_container = ui.column().classes('w-full mb-4')
+            
+            with ui.row().classes('w-full justify-between'):
+                ui.button('Cancel', on_click=dialog.close).classes('bg-gray-500 hover:bg-gray-600')
+                ui.button('Add Anyway', on_click=lambda: handle_create_quote(*pending_new_quote, new_quote_dialog, allow_duplicate=True)).classes('bg-blue-600 hover:bg-blue-700')
+    
+    duplicate_quote_dialog = dialog
+
 async def load_quotes():
     """Load quotes from API"""
     try:
         quotes_store.set_loading(True)
-        quotes = await asyncio.to_thread(quotes_api.get_quotes)
+        quotes = await quotes_api.get_quotes()
         quotes_store.set_quotes(quotes)
         
         # Set quote of the day if not already set
         if not quotes_store.quote_of_the_day and quotes:
-            quotes_store.set_quote_of_the_day(random.choice(quotes))
+            quotes_store.set_quote_of_the_day(await quotes_api.get_random_quote())
             
     except Exception as e:
         ui.notify(f'Error loading quotes: {str(e)}', type='error')
@@ -203,61 +225,77 @@ async def load_quotes():
 def render_quote_card(quote: Dict[str, Any]) -> ui.card:
     """Render a single quote card"""
     with ui.card().classes('w-full mb-4') as card:
-        with ui.column().classes('w-full'):
-            # Quote text
-            ui.label(f'"{quote.get("quote", "")}"').classes('text-lg font-medium mb-2')
-            
-            # Author
-            ui.label(f'— {quote.get("author", "Unknown")}').classes('text-sm text-gray-600 mb-2')
-            
-            # Tags
-            if quote.get('tags'):
-                tags = quote['tags'].split(',')
-                with ui.row().classes('flex-wrap gap-1 mb-2'):
-                    for tag in tags:
-                        if tag.strip():
-                            ui.chip(tag.strip()).classes('bg-blue-100 text-blue-800')
-            
-            # User info
-            if quote.get('user_name'):
-                ui.label(f'Added by {quote["user_name"]}').classes('text-xs text-gray-500 mb-2')
+        render_quote_card_body(quote)
+    quote_cards.setdefault(quote['_id'], []).append(card)
+    return card
+
+def render_quote_card_body(quote: Dict[str, Any]):
+    """Render the contents of a quote card"""
+    with ui.column().classes('w-full'):
+        # Quote text
+        ui.label(f'"{quote.get("quote", "")}"').classes('text-lg font-medium mb-2')
+        
+        # Author
+        ui.label(f'— {quote.get("author", "Unknown")}').classes('text-sm text-gray-600 mb-2')
+        
+        # Tags
+        if quote.get('tags'):
+            tags = quote['tags'].split(',')
+            with ui.row().classes('flex-wrap gap-1 mb-2'):
+                for tag in tags:
+                    if tag.strip():
+                        ui.chip(tag.strip()).classes('bg-blue-100 text-blue-800')
+        
+        # User info
+        if quote.get('user_name'):
+            ui.label(f'Added by {quote["user_name"]}').classes('text-xs text-gray-500 mb-2')
+        
+        # Actions row
+        with ui.row().classes('w-full justify-between items-center'):
+            # Like/Dislike buttons
+            with ui.row().classes('gap-2'):
+                like_btn = ui.button(
+                    icon='thumb_up',
+                    on_click=lambda q=quote: handle_like_quote(q['_id'])
+                ).classes('bg-green-100 hover:bg-green-200 text-green-800')
+                
+                ui.label(str(quote.get('likes', 0))).classes('text-sm')
+                
+                dislike_btn = ui.button(
+                    icon='thumb_down',
+                    on_click=lambda q=quote: handle_dislike_quote(q['_id'])
+                ).classes('bg-red-100 hover:bg-red-200 text-red-800')
+                
+                ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
             
-            # Actions row
-            with ui.row().classes('w-full justify-between items-center'):
-                # Like/Dislike buttons
+            # Edit/Delete buttons (only for quote owner)
+            if auth_store.is_authenticated and quote.get('user_id') == auth_store.get_user_id():
                 with ui.row().classes('gap-2'):
-                    like_btn = ui.button(
-                        icon='thumb_up',
-                        on_click=lambda q=quote: handle_like_quote(q['_id'])
-                    ).classes('bg-green-100 hover:bg-green-200 text-green-800')
-                    
-                    ui.label(str(quote.get('likes', 0))).classes('text-sm')
+                    ui.button(
+                        icon='edit',
+                        on_click=lambda q=quote: show_edit_quote_dialog(q)
+                    ).classes('bg-blue-100 hover:bg-blue-200 text-blue-800')
                     
-                    dislike_btn = ui.button(
-                        icon='thumb_down',
-                        on_click=lambda q=quote: handle_dislike_quote(q['_id'])
+                    ui.button(
+                        icon='delete',
+                        on_click=lambda q=quote: show_delete_quote_dialog(q['_id'])
                     ).classes('bg-red-100 hover:bg-red-200 text-red-800')
-                    
-                    ui.label(str(quote.get('dislikes', 0))).classes('text-sm')
-                
-                # Edit/Delete buttons (only for quote owner)
-                if auth_store.is_authenticated and quote.get('user_id') == auth_store.get_user_id():
-                    with ui.row().classes('gap-2'):
-                        ui.button(
-                            icon='edit',
-                            on_click=lambda q=quote: show_edit_quote_dialog(q)
-                        ).classes('bg-blue-100 hover:bg-blue-200 text-blue-800')
-                        
-                        ui.button(
-                            icon='delete',
-                            on_click=lambda q=quote: show_delete_quote_dialog(q['_id'])
-                        ).classes('bg-red-100 hover:bg-red-200 text-red-800')
-    
-    return card
+
+def refresh_quote_cards(quote_id: str):
+    """Re-render only the cards showing one quote"""
+    quote = quotes_store.find_quote(quote_id)
+    cards = [card for card in quote_cards.get(quote_id, []) if not card.is_deleted]
+    quote_cards[quote_id] = cards
+    for card in cards:
+        card.clear()
+        if quote:
+            with card:
+                render_quote_card_body(quote)
 
 def render_home_tab():
     """Render the home tab content"""
     content_area.clear()
+    quote_cards.clear()
     
     with content_area:
         # Quote of the day
@@ -285,6 +323,7 @@ def render_home_tab():
 def render_quotes_tab():
     """Render the quotes tab content"""
     content_area.clear()
+    quote_cards.clear()
     
     with content_area:
         # Search and filter controls
@@ -304,6 +343,7 @@ def render_quotes_tab():
 def render_authors_tab():
     """Render the authors tab content"""
     content_area.clear()
+    quote_cards.clear()
     
     with content_area:
         authors = quotes_store.get_authors()
@@ -328,23 +368,45 @@ def render_authors_tab():
 def render_manage_tab():
     """Render the manage tab content"""
     content_area.clear()
+    quote_cards.clear()
     
     with content_area:
         if not auth_store.is_authenticated:
             ui.label('Please login to manage your quotes').classes('text-gray-500')
             return
         
-        # My quotes
-        my_quotes = quotes_store.get_my_quotes(auth_store.get_user_id())
-        
+        # My quotes, a page at a time from the server
         ui.label('My Quotes').classes('text-xl font-bold mb-4')
         
+        page = quotes_store.get_user_view('my')
+        if page is None:
+            ui.spinner('dots').classes('text-2xl')
+            asyncio.create_task(load_my_quotes())
+            return
+        
+        my_quotes = quotes_store.get_my_quotes()
         if my_quotes:
             for quote in my_quotes:
                 render_quote_card(quote)
+            if page.get('next_cursor'):
+                ui.button('Load more', on_click=lambda: load_my_quotes(more=True)).classes('self-center')
         else:
             ui.label('You haven\'t added any quotes yet').classes('text-gray-500')
 
+async def load_my_quotes(more: bool = False):
+    """Load the first or the next page of the current user's quotes"""
+    current = quotes_store.get_user_view('my')
+    cursor = current.get('next_cursor') if more and current else None
+    try:
+        page = await quotes_api.get_my_quotes(cursor)
+        quotes_store.set_user_view_page('my', page, append=more)
+    except Exception as e:
+        if not more:
+            quotes_store.set_user_view_page('my', {'items': [], 'total': 0, 'next_cursor': None})
+        ui.notify(f'Error loading quotes: {str(e)}', type='error')
+    if current_tab == 'manage':
+        render_manage_tab()
+
 def handle_tab_change(e):
     """Handle tab change"""
     global current_tab
@@ -368,11 +430,12 @@ def switch_tab(tab_name: str):
 async def handle_login(email: str, password: str, remember_me: bool, dialog):
     """Handle login"""
     try:
-        response = await asyncio.to_thread(auth_api.login, email, password)
+        response = await auth_api.login(email, password)
         
         if response.get('access_token') and response.get('user'):
-            auth_store.login(response['user'], response['access_token'], remember_me)
-            api_client.set_token(response['access_token'])
+            auth_store.login(response['user'], response['access_token'], remember_me, response.get('refresh_token'))
+            api_client.set_token(response['access_token'], response.get('refresh_token'))
+            quotes_store.clear_user_views()
             
             dialog.close()
             ui.notify('Successfully logged in!', type='positive')
@@ -388,17 +451,27 @@ async def handle_login(email: str, password: str, remember_me: bool, dialog):
 async def handle_register(name: str, email: str, password: str, dialog):
     """Handle registration"""
     try:
-        await asyncio.to_thread(auth_api.register, name, email, password)
+        await auth_api.register(name, email, password)
         dialog.close()
         ui.notify('Account created successfully! Please login.', type='positive')
         show_login_dialog()
     except Exception as e:
         ui.notify(f'Registration failed: {str(e)}', type='error')
 
+async def revoke_session(refresh_token: str):
+    """Revoke the refresh token on the server"""
+    try:
+        await auth_api.logout(refresh_token)
+    except Exception as e:
+        print(f"Failed to revoke session: {e}")
+
 def logout():
     """Handle logout"""
+    if auth_store.refresh_token:
+        asyncio.create_task(revoke_session(auth_store.refresh_token))
     auth_store.logout()
     api_client.clear_token()
+    quotes_store.clear_user_views()
     ui.notify('Logged out successfully', type='positive')
     
     # Refresh UI
@@ -458,17 +531,35 @@ def show_delete_quote_dialog(quote_id: str):
     delete_quote_id = quote_id
     delete_quote_dialog.open()
 
-async def handle_create_quote(quote_text: str, author: str, tags: str, dialog):
+def show_duplicate_quote_dialog(quote_text: str, author: str, tags: str, duplicate: Dict[str, Any]):
+    """Show the existing quote the API matched and offer to add the new one anyway"""
+    global pending_new_quote
+    pending_new_quote = (quote_text, author, tags)
+    duplicate_match_container.clear()
+    with duplicate_match_container:
+        similarity = round(duplicate.get('similarity', 1) * 100)
+        ui.label(f'This quote looks like one that already exists ({similarity}% similar):').classes('text-sm')
+        ui.label(f'"{duplicate.get("quote", "")}"').classes('font-medium')
+        ui.label(f'— {duplicate.get("author") or "Unknown"}').classes('text-sm text-gray-600')
+    duplicate_quote_dialog.open()
+
+async def handle_create_quote(quote_text: str, author: str, tags: str, dialog, allow_duplicate: bool = False):
     """Handle creating a new quote"""
     try:
-        new_quote = await asyncio.to_thread(quotes_api.create_quote, quote_text, author, tags)
+        new_quote = await quotes_api.create_quote(quote_text, author, tags, allow_duplicate=allow_duplicate)
         quotes_store.add_quote(new_quote)
         
         dialog.close()
+        duplicate_quote_dialog.close()
         ui.notify('Quote created successfully!', type='positive')
         
         # Refresh current tab
         handle_tab_change(type('Event', (), {'value': current_tab})())
+    except APIError as e:
+        if e.status_code == 409 and isinstance(e.detail, dict):
+            show_duplicate_quote_dialog(quote_text, author, tags, e.detail)
+        else:
+            ui.notify(f'Failed to create quote: {str(e)}', type='error')
     except Exception as e:
         ui.notify(f'Failed to create quote: {str(e)}', type='error')
 
@@ -476,8 +567,7 @@ async def handle_update_quote(quote_text: str, author: str, tags: str, dialog):
     """Handle updating a quote"""
     try:
         if editing_quote:
-            updated_quote = await asyncio.to_thread(
-                quotes_api.update_quote, 
+            updated_quote = await quotes_api.update_quote(
                 editing_quote['_id'], 
                 quote_text, 
                 author, 
@@ -497,7 +587,7 @@ async def handle_delete_quote(dialog):
     """Handle deleting a quote"""
     try:
         if delete_quote_id:
-            await asyncio.to_thread(quotes_api.delete_quote, delete_quote_id)
+            await quotes_api.delete_quote(delete_quote_id)
             quotes_store.remove_quote(delete_quote_id)
             
             dialog.close()
@@ -508,23 +598,38 @@ async def handle_delete_quote(dialog):
     except Exception as e:
         ui.notify(f'Failed to delete quote: {str(e)}', type='error')
 
-async def handle_like_quote(quote_id: str):
-    """Handle liking a quote"""
+async def react_to_quote(quote_id: str, reaction: str):
+    """Toggle a like/dislike on its card right away, then reconcile with the server or roll back"""
+    verb = 'like' if reaction == 'likes' else 'dislike'
+    if quote_id in pending_reactions:
+        return  # One toggle at a time per quote keeps rollback and reconciliation in order
+    pending_reactions.add(quote_id)
+    previous = quotes_store.apply_reaction(quote_id, reaction)
+    refresh_quote_cards(quote_id)
+    changed = False
     try:
-        await asyncio.to_thread(quotes_api.like_quote, quote_id)
-        await load_quotes()  # Refresh quotes to get updated like status
-        ui.notify('Quote liked!', type='positive')
+        send = quotes_api.like_quote if reaction == 'likes' else quotes_api.dislike_quote
+        result = await send(quote_id)
+        # The server's counts include other users' reactions since the list was loaded
+        changed = quotes_store.set_reaction_state(quote_id, result)
+        quotes_store.forget_reaction_views()
+        ui.notify(result.get('message') or f'Quote {verb}d!', type='positive')
     except Exception as e:
-        ui.notify(f'Failed to like quote: {str(e)}', type='error')
+        if previous is not None:
+            changed = quotes_store.set_reaction_state(quote_id, previous)
+        ui.notify(f'Failed to {verb} quote: {str(e)}', type='error')
+    finally:
+        pending_reactions.discard(quote_id)
+        if changed:
+            refresh_quote_cards(quote_id)
+
+async def handle_like_quote(quote_id: str):
+    """Handle liking a quote"""
+    await react_to_quote(quote_id, 'likes')
 
 async def handle_dislike_quote(quote_id: str):
     """Handle disliking a quote"""
-    try:
-        await asyncio.to_thread(quotes_api.dislike_quote, quote_id)
-        await load_quotes()  # Refresh quotes to get updated dislike status
-        ui.notify('Quote disliked!', type='positive')
-    except Exception as e:
-        ui.notify(f'Failed to dislike quote: {str(e)}', type='error')
+    await react_to_quote(quote_id, 'dislikes')
 
 def handle_search_change(e):
     """Handle search input change"""
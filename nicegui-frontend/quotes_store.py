@@ -3,12 +3,43 @@ from datetime import datetime, date
 import json
 import os
 
+USER_VIEWS = ('my', 'liked', 'disliked')
+# Quote fields a like or dislike changes
+REACTION_FIELDS = ('likes', 'dislikes', 'is_liked', 'is_disliked')
+
+def reaction_fields(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The reaction fields of a quote, defaulted like the API does"""
+    return {field: state.get(field) or (False if field.startswith('is_') else 0) for field in REACTION_FIELDS}
+
+def toggled_reaction(state: Dict[str, Any], reaction: str) -> Dict[str, Any]:
+    """Reaction fields after toggling 'likes' or 'dislikes', mirroring the API"""
+    flag, opposite, opposite_flag = (
+        ('is_liked', 'dislikes', 'is_disliked') if reaction == 'likes' else ('is_disliked', 'likes', 'is_liked')
+    )
+    result = reaction_fields(state)
+    if result[flag]:
+        result[reaction] = max(result[reaction] - 1, 0)
+        result[flag] = False
+    else:
+        result[reaction] += 1
+        result[flag] = True
+        # Adding a reaction replaces the opposite one
+        if result[opposite_flag]:
+            result[opposite] = max(result[opposite] - 1, 0)
+            result[opposite_flag] = False
+    return result
+
 class QuotesStore:
     def __init__(self):
         self.quotes: List[Dict[str, Any]] = []
         self.loading: bool = False
         self.quote_of_the_day: Optional[Dict[str, Any]] = None
         self.author_filter: Optional[str] = None
+        # Feed paging position; None once every page is loaded (or when loaded unpaged)
+        self.feed_cursor: Optional[str] = None
+        self.feed_total: Optional[int] = None
+        # Server-side paginated views ('my', 'liked', 'disliked'); None until loaded
+        self.user_views: Dict[str, Optional[Dict[str, Any]]] = {view: None for view in USER_VIEWS}
         self._load_quote_of_the_day()
     
     def _get_storage_file(self) -> str:
@@ -43,10 +74,25 @@ class QuotesStore:
     def set_quotes(self, quotes: List[Dict[str, Any]]):
         """Set quotes list"""
         self.quotes = quotes
+        self.feed_cursor = None
+        self.feed_total = None
+        self.clear_user_views()
+    
+    def set_feed_page(self, page: Dict[str, Any], append: bool = False):
+        """Store a feed page; append adds it after the quotes already loaded"""
+        if append:
+            # Scores can change between pages, so a quote may come round again
+            loaded = {q.get('_id') for q in self.quotes}
+            self.quotes.extend(q for q in page.get('items', []) if q.get('_id') not in loaded)
+        else:
+            self.set_quotes(page.get('items', []))
+        self.feed_cursor = page.get('next_cursor')
+        self.feed_total = page.get('total')
     
     def add_quote(self, quote: Dict[str, Any]):
         """Add a new quote"""
         self.quotes.insert(0, quote)
+        self.clear_user_views()
     
     def update_quote(self, quote_id: str, updated_quote: Dict[str, Any]):
         """Update a quote"""
@@ -54,10 +100,12 @@ class QuotesStore:
             if quote.get('_id') == quote_id:
                 self.quotes[i] = {**quote, **updated_quote}
                 break
+        self.clear_user_views()
     
     def remove_quote(self, quote_id: str):
         """Remove a quote"""
         self.quotes = [q for q in self.quotes if q.get('_id') != quote_id]
+        self.clear_user_views()
     
     def set_loading(self, loading: bool):
         """Set loading state"""
@@ -72,13 +120,32 @@ class QuotesStore:
         """Get quotes by author"""
         return [q for q in self.quotes if q.get('author', '').lower() == author.lower()]
     
-    def get_my_quotes(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get quotes by current user"""
-        return [q for q in self.quotes if q.get('user_id') == user_id]
+    def set_user_view_page(self, view: str, page: Dict[str, Any], append: bool = False):
+        """Store a page of a user view; append adds it after the pages already loaded"""
+        current = self.user_views.get(view)
+        if append and current:
+            page = {**page, 'items': current['items'] + page['items']}
+        self.user_views[view] = page
+    
+    def get_user_view(self, view: str) -> Optional[Dict[str, Any]]:
+        """Get a loaded user view (items, total, next_cursor), or None"""
+        return self.user_views.get(view)
+    
+    def clear_user_views(self):
+        """Forget the user views so they are fetched again"""
+        self.user_views = {view: None for view in USER_VIEWS}
+    
+    def get_my_quotes(self) -> List[Dict[str, Any]]:
+        """Get the loaded quotes of the current user"""
+        return (self.user_views['my'] or {}).get('items', [])
     
     def get_liked_quotes(self) -> List[Dict[str, Any]]:
-        """Get quotes liked by current user"""
-        return [q for q in self.quotes if q.get('is_liked', False)]
+        """Get the loaded quotes liked by the current user"""
+        return (self.user_views['liked'] or {}).get('items', [])
+    
+    def get_disliked_quotes(self) -> List[Dict[str, Any]]:
+        """Get the loaded quotes disliked by the current user"""
+        return (self.user_views['disliked'] or {}).get('items', [])
     
     def search_quotes(self, query: str, search_by: str = "all") -> List[Dict[str, Any]]:
         """Search quotes by text with a specific filter."""
@@ -110,6 +177,45 @@ class QuotesStore:
                 authors.add(quote['author'])
         return sorted(list(authors))
     
+    def _copies(self, quote_id: str) -> List[Dict[str, Any]]:
+        """Every loaded copy of a quote: the main list and the user views"""
+        copies = [q for q in self.quotes if q.get('_id') == quote_id]
+        for page in self.user_views.values():
+            if page:
+                copies.extend(q for q in page.get('items', []) if q.get('_id') == quote_id)
+        return copies
+    
+    def find_quote(self, quote_id: str) -> Optional[Dict[str, Any]]:
+        """Get a quote from the main list or any loaded user view"""
+        copies = self._copies(quote_id)
+        return copies[0] if copies else None
+    
+    def apply_reaction(self, quote_id: str, reaction: str) -> Optional[Dict[str, Any]]:
+        """Toggle the user's reaction locally; returns the previous reaction fields for rollback"""
+        copies = self._copies(quote_id)
+        if not copies:
+            return None
+        previous = reaction_fields(copies[0])
+        updated = toggled_reaction(previous, reaction)
+        for quote in copies:
+            quote.update(updated)
+        return previous
+    
+    def set_reaction_state(self, quote_id: str, state: Dict[str, Any]) -> bool:
+        """Overwrite reaction fields with the server's (or rolled back) values; True if any changed"""
+        values = {field: state[field] for field in REACTION_FIELDS if field in state}
+        changed = False
+        for quote in self._copies(quote_id):
+            if any(quote.get(field) != value for field, value in values.items()):
+                quote.update(values)
+                changed = True
+        return changed
+    
+    def forget_reaction_views(self):
+        """Drop the liked/disliked views after a reaction changed their contents"""
+        self.user_views['liked'] = None
+        self.user_views['disliked'] = None
+    
     def get_quote_by_id(self, quote_id: str) -> Optional[Dict[str, Any]]:
         """Get quote by ID"""
         for quote in self.quotes:
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+import base64
+import hashlib
+import json
+import time
+
+class CacheEntry:
+    """One stored response: raw body, validators and freshness deadline"""
+    __slots__ = ('body', 'etag', 'last_modified', 'fresh_until', 'size')
+
+    def __init__(self, body: bytes, etag: Optional[str], last_modified: Optional[str], fresh_until: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+        self.size = len(body) + 256  # Rough per-entry overhead for key and headers
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.fresh_until
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """{'max-age': '60', 'no-cache': None, ...} with lower-cased directive names"""
+    directives = {}
+    for part in value.split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+def freshness_lifetime(headers) -> Optional[float]:
+    """Seconds the response may be reused without revalidation, None if it must not be stored"""
+    directives = parse_cache_control(headers.get('cache-control', ''))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        lifetime = 0.0
+    elif 'max-age' in directives:
+        try:
+            lifetime = max(float(directives['max-age']), 0.0)
+        except (TypeError, ValueError):
+            lifetime = 0.0
+        try:
+            lifetime = max(lifetime - float(headers.get('age', 0)), 0.0)
+        except ValueError:
+            pass
+    elif 'expires' in headers:
+        try:
+            lifetime = max(parsedate_to_datetime(headers['expires']).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            lifetime = 0.0
+    else:
+        lifetime = 0.0  # No heuristic freshness: revalidate every time
+    if lifetime == 0.0 and 'etag' not in headers and 'last-modified' not in headers:
+        return None  # Could neither be reused nor revalidated
+    return lifetime
+
+def auth_identity(token: Optional[str]) -> str:
+    """Who the response was for: the token subject, so entries survive token refreshes"""
+    if not token:
+        return ''
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        if claims.get('sub'):
+            return f"sub:{claims['sub']}"
+    except (IndexError, ValueError, AttributeError):
+        pass
+    return 'token:' + hashlib.sha256(token.encode()).hexdigest()[:16]
+
+class ResponseCache:
+    """LRU cache of GET responses bounded by entry count and body bytes"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[Tuple, CacheEntry]' = OrderedDict()
+        self.size = 0
+        # Bumped by invalidate(); a response fetched across a bump may be stale and is not stored
+        self.generation = 0
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Dict], identity: str) -> Tuple:
+        items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None))
+        return (method, url, items, identity)
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key: Tuple, response, generation: int) -> Optional[CacheEntry]:
+        """Store a 200 response if its headers allow it; returns the entry"""
+        if generation != self.generation:
+            return None
+        lifetime = freshness_lifetime(response.headers)
+        if lifetime is None:
+            self.discard(key)
+            return None
+        entry = CacheEntry(response.content, response.headers.get('etag'),
+                           response.headers.get('last-modified'), time.monotonic() + lifetime)
+        if entry.size > self.max_bytes:
+            self.discard(key)
+            return None
+        self.discard(key)
+        self.entries[key] = entry
+        self.size += entry.size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+            self.stats['evictions'] += 1
+        return entry
+
+    def refresh(self, key: Tuple, entry: CacheEntry, response):
+        """Apply the caching headers of a 304 to the entry it validated"""
+        lifetime = freshness_lifetime(response.headers)
+        if lifetime is None:
+            self.discard(key)
+            return
+        entry.fresh_until = time.monotonic() + lifetime
+        entry.etag = response.headers.get('etag', entry.etag)
+        entry.last_modified = response.headers.get('last-modified', entry.last_modified)
+
+    def discard(self, key: Tuple):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def invalidate(self, url_prefix: str = ''):
+        """Drop every entry whose URL starts with the prefix, for all identities"""
+        self.generation += 1
+        for key in [key for key in self.entries if key[1].startswith(url_prefix)]:
+            self.discard(key)
+
+    def clear(self):
+        self.invalidate()
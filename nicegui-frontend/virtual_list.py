@@ -0,0 +1,66 @@
+from nicegui import ui
+from typing import Any, Callable, Hashable, List, Optional
+from keyed_list import KeyedList
+
+class VirtualList:
+    """Scrollable list that only materializes the items near the viewport.
+
+    Every row is given the same height, so the space taken by the rows above
+    and below the window is two spacer elements and the number of elements
+    stays bounded however long the list is.
+    """
+
+    def __init__(self, render_item: Callable[[Any], None], row_height: int, window: int,
+                 height: str = '70vh', on_near_end: Optional[Callable[[], Any]] = None,
+                 key: Callable[[Any], Hashable] = lambda item: item['_id'],
+                 revision: Callable[[Any], Hashable] = lambda item: repr(item)):
+        self.row_height = row_height
+        self.window = window
+        self.overscan = max(window // 3, 1)  # Rows kept above the viewport, so small scrolls don't re-render
+        self.on_near_end = on_near_end
+        self.items: List[Any] = []
+        self.start = 0
+        self.end = 0
+        self.scroll_area = ui.scroll_area().classes('w-full').style(f'height: {height}')
+        # Throttled in the browser; only the two values used here are sent
+        self.scroll_area.on('scroll', self._handle_scroll, args=['verticalPosition', 'verticalContainerSize'], throttle=0.1)
+        with self.scroll_area:
+            self.top_spacer = ui.element('div').classes('w-full')
+            # Rows that stay in the window across a scroll step are kept, not rebuilt
+            self.rows = KeyedList(render_item, key, revision, row_classes='w-full overflow-hidden',
+                                  row_style=f'height: {row_height}px')
+            self.bottom_spacer = ui.element('div').classes('w-full')
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.scroll_area.is_deleted
+
+    def set_items(self, items: List[Any], reset: bool = False):
+        """Replace the list; reset scrolls back to the top (new filter), otherwise the position is kept"""
+        self.items = items
+        if reset:
+            self.start = 0
+            self.scroll_area.scroll_to(pixels=0)
+        self.start = min(self.start, max(len(items) - self.window, 0))
+        self._render()
+
+    def refresh(self, item: Any) -> bool:
+        """Re-render one row if it is in the window and has changed"""
+        return self.rows.refresh(item)
+
+    def _handle_scroll(self, e):
+        position = e.args.get('verticalPosition', 0) or 0
+        visible = (e.args.get('verticalContainerSize', 0) or 0) / self.row_height
+        first = int(position // self.row_height)
+        start = min(max(first - self.overscan, 0), max(len(self.items) - self.window, 0))
+        if abs(start - self.start) >= self.overscan or (start == 0) != (self.start == 0):
+            self.start = start
+            self._render()
+        if self.on_near_end and first + visible + self.overscan >= len(self.items):
+            self.on_near_end()
+
+    def _render(self):
+        self.end = min(self.start + self.window, len(self.items))
+        self.top_spacer.style(f'height: {self.start * self.row_height}px')
+        self.bottom_spacer.style(f'height: {(len(self.items) - self.end) * self.row_height}px')
+        self.rows.update(self.items[self.start:self.end])